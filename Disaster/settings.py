@@ -142,6 +142,27 @@ if not DEBUG:
         "https://*.onrender.com",
     ]
 
+# -----------------------
+# Cache
+# -----------------------
+REDIS_URL = os.environ.get("REDIS_URL", "")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "disaster-default",
+            # Least recently used entries are evicted beyond this
+            "OPTIONS": {"MAX_ENTRIES": int(os.environ.get("CACHE_MAX_ENTRIES", "10000"))},
+        }
+    }
+
 # -----------------------
 # App constants
 # -----------------------
@@ -172,6 +193,132 @@ BASE_URL = os.environ.get('BASE_URL', 'https://disaster-management-z940.onrender
 INDIA_EMERGENCY_NUMBER = os.environ.get('INDIA_EMERGENCY_NUMBER', '+91-0000000000')
 INDIA_SMS_SHORT_CODE = os.environ.get('INDIA_SMS_SHORT_CODE', '0000')
 
+# Repeated SMS from the same sender within this window are folded into one report
+SMS_DEDUP_WINDOW_SECONDS = int(os.environ.get('SMS_DEDUP_WINDOW_SECONDS', '600'))
+
+# Upper bound on messages accepted by the batch SMS webhook in one request
+SMS_BATCH_MAX_MESSAGES = int(os.environ.get('SMS_BATCH_MAX_MESSAGES', '1000'))
+
+# Offline place-name gazetteer (name,type,district,state,aliases) used for address and SMS location detection.
+# The bundled file covers states, districts and major cities; tehsil/village files in the same format
+# (e.g. converted from the Local Government Directory) are listed comma-separated in the extra paths.
+LOCATION_GAZETTEER_PATH = os.environ.get('LOCATION_GAZETTEER_PATH', str(BASE_DIR / 'data' / 'india_gazetteer.csv'))
+LOCATION_GAZETTEER_EXTRA_PATHS = [p.strip() for p in os.environ.get('LOCATION_GAZETTEER_EXTRA_PATHS', '').split(',') if p.strip()]
+
+# District boundary GeoJSON for offline reverse geocoding; the online service is only used outside it
+REVERSE_GEOCODER_BOUNDARIES_PATH = os.environ.get('REVERSE_GEOCODER_BOUNDARIES_PATH', str(BASE_DIR / 'data' / 'india_districts.geojson'))
+REVERSE_GEOCODER_CELL_DEGREES = float(os.environ.get('REVERSE_GEOCODER_CELL_DEGREES', '0.25'))
+REVERSE_GEOCODING_ONLINE_FALLBACK = os.environ.get('REVERSE_GEOCODING_ONLINE_FALLBACK', 'True') == 'True'
+
+# Online reverse geocode results are cached per point rounded to this many decimals (3 ~ 110 m)
+REVERSE_GEOCODE_CACHE_PRECISION = int(os.environ.get('REVERSE_GEOCODE_CACHE_PRECISION', '3'))
+REVERSE_GEOCODE_CACHE_TTL = int(os.environ.get('REVERSE_GEOCODE_CACHE_TTL', '86400'))
+REVERSE_GEOCODE_NEGATIVE_TTL = int(os.environ.get('REVERSE_GEOCODE_NEGATIVE_TTL', '300'))
+
+# Facility list (name,type,lat,lng,phone,address,district,state) for nearest-facility lookups
+EMERGENCY_FACILITIES_PATH = os.environ.get('EMERGENCY_FACILITIES_PATH', str(BASE_DIR / 'data' / 'emergency_facilities.csv'))
+EMERGENCY_FACILITIES_K = int(os.environ.get('EMERGENCY_FACILITIES_K', '3'))
+
+# Rescuer dispatch: new reports with coordinates go to the nearest available rescuer.
+# Each open assignment adds DISPATCH_LOAD_PENALTY_KM to a rescuer's effective distance.
+DISPATCH_AUTO_ASSIGN = os.environ.get('DISPATCH_AUTO_ASSIGN', 'True') == 'True'
+DISPATCH_GRID_CELL_DEGREES = float(os.environ.get('DISPATCH_GRID_CELL_DEGREES', '0.05'))
+DISPATCH_MAX_RADIUS_KM = float(os.environ.get('DISPATCH_MAX_RADIUS_KM', '50'))
+DISPATCH_CANDIDATES = int(os.environ.get('DISPATCH_CANDIDATES', '5'))
+DISPATCH_MAX_OPEN_ASSIGNMENTS = int(os.environ.get('DISPATCH_MAX_OPEN_ASSIGNMENTS', '3'))
+DISPATCH_LOAD_PENALTY_KM = float(os.environ.get('DISPATCH_LOAD_PENALTY_KM', '2.0'))
+DISPATCH_RESCUER_STALE_SECONDS = int(os.environ.get('DISPATCH_RESCUER_STALE_SECONDS', '900'))
+DISPATCH_REFRESH_SECONDS = int(os.environ.get('DISPATCH_REFRESH_SECONDS', '30'))
+
+# Rescuer GPS pings are buffered and written to RescuerLocation in one upsert per interval (0 = write-through)
+RESCUER_LOCATION_FLUSH_SECONDS = float(os.environ.get('RESCUER_LOCATION_FLUSH_SECONDS', '5'))
+# A ping joins the stored track once the rescuer moved this far or this long passed since the last kept point
+RESCUER_TRACK_MIN_DISTANCE_M = float(os.environ.get('RESCUER_TRACK_MIN_DISTANCE_M', '25'))
+RESCUER_TRACK_MAX_INTERVAL_SECONDS = int(os.environ.get('RESCUER_TRACK_MAX_INTERVAL_SECONDS', '60'))
+
+# Live dashboard stream (/api/events/). Reconnecting clients replay missed events from
+# a buffer of EVENT_REPLAY_BUFFER_SIZE; under WSGI each stream is closed after
+# EVENT_STREAM_WSGI_SECONDS, and at most EVENT_STREAM_MAX_WSGI_STREAMS streams run per process
+# so webhooks always have worker threads left (serve via ASGI for long-lived streams).
+EVENT_REPLAY_BUFFER_SIZE = int(os.environ.get('EVENT_REPLAY_BUFFER_SIZE', '1000'))
+EVENT_STREAM_HEARTBEAT_SECONDS = int(os.environ.get('EVENT_STREAM_HEARTBEAT_SECONDS', '15'))
+EVENT_STREAM_MAX_PENDING = int(os.environ.get('EVENT_STREAM_MAX_PENDING', '500'))
+EVENT_STREAM_WSGI_SECONDS = int(os.environ.get('EVENT_STREAM_WSGI_SECONDS', '25'))
+EVENT_STREAM_MAX_WSGI_STREAMS = int(os.environ.get('EVENT_STREAM_MAX_WSGI_STREAMS', '8'))
+
+# Delta sync (?since=<token> on report lists). Caught-up tokens trail the clock by
+# SYNC_OVERLAP_SECONDS so late-committing writes are not skipped; tombstones for
+# deleted rows are kept SYNC_TOMBSTONE_RETENTION_DAYS (older tokens must resync fully).
+SYNC_PAGE_SIZE = int(os.environ.get('SYNC_PAGE_SIZE', '500'))
+SYNC_OVERLAP_SECONDS = int(os.environ.get('SYNC_OVERLAP_SECONDS', '5'))
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('SYNC_TOMBSTONE_RETENTION_DAYS', '30'))
+
+# list_emergency_reports page size (?page_size= is capped at the maximum)
+EMERGENCY_REPORTS_PAGE_SIZE = int(os.environ.get('EMERGENCY_REPORTS_PAGE_SIZE', '50'))
+EMERGENCY_REPORTS_MAX_PAGE_SIZE = int(os.environ.get('EMERGENCY_REPORTS_MAX_PAGE_SIZE', '500'))
+
+# Open-report queue: a waiting report gains this many priority points per hour (one severity level = 25)
+QUEUE_AGING_POINTS_PER_HOUR = float(os.environ.get('QUEUE_AGING_POINTS_PER_HOUR', '10'))
+
+# Dynamic priority (manage.py rescore_priorities): bonus points for clusters of nearby
+# open reports, districts listed as vulnerable, and the ML risk of the report's grid cell
+PRIORITY_DENSITY_RADIUS_KM = float(os.environ.get('PRIORITY_DENSITY_RADIUS_KM', '2'))
+PRIORITY_DENSITY_WEIGHT = float(os.environ.get('PRIORITY_DENSITY_WEIGHT', '10'))
+PRIORITY_VULNERABLE_DISTRICTS = [d.strip() for d in os.environ.get('PRIORITY_VULNERABLE_DISTRICTS', '').split(',') if d.strip()]
+PRIORITY_VULNERABLE_BONUS = float(os.environ.get('PRIORITY_VULNERABLE_BONUS', '15'))
+PRIORITY_RISK_GRID_PATH = os.environ.get('PRIORITY_RISK_GRID_PATH', str(BASE_DIR / 'data' / 'classified_live_risk.csv'))
+PRIORITY_RISK_CELL_DEGREES = float(os.environ.get('PRIORITY_RISK_CELL_DEGREES', '0.5'))
+PRIORITY_RISK_WEIGHT = float(os.environ.get('PRIORITY_RISK_WEIGHT', '20'))
+# The default grid comes from the earthquake model, so it only scores seismic categories
+PRIORITY_RISK_CATEGORIES = [c.strip() for c in os.environ.get('PRIORITY_RISK_CATEGORIES', 'earthquake,landslide').split(',') if c.strip()]
+
+# Incident clustering: a new report joins an active incident of its category whose
+# centroid is within INCIDENT_RADIUS_KM and that had a report in the last INCIDENT_WINDOW_MINUTES
+INCIDENT_CLUSTERING = os.environ.get('INCIDENT_CLUSTERING', 'True') == 'True'
+INCIDENT_RADIUS_KM = float(os.environ.get('INCIDENT_RADIUS_KM', '1'))
+INCIDENT_WINDOW_MINUTES = int(os.environ.get('INCIDENT_WINDOW_MINUTES', '120'))
+INCIDENT_CELL_DEGREES = float(os.environ.get('INCIDENT_CELL_DEGREES', '0.01'))
+# Reports clustered per transaction after a bulk import
+INCIDENT_BULK_BATCH_SIZE = int(os.environ.get('INCIDENT_BULK_BATCH_SIZE', '500'))
+
+# Statistics rollups: grid size of the per-cell hourly counts
+# (run manage.py rebuild_report_rollups after changing it)
+ROLLUP_CELL_DEGREES = float(os.environ.get('ROLLUP_CELL_DEGREES', '0.5'))
+
+# Crowd report photos are re-encoded (EXIF stripped) to fit PHOTO_MAX_DIMENSION px,
+# with a PHOTO_THUMBNAIL_DIMENSION px thumbnail, by PHOTO_PIPELINE_WORKERS threads per process
+PHOTO_PIPELINE_ENABLED = os.environ.get('PHOTO_PIPELINE_ENABLED', 'True') == 'True'
+PHOTO_PIPELINE_WORKERS = int(os.environ.get('PHOTO_PIPELINE_WORKERS', '2'))
+PHOTO_FORMAT = os.environ.get('PHOTO_FORMAT', 'WEBP')  # WEBP or JPEG
+PHOTO_MAX_DIMENSION = int(os.environ.get('PHOTO_MAX_DIMENSION', '1600'))
+PHOTO_THUMBNAIL_DIMENSION = int(os.environ.get('PHOTO_THUMBNAIL_DIMENSION', '320'))
+PHOTO_QUALITY = int(os.environ.get('PHOTO_QUALITY', '80'))
+
+# Resumable photo uploads: chunks are appended under PHOTO_UPLOAD_TEMP_DIR until complete
+# (manage.py purge_photo_uploads removes uploads idle for PHOTO_UPLOAD_EXPIRY_HOURS)
+PHOTO_UPLOAD_TEMP_DIR = os.environ.get('PHOTO_UPLOAD_TEMP_DIR', str(BASE_DIR / 'upload_parts'))
+PHOTO_UPLOAD_MAX_BYTES = int(os.environ.get('PHOTO_UPLOAD_MAX_BYTES', '5242880'))
+PHOTO_UPLOAD_CHUNK_BYTES = int(os.environ.get('PHOTO_UPLOAD_CHUNK_BYTES', '262144'))
+PHOTO_UPLOAD_EXPIRY_HOURS = int(os.environ.get('PHOTO_UPLOAD_EXPIRY_HOURS', '24'))
+
+# Crowd report submissions: sliding-window limits per device fingerprint and per client IP,
+# and repeats from one device (same category, within the radius and window) folded into the first report
+CROWD_REPORT_RATE_WINDOW_SECONDS = int(os.environ.get('CROWD_REPORT_RATE_WINDOW_SECONDS', '600'))
+CROWD_REPORT_RATE_LIMIT_PER_DEVICE = int(os.environ.get('CROWD_REPORT_RATE_LIMIT_PER_DEVICE', '10'))
+CROWD_REPORT_RATE_LIMIT_PER_IP = int(os.environ.get('CROWD_REPORT_RATE_LIMIT_PER_IP', '60'))
+CROWD_REPORT_DUPLICATE_RADIUS_M = float(os.environ.get('CROWD_REPORT_DUPLICATE_RADIUS_M', '100'))
+CROWD_REPORT_DUPLICATE_WINDOW_SECONDS = int(os.environ.get('CROWD_REPORT_DUPLICATE_WINDOW_SECONDS', '300'))
+# META key holding the client address behind a proxy (e.g. HTTP_X_FORWARDED_FOR); empty uses REMOTE_ADDR
+CROWD_REPORT_CLIENT_IP_HEADER = os.environ.get('CROWD_REPORT_CLIENT_IP_HEADER', '')
+
+# Batch assignment (manage.py assign_rescuers): a report's priority_score is worth
+# DISPATCH_PRIORITY_WEIGHT_KM per 100 points of extra travel. Problems larger than
+# DISPATCH_BATCH_DENSE_CELLS matrix cells only consider each report's nearest rescuers.
+DISPATCH_PRIORITY_WEIGHT_KM = float(os.environ.get('DISPATCH_PRIORITY_WEIGHT_KM', '20'))
+DISPATCH_BATCH_CANDIDATES = int(os.environ.get('DISPATCH_BATCH_CANDIDATES', '10'))
+DISPATCH_BATCH_DENSE_CELLS = int(os.environ.get('DISPATCH_BATCH_DENSE_CELLS', '2000000'))
+DISPATCH_BATCH_MAX_REPORTS = int(os.environ.get('DISPATCH_BATCH_MAX_REPORTS', '5000'))
+
 # -----------------------
 # Logging
 # -----------------------
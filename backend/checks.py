@@ -0,0 +1,22 @@
+"""
+System checks
+Surface missing offline datasets at startup instead of at the first lookup
+"""
+
+import os
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.compatibility)
+def check_facility_dataset(app_configs, **kwargs):
+    """Nearest facility lookups need EMERGENCY_FACILITIES_PATH to point at a CSV"""
+    path = getattr(settings, 'EMERGENCY_FACILITIES_PATH', None)
+    if path and os.path.isfile(path):
+        return []
+    return [Warning(
+        f"Emergency facility dataset {path or '(unset)'} not found",
+        hint='Set EMERGENCY_FACILITIES_PATH to a CSV with name,type,lat,lng,phone,address,district,state; '
+             'until then nearest facility lookups return 503.',
+        id='backend.W001',
+    )]
@@ -0,0 +1,111 @@
+"""
+Inbound SMS deduplication service
+Folds repeated emergency SMS from the same sender into the original report
+"""
+
+import re
+import hashlib
+import logging
+from typing import Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class SMSDedupService:
+    """Short-window dedup index keyed by phone number and normalized message hash"""
+
+    KEY_PREFIX = 'sms_dedup'
+
+    def __init__(self):
+        self.window = getattr(settings, 'SMS_DEDUP_WINDOW_SECONDS', 600)
+
+    @staticmethod
+    def normalize_phone_number(phone_number: str) -> str:
+        """Reduce +91XXXXXXXXXX, 0XXXXXXXXXX and XXXXXXXXXX to the same subscriber number"""
+        digits = re.sub(r'\D', '', phone_number)
+        return digits[-10:]
+
+    @staticmethod
+    def normalize_message(message: str) -> str:
+        """Lowercase, drop punctuation and collapse whitespace so trivial resend edits still match"""
+        return ' '.join(re.sub(r'[^\w]+', ' ', message.lower()).split())
+
+    def get_dedup_key(self, phone_number: str, message: str) -> str:
+        """
+        Build the cache key for a sender/message pair
+
+        Args:
+            phone_number (str): Sender phone number
+            message (str): Raw SMS body
+
+        Returns:
+            str: Dedup index key
+        """
+        digest = hashlib.sha1(self.normalize_message(message).encode('utf-8')).hexdigest()
+        return f"{self.KEY_PREFIX}:{self.normalize_phone_number(phone_number)}:{digest}"
+
+    def find_duplicate(self, phone_number: str, message: str) -> Optional[str]:
+        """Return the report ID of a recent identical message, if any"""
+        if self.window <= 0:
+            return None
+        return cache.get(self.get_dedup_key(phone_number, message))
+
+    def claim(self, phone_number: str, message: str, report_id: str) -> Optional[str]:
+        """
+        Atomically claim a message for a report about to be created
+
+        cache.add() succeeds for exactly one of several workers receiving the
+        same retried SMS; the others fold into the winner's report ID, so the
+        report is only created when the claim was won.
+
+        Args:
+            phone_number (str): Sender phone number
+            message (str): Raw SMS body
+            report_id (str): ID of the report the caller will create
+
+        Returns:
+            str: Report ID the message was folded into, or None if the caller
+                won the claim and must create report_id (or release the claim)
+        """
+        if self.window <= 0:
+            return None
+
+        key = self.get_dedup_key(phone_number, message)
+        for _ in range(2):
+            if cache.add(key, report_id, timeout=self.window):
+                return None
+            existing = cache.get(key)
+            if existing:
+                self._count_repeat(key, existing, phone_number)
+                return existing
+            # The claim expired between add() and get(); try again
+        return None
+
+    def release(self, phone_number: str, message: str, report_id: str) -> None:
+        """Give up a claim whose report was not created, so a resend is not folded into nothing"""
+        if self.window <= 0:
+            return
+        key = self.get_dedup_key(phone_number, message)
+        if cache.get(key) == report_id:
+            cache.delete(key)
+
+    def _count_repeat(self, key: str, report_id: str, phone_number: str) -> None:
+        """
+        Increment the report's repeat counter with a single UPDATE and extend
+        the dedup window so a sender who keeps resending stays folded
+
+        The report may not be committed yet when the claim was won moments
+        ago, in which case only the window is extended.
+        """
+        from .models import EmergencyReport
+
+        EmergencyReport.objects.filter(report_id=report_id).update(
+            repeat_count=F('repeat_count') + 1,
+            updated_at=timezone.now()
+        )
+        cache.touch(key, self.window)
+        logger.info(f"Folded repeated SMS from {phone_number} into {report_id}")
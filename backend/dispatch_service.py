@@ -0,0 +1,315 @@
+"""
+Rescuer dispatch service
+Keeps rescuer positions in an in-memory grid index and assigns new emergency
+reports to the nearest available rescuer, balancing open workload
+"""
+
+import math
+import time
+import logging
+import threading
+from collections import Counter, defaultdict
+from datetime import timedelta
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+from django.conf import settings
+from django.db.models import Count
+from django.utils import timezone
+
+from .geo import KM_PER_DEGREE_LAT, grid_cell, haversine_km
+# Reports in these states still occupy the rescuer they are assigned to
+from .models import OPEN_STATUSES
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class RescuerGridIndex:
+    """Uniform lat/lng grid over rescuer positions with O(1) moves and ring-expanding nearest search"""
+
+    def __init__(self, cell_degrees: float = 0.05):
+        self.cell_degrees = cell_degrees
+        self._positions = {}
+        self._cells = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._positions
+
+    def update(self, user_id: int, lat: float, lng: float, updated_at=None) -> None:
+        """Insert or move a rescuer"""
+        previous = self._positions.get(user_id)
+        cell = grid_cell(lat, lng, self.cell_degrees)
+        if previous:
+            previous_cell = grid_cell(previous[0], previous[1], self.cell_degrees)
+            if previous_cell != cell:
+                self._cells[previous_cell].discard(user_id)
+                if not self._cells[previous_cell]:
+                    del self._cells[previous_cell]
+        self._cells[cell].add(user_id)
+        self._positions[user_id] = (lat, lng, updated_at or timezone.now())
+
+    def remove(self, user_id: int) -> None:
+        """Drop a rescuer from the index"""
+        previous = self._positions.pop(user_id, None)
+        if previous:
+            cell = grid_cell(previous[0], previous[1], self.cell_degrees)
+            self._cells[cell].discard(user_id)
+            if not self._cells[cell]:
+                del self._cells[cell]
+
+    def items(self):
+        """Iterate (user_id, (lat, lng, updated_at)) pairs"""
+        return self._positions.items()
+
+    def position(self, user_id: int) -> Optional[Tuple[float, float, object]]:
+        """Return (lat, lng, updated_at) for a rescuer"""
+        return self._positions.get(user_id)
+
+    def nearest(self, lat: float, lng: float, k: int, max_distance_km: float,
+                predicate: Optional[Callable[[int], bool]] = None) -> List[Tuple[float, int]]:
+        """
+        Find the k nearest rescuers within max_distance_km
+
+        Scans rings of grid cells outward from the point and stops as soon as
+        the k-th best distance is closer than anything an outer ring can hold,
+        so work grows with local density rather than with the total rescuer count.
+
+        Args:
+            lat (float): Latitude
+            lng (float): Longitude
+            k (int): Number of rescuers to return
+            max_distance_km (float): Search radius
+            predicate (Callable): Optional filter on user_id (e.g. availability)
+
+        Returns:
+            List[Tuple[float, int]]: (distance_km, user_id), nearest first
+        """
+        if not self._positions or k <= 0:
+            return []
+
+        # Longitude cells are narrowest at the highest latitude the search can reach
+        reach_degrees = max_distance_km / KM_PER_DEGREE_LAT
+        cos_lat = math.cos(math.radians(min(89.0, abs(lat) + reach_degrees)))
+        min_cell_km = self.cell_degrees * KM_PER_DEGREE_LAT * cos_lat
+        max_ring = math.ceil(max_distance_km / min_cell_km) + 1
+        row, col = grid_cell(lat, lng, self.cell_degrees)
+
+        found = []
+        for ring in range(max_ring + 1):
+            for cell_row in range(row - ring, row + ring + 1):
+                step = 1 if abs(cell_row - row) == ring else 2 * ring
+                for cell_col in range(col - ring, col + ring + 1, step):
+                    for user_id in self._cells.get((cell_row, cell_col), ()):
+                        user_lat, user_lng, _ = self._positions[user_id]
+                        distance = haversine_km(lat, lng, user_lat, user_lng)
+                        if distance <= max_distance_km and (predicate is None or predicate(user_id)):
+                            found.append((distance, user_id))
+
+            if len(found) >= k:
+                found.sort()
+                # Anything not yet scanned is at least `ring` full cells away
+                if found[k - 1][0] <= ring * min_cell_km:
+                    break
+
+        found.sort()
+        return found[:k]
+
+
+class RescuerDispatcher:
+    """Nearest-available-rescuer matching over a process-wide rescuer index"""
+
+    def __init__(self):
+        self.cell_degrees = getattr(settings, 'DISPATCH_GRID_CELL_DEGREES', 0.05)
+        self.max_distance_km = getattr(settings, 'DISPATCH_MAX_RADIUS_KM', 50)
+        self.candidate_count = getattr(settings, 'DISPATCH_CANDIDATES', 5)
+        self.max_open_assignments = getattr(settings, 'DISPATCH_MAX_OPEN_ASSIGNMENTS', 3)
+        self.load_penalty_km = getattr(settings, 'DISPATCH_LOAD_PENALTY_KM', 2.0)
+        self.stale_seconds = getattr(settings, 'DISPATCH_RESCUER_STALE_SECONDS', 900)
+        self.refresh_seconds = getattr(settings, 'DISPATCH_REFRESH_SECONDS', 30)
+
+        self.index = RescuerGridIndex(self.cell_degrees)
+        self.open_assignments = Counter()
+        self._lock = threading.RLock()
+        self._refreshed_at = None
+
+    def refresh(self, force: bool = False) -> None:
+        """
+        Rebuild the index and workload counts from the database
+
+        Other workers update their own in-memory index, so each process
+        resyncs every DISPATCH_REFRESH_SECONDS.
+        """
+        if not force and self._refreshed_at is not None and \
+                time.monotonic() - self._refreshed_at < self.refresh_seconds:
+            return
+
+        from .models import EmergencyReport, RescuerLocation
+
+        from .location_buffer import get_location_buffer
+
+        index = RescuerGridIndex(self.cell_degrees)
+        rows = list(RescuerLocation.objects.filter(
+            user__role='rescuer', user__is_active=True
+        ).values('user_id', 'lat', 'lng', 'updated_at'))
+        # Pings from any worker that have not been flushed to the table yet
+        for row in get_location_buffer().overlay(rows):
+            index.update(row['user_id'], row['lat'], row['lng'], row['updated_at'])
+
+        open_assignments = Counter({
+            row['assigned_to']: row['total']
+            for row in EmergencyReport.objects.filter(
+                status__in=OPEN_STATUSES, assigned_to__isnull=False
+            ).values('assigned_to').annotate(total=Count('id'))
+        })
+
+        with self._lock:
+            self.index = index
+            self.open_assignments = open_assignments
+            self._refreshed_at = time.monotonic()
+
+    def update_rescuer(self, user_id: int, lat: float, lng: float, updated_at=None) -> None:
+        """Record a rescuer's latest position"""
+        with self._lock:
+            self.index.update(user_id, lat, lng, updated_at)
+
+    def remove_rescuer(self, user_id: int) -> None:
+        """Stop considering a rescuer for dispatch"""
+        with self._lock:
+            self.index.remove(user_id)
+
+    def available_rescuers(self) -> List[Tuple[int, float, float, int]]:
+        """Return (user_id, lat, lng, open_assignments) for every rescuer that can take more work"""
+        self.refresh()
+        fresh_after = timezone.now() - timedelta(seconds=self.stale_seconds)
+        with self._lock:
+            return [
+                (user_id, lat, lng, self.open_assignments[user_id])
+                for user_id, (lat, lng, updated_at) in self.index.items()
+                if updated_at >= fresh_after and self.open_assignments[user_id] < self.max_open_assignments
+            ]
+
+    def find_candidates(self, lat: float, lng: float, k: Optional[int] = None) -> List[Dict]:
+        """
+        Find available rescuers near a point, best first
+
+        Rescuers are available when their position is fresh and they hold fewer
+        than DISPATCH_MAX_OPEN_ASSIGNMENTS open reports. Among the nearest, each
+        open assignment adds DISPATCH_LOAD_PENALTY_KM to the effective distance.
+
+        Args:
+            lat (float): Latitude
+            lng (float): Longitude
+            k (int): Number of nearby rescuers to consider
+
+        Returns:
+            List[Dict]: 'rescuer_id', 'distance_km', 'open_assignments', 'cost'
+        """
+        self.refresh()
+        fresh_after = timezone.now() - timedelta(seconds=self.stale_seconds)
+
+        with self._lock:
+            index = self.index
+            open_assignments = self.open_assignments
+
+            def is_available(user_id: int) -> bool:
+                return (open_assignments[user_id] < self.max_open_assignments and
+                        index.position(user_id)[2] >= fresh_after)
+
+            nearest = index.nearest(lat, lng, k or self.candidate_count, self.max_distance_km, is_available)
+            candidates = [
+                {
+                    'rescuer_id': user_id,
+                    'distance_km': round(distance, 3),
+                    'open_assignments': open_assignments[user_id],
+                    'cost': round(distance + self.load_penalty_km * open_assignments[user_id], 3),
+                }
+                for distance, user_id in nearest
+            ]
+
+        candidates.sort(key=lambda candidate: (candidate['cost'], candidate['distance_km']))
+        return candidates
+
+    def assign(self, emergency_report, rescuer_id: int, message: str = '', reassign: bool = False) -> bool:
+        """
+        Assign a report to a rescuer with a conditional UPDATE
+
+        Args:
+            emergency_report (EmergencyReport): Report to assign
+            rescuer_id (int): Rescuer user ID
+            message (str): Response log message
+            reassign (bool): Replace an existing assignee instead of skipping
+
+        Returns:
+            bool: True if the assignment was written
+        """
+        from .models import EmergencyReport, EmergencyResponse
+
+        queryset = EmergencyReport.objects.filter(pk=emergency_report.pk, status__in=OPEN_STATUSES)
+        if not reassign:
+            queryset = queryset.filter(assigned_to__isnull=True)
+
+        from .events import get_event_bus
+
+        previous_id = emergency_report.assigned_to_id
+        updated_at = timezone.now()
+        if not queryset.update(assigned_to_id=rescuer_id, updated_at=updated_at):
+            return False
+
+        # QuerySet.update() bypasses post_save, so push the delta explicitly
+        get_event_bus().publish_on_commit('emergency_report', 'updated', {
+            'id': emergency_report.pk,
+            'report_id': emergency_report.report_id,
+            'assigned_to': rescuer_id,
+            'updated_at': updated_at,
+        })
+
+        with self._lock:
+            if previous_id and reassign:
+                self.open_assignments[previous_id] = max(0, self.open_assignments[previous_id] - 1)
+            self.open_assignments[rescuer_id] += 1
+
+        emergency_report.assigned_to_id = rescuer_id
+        EmergencyResponse.objects.create(
+            emergency_report=emergency_report,
+            responder_id=rescuer_id,
+            response_type='update',
+            message=message or f'Emergency report {emergency_report.report_id} assigned'
+        )
+        return True
+
+    def auto_assign(self, emergency_report) -> Optional[Dict]:
+        """
+        Assign a new report to the best nearby available rescuer
+
+        Args:
+            emergency_report (EmergencyReport): Saved report with coordinates
+
+        Returns:
+            Dict: Chosen candidate, or None if nobody suitable is in range
+        """
+        if emergency_report.lat is None or emergency_report.lng is None or emergency_report.assigned_to_id:
+            return None
+
+        try:
+            for candidate in self.find_candidates(emergency_report.lat, emergency_report.lng):
+                message = (f"Auto-assigned to nearest available rescuer "
+                           f"({candidate['distance_km']:.1f} km away)")
+                if self.assign(emergency_report, candidate['rescuer_id'], message):
+                    logger.info(f"Assigned {emergency_report.report_id} to rescuer "
+                                f"{candidate['rescuer_id']} at {candidate['distance_km']:.1f} km")
+                    return candidate
+                # Report was assigned or closed concurrently
+                return None
+        except Exception as e:
+            logger.error(f"Auto-assignment failed for {emergency_report.report_id}: {str(e)}")
+
+        return None
+
+
+@lru_cache(maxsize=None)
+def get_dispatcher() -> RescuerDispatcher:
+    """Return the process-wide dispatcher"""
+    return RescuerDispatcher()
@@ -0,0 +1,321 @@
+"""
+Live event bus
+Fans out report and rescuer changes to server-sent event streams. Events are
+kept in a short replay buffer for Last-Event-ID resumption and relayed across
+workers through Redis pub/sub when REDIS_URL is configured.
+"""
+
+import json
+import queue
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = ('emergency_report', 'crowd_report', 'rescuer_location')
+
+# Streamed to signed-in users only: distress message text and rescuer positions
+AUTHENTICATED_EVENT_TYPES = ('emergency_report', 'rescuer_location')
+
+# Client reconnect delay sent in the stream preamble
+STREAM_RETRY_MS = 3000
+
+# (event id, event type, pre-rendered SSE frame)
+Event = Tuple[int, str, str]
+
+
+def render_event(event_id: int, event_type: str, payload: str) -> str:
+    """Format one server-sent event frame"""
+    return f"id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n"
+
+
+class Subscription:
+    """One stream's queue of pending events, filtered by type"""
+
+    def __init__(self, event_types: Iterable[str], max_pending: int, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.event_types = frozenset(event_types)
+        self.overflowed = False
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=max_pending) if loop else queue.Queue(maxsize=max_pending)
+
+    def push(self, event: Event) -> None:
+        if event[1] not in self.event_types:
+            return
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._put, event)
+        else:
+            self._put(event)
+
+    def _put(self, event: Event) -> None:
+        try:
+            self._queue.put_nowait(event)
+        except (asyncio.QueueFull, queue.Full):
+            # A client this far behind reconnects and replays from its Last-Event-ID
+            self.overflowed = True
+
+    async def next_async(self, timeout: float) -> Optional[Event]:
+        """Wait for the next event on an async subscription"""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def next(self, timeout: float) -> Optional[Event]:
+        """Wait for the next event on a thread subscription"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBus:
+    """In-process fan-out with a replay buffer, optionally relayed through Redis pub/sub"""
+
+    CHANNEL = 'disaster:events'
+
+    def __init__(self, buffer_size: int = 1000, redis_url: str = ''):
+        self._history = deque(maxlen=buffer_size)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._redis = None
+
+        if redis_url:
+            try:
+                import redis
+                self._redis = redis.Redis.from_url(redis_url)
+                threading.Thread(target=self._listen, name='event-bus-relay', daemon=True).start()
+            except Exception as e:
+                logger.error(f"Redis event relay unavailable, events stay in-process: {str(e)}")
+                self._redis = None
+
+    def publish(self, event_type: str, action: str, data: Dict) -> None:
+        """
+        Publish a change to every subscribed stream
+
+        Args:
+            event_type (str): One of EVENT_TYPES
+            action (str): 'created' or 'updated'
+            data (Dict): JSON-serializable payload
+        """
+        payload = json.dumps(dict(data, action=action), cls=DjangoJSONEncoder)
+
+        if self._redis is not None:
+            try:
+                event_id = self._redis.incr(f"{self.CHANNEL}:id")
+                self._redis.publish(self.CHANNEL, json.dumps([event_id, event_type, payload]))
+                return
+            except Exception as e:
+                logger.error(f"Redis publish failed, delivering locally: {str(e)}")
+
+        with self._lock:
+            self._next_id += 1
+            event_id = self._next_id
+        self._dispatch((event_id, event_type, render_event(event_id, event_type, payload)))
+
+    def publish_on_commit(self, event_type: str, action: str, data: Dict) -> None:
+        """Publish once the surrounding transaction commits (immediately outside one)"""
+        transaction.on_commit(lambda: self.publish(event_type, action, data))
+
+    def _dispatch(self, event: Event) -> None:
+        with self._lock:
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.push(event)
+
+    def _listen(self) -> None:
+        """Relay events published by any worker into this process"""
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.CHANNEL)
+                for message in pubsub.listen():
+                    event_id, event_type, payload = json.loads(message['data'])
+                    with self._lock:
+                        self._next_id = max(self._next_id, event_id)
+                    self._dispatch((event_id, event_type, render_event(event_id, event_type, payload)))
+            except Exception as e:
+                logger.error(f"Event relay disconnected: {str(e)}")
+                time.sleep(1)
+
+    def subscribe(self, event_types: Iterable[str], max_pending: int,
+                  loop: Optional[asyncio.AbstractEventLoop] = None) -> Subscription:
+        """Register a stream; pass the running loop for async consumers"""
+        subscription = Subscription(event_types, max_pending, loop)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def last_event_id(self) -> int:
+        """Newest event id this process has seen"""
+        with self._lock:
+            return self._next_id
+
+    def replay(self, last_event_id: Optional[int], event_types: Iterable[str]) -> List[Event]:
+        """Buffered events after last_event_id, oldest first"""
+        if last_event_id is None:
+            return []
+        event_types = frozenset(event_types)
+        with self._lock:
+            return [event for event in self._history if event[0] > last_event_id and event[1] in event_types]
+
+
+def _stream_preamble(bus: EventBus, event_types: Iterable[str], last_event_id: Optional[int]) -> Tuple[List[str], set]:
+    """Opening frames for a stream: reconnect delay, current position, then missed events"""
+    frames = [f"retry: {STREAM_RETRY_MS}\n\n"]
+    replayed = set()
+    for event in bus.replay(last_event_id, event_types):
+        replayed.add(event[0])
+        frames.append(event[2])
+    # A bare id frame sets the client's Last-Event-ID even if nothing arrives before it reconnects
+    frames.append(f"id: {bus.last_event_id}\n\n")
+    return frames, replayed
+
+
+def stream_events(bus: EventBus, event_types: Iterable[str], last_event_id: Optional[int],
+                  heartbeat: float, max_pending: int, max_seconds: float) -> Iterator[str]:
+    """
+    Blocking SSE generator for WSGI workers
+
+    Ends after max_seconds so a long-lived dashboard cannot pin a sync worker;
+    EventSource reconnects and resumes from its Last-Event-ID.
+    """
+    subscription = bus.subscribe(event_types, max_pending)
+    deadline = time.monotonic() + max_seconds
+    try:
+        frames, replayed = _stream_preamble(bus, event_types, last_event_id)
+        yield from frames
+        while not subscription.overflowed:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            event = subscription.next(min(heartbeat, remaining))
+            if event is None:
+                yield ": keep-alive\n\n"
+            elif event[0] not in replayed:
+                yield event[2]
+    finally:
+        bus.unsubscribe(subscription)
+
+
+class BoundedStream:
+    """
+    SSE iterator that holds one of a limited number of stream slots
+
+    The slot is released when the server closes the response, which also
+    happens for a client that disconnects before the first frame.
+    """
+
+    def __init__(self, frames: Iterator[str], slots: threading.BoundedSemaphore):
+        self._frames = frames
+        self._slots = slots
+        self._held = True
+
+    def __iter__(self) -> 'BoundedStream':
+        return self
+
+    def __next__(self) -> str:
+        return next(self._frames)
+
+    def close(self) -> None:
+        if self._held:
+            self._held = False
+            self._frames.close()
+            self._slots.release()
+
+
+@lru_cache(maxsize=None)
+def get_stream_slots() -> threading.BoundedSemaphore:
+    """Per-process cap on concurrent WSGI streams"""
+    return threading.BoundedSemaphore(getattr(settings, 'EVENT_STREAM_MAX_WSGI_STREAMS', 8))
+
+
+async def astream_events(bus: EventBus, event_types: Iterable[str], last_event_id: Optional[int],
+                         heartbeat: float, max_pending: int) -> AsyncIterator[str]:
+    """Non-blocking SSE generator for ASGI; runs until the client disconnects or falls behind"""
+    subscription = bus.subscribe(event_types, max_pending, asyncio.get_running_loop())
+    try:
+        frames, replayed = _stream_preamble(bus, event_types, last_event_id)
+        for frame in frames:
+            yield frame
+        while not subscription.overflowed:
+            event = await subscription.next_async(heartbeat)
+            if event is None:
+                yield ": keep-alive\n\n"
+            elif event[0] not in replayed:
+                yield event[2]
+    finally:
+        bus.unsubscribe(subscription)
+
+
+@lru_cache(maxsize=None)
+def get_event_bus() -> EventBus:
+    """Return the process-wide event bus"""
+    return EventBus(
+        buffer_size=getattr(settings, 'EVENT_REPLAY_BUFFER_SIZE', 1000),
+        redis_url=getattr(settings, 'REDIS_URL', '')
+    )
+
+
+def mask_phone_number(phone_number: str) -> str:
+    """Phone number with all but the last four digits hidden"""
+    phone_number = phone_number or ''
+    return '*' * max(len(phone_number) - 4, 0) + phone_number[-4:]
+
+
+def emergency_report_payload(report) -> Dict:
+    """
+    Compact EmergencyReport delta for live dashboards
+
+    Only signed-in users receive these events, as they carry the message text
+    (first 280 characters); the caller's phone number is still masked and
+    raw_data is left out.
+    """
+    return {
+        'id': report.pk,
+        'report_id': report.report_id,
+        'channel': report.channel,
+        'phone_masked': mask_phone_number(report.phone_number),
+        'category': report.category,
+        'severity': report.severity,
+        'status': report.status,
+        'priority_score': report.priority_score,
+        'description': (report.description or '')[:280],
+        'lat': report.lat,
+        'lng': report.lng,
+        'district': report.district,
+        'state': report.state,
+        'assigned_to': report.assigned_to_id,
+        'repeat_count': report.repeat_count,
+        'created_at': report.created_at,
+        'updated_at': report.updated_at,
+    }
+
+
+def crowd_report_payload(report) -> Dict:
+    """CrowdReport delta for live dashboards"""
+    return {
+        'id': report.id,
+        'category': report.category,
+        'severity': report.severity,
+        'note': report.note,
+        'lat': report.lat,
+        'lng': report.lng,
+        'thumbnail': report.thumbnail.url if report.thumbnail else None,
+        'created_at': report.created_at,
+    }
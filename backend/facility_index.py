@@ -0,0 +1,142 @@
+"""
+Nearest emergency facility lookup
+Hospitals, police and fire stations and district disaster management offices
+loaded once from a local file and indexed in per-type haversine ball trees
+"""
+
+import csv
+import logging
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from django.conf import settings
+from sklearn.neighbors import BallTree
+
+from .geo import EARTH_RADIUS_KM
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+FACILITY_TYPES = {
+    'hospital': 'Hospital',
+    'police': 'Police Station',
+    'fire': 'Fire Station',
+    'ddma': 'District Disaster Management Authority',
+}
+
+FACILITY_FIELDS = ('name', 'type', 'lat', 'lng', 'phone', 'address', 'district', 'state')
+
+
+class FacilityDataUnavailable(RuntimeError):
+    """Raised when no facility dataset is loaded, instead of answering with placeholders"""
+
+
+class FacilityIndex:
+    """k-nearest facility queries by great-circle distance, one ball tree per facility type"""
+
+    def __init__(self, facilities: Iterable[Dict]):
+        grouped = {}
+        for facility in facilities:
+            grouped.setdefault(facility['type'], []).append(facility)
+
+        self._facilities = {}
+        self._trees = {}
+        for facility_type, records in grouped.items():
+            coordinates = np.radians([[record['lat'], record['lng']] for record in records])
+            self._facilities[facility_type] = records
+            self._trees[facility_type] = BallTree(coordinates, metric='haversine')
+
+    def __len__(self) -> int:
+        return sum(len(records) for records in self._facilities.values())
+
+    @classmethod
+    def from_csv(cls, path: str) -> 'FacilityIndex':
+        """
+        Load facilities from a CSV with columns name, type, lat, lng and
+        optionally phone, address, district, state
+
+        Rows with an unknown type or unparseable coordinates are skipped.
+        """
+        facilities = []
+        skipped = 0
+        with open(path, newline='', encoding='utf-8') as facilities_file:
+            for row in csv.DictReader(facilities_file):
+                facility_type = (row.get('type') or '').strip().lower()
+                try:
+                    lat, lng = float(row['lat']), float(row['lng'])
+                except (KeyError, TypeError, ValueError):
+                    skipped += 1
+                    continue
+                if facility_type not in FACILITY_TYPES:
+                    skipped += 1
+                    continue
+                facility = {field: (row.get(field) or '').strip() for field in FACILITY_FIELDS}
+                facility.update(type=facility_type, lat=lat, lng=lng)
+                facilities.append(facility)
+
+        if skipped:
+            logger.warning(f"Skipped {skipped} invalid facility rows in {path}")
+        return cls(facilities)
+
+    def nearest(self, lat: float, lng: float, k: int = 3,
+                facility_types: Optional[Iterable[str]] = None) -> Dict[str, List[Dict]]:
+        """
+        Find the k nearest facilities of each type
+
+        Args:
+            lat (float): Latitude
+            lng (float): Longitude
+            k (int): Facilities to return per type
+            facility_types (Iterable[str]): Restrict to these types (default: all)
+
+        Returns:
+            Dict[str, List[Dict]]: Facilities per type, nearest first, each with 'distance_km'
+        """
+        point = np.radians([[lat, lng]])
+        results = {}
+        for facility_type in facility_types or FACILITY_TYPES:
+            tree = self._trees.get(facility_type)
+            if tree is None:
+                results[facility_type] = []
+                continue
+            records = self._facilities[facility_type]
+            distances, indices = tree.query(point, k=min(k, len(records)))
+            results[facility_type] = [
+                dict(records[index], distance_km=round(float(distance) * EARTH_RADIUS_KM, 3))
+                for distance, index in zip(distances[0], indices[0])
+            ]
+        return results
+
+
+@lru_cache(maxsize=None)
+def get_facility_index() -> FacilityIndex:
+    """Return the process-wide facility index, loading EMERGENCY_FACILITIES_PATH on first use"""
+    path = getattr(settings, 'EMERGENCY_FACILITIES_PATH', None)
+    if not path:
+        logger.error("EMERGENCY_FACILITIES_PATH is not set; nearest facility lookups are disabled")
+        return FacilityIndex([])
+
+    try:
+        index = FacilityIndex.from_csv(path)
+        logger.info(f"Indexed {len(index)} emergency facilities from {path}")
+        return index
+    except FileNotFoundError:
+        logger.error(f"Emergency facilities file {path} not found; nearest facility lookups are disabled")
+    except (OSError, ValueError) as e:
+        logger.error(f"Failed to load emergency facilities {path}: {str(e)}")
+    return FacilityIndex([])
+
+
+def require_facility_index() -> FacilityIndex:
+    """
+    Return the facility index, which must hold at least one facility
+
+    Raises:
+        FacilityDataUnavailable: If EMERGENCY_FACILITIES_PATH is unset, missing or empty
+    """
+    index = get_facility_index()
+    if not len(index):
+        raise FacilityDataUnavailable(
+            'No emergency facility data is loaded; set EMERGENCY_FACILITIES_PATH to a facilities CSV'
+        )
+    return index
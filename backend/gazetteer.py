@@ -0,0 +1,248 @@
+"""
+Offline gazetteer for resolving free-text Indian place names
+Loads states, districts and major cities from the bundled CSV, plus any
+tehsil/village files configured in LOCATION_GAZETTEER_EXTRA_PATHS, and indexes
+them by token phrase so addresses resolve in one left-to-right pass
+"""
+
+import re
+import csv
+import difflib
+import logging
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from django.conf import settings
+
+from .sms_parser import WORD_CHARS, normalize_text
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# More specific place types win when several names appear in one address
+TYPE_RANK = {
+    'state': 1,
+    'district': 2,
+    'city': 3,
+    'tehsil': 3,
+    'village': 4,
+}
+
+MIN_FUZZY_TOKEN_LENGTH = 5
+FUZZY_CUTOFF = 0.85
+FUZZY_CACHE_SIZE = 8192
+SHORT_NAME_LENGTH = 3  # 'Mon', 'Mau', 'Una', 'Leh' also occur as ordinary words
+
+_TOKEN = re.compile(f'[{WORD_CHARS}]+')
+
+
+class GazetteerEntry(NamedTuple):
+    name: str
+    type: str
+    district: str
+    state: str
+
+
+class GazetteerMatch(NamedTuple):
+    entry: GazetteerEntry
+    position: int
+    exact: bool
+    surface: str
+
+
+class Gazetteer:
+    """Token-phrase index over place names with a fuzzy fallback for misspellings"""
+
+    def __init__(self):
+        self._phrases = {}
+        self._fuzzy_candidates = defaultdict(list)
+        self.max_phrase_length = 1
+        self.entry_count = 0
+        # Address vocabulary repeats heavily ('road', 'market', 'near'), so misses are cached too
+        self._fuzzy_lookup = lru_cache(maxsize=FUZZY_CACHE_SIZE)(self._closest_name)
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """Split normalized text into word tokens"""
+        return _TOKEN.findall(normalize_text(text))
+
+    def add(self, entry: GazetteerEntry, aliases: Tuple[str, ...] = ()) -> None:
+        """
+        Index a place under its name and aliases
+
+        Args:
+            entry (GazetteerEntry): Place record
+            aliases (tuple): Alternate spellings, old names or native-script names
+        """
+        self.entry_count += 1
+        for surface in (entry.name,) + tuple(aliases):
+            tokens = tuple(self.tokenize(surface))
+            if not tokens:
+                continue
+            self._phrases.setdefault(tokens, []).append(entry)
+            self.max_phrase_length = max(self.max_phrase_length, len(tokens))
+            if len(tokens) == 1 and len(tokens[0]) >= MIN_FUZZY_TOKEN_LENGTH and tokens[0].isascii():
+                self._fuzzy_candidates[(tokens[0][0], len(tokens[0]))].append(tokens[0])
+
+    @classmethod
+    def from_csv(cls, path: str) -> 'Gazetteer':
+        """
+        Load a gazetteer file with columns name, type, district, state, aliases
+
+        Aliases are separated by '|'. Rows may describe states, districts,
+        cities, tehsils or villages.
+        """
+        gazetteer = cls()
+        gazetteer.load_csv(path)
+        return gazetteer
+
+    def load_csv(self, path: str) -> int:
+        """
+        Add the rows of another gazetteer file (same columns as from_csv)
+
+        The file is streamed, so sub-district and village lists with hundreds
+        of thousands of rows load without holding the file in memory. Rows
+        without a name, type or state are skipped.
+
+        Returns:
+            int: Places added
+        """
+        added = skipped = 0
+        with open(path, newline='', encoding='utf-8') as gazetteer_file:
+            for row in csv.DictReader(gazetteer_file):
+                name, place_type, state = ((row.get(column) or '').strip() for column in ('name', 'type', 'state'))
+                if not (name and place_type and state):
+                    skipped += 1
+                    continue
+                entry = GazetteerEntry(
+                    name=name,
+                    type=place_type.lower(),
+                    district=(row.get('district') or '').strip(),
+                    state=state
+                )
+                aliases = tuple(alias.strip() for alias in (row.get('aliases') or '').split('|') if alias.strip())
+                self.add(entry, aliases)
+                added += 1
+
+        if skipped:
+            logger.warning(f"Skipped {skipped} incomplete gazetteer rows in {path}")
+        return added
+
+    def _closest_name(self, token: str) -> Optional[str]:
+        candidates = []
+        for length in range(len(token) - 2, len(token) + 3):
+            candidates.extend(self._fuzzy_candidates.get((token[0], length), ()))
+        close = difflib.get_close_matches(token, candidates, n=1, cutoff=FUZZY_CUTOFF)
+        return close[0] if close else None
+
+    def find_matches(self, text: str) -> List[GazetteerMatch]:
+        """
+        Find every place named in text
+
+        Scans tokens left to right taking the longest known phrase at each
+        position; long Latin tokens with no exact match are tried against
+        similarly spelled single-word names.
+
+        Args:
+            text (str): Free-text address or message
+
+        Returns:
+            List[GazetteerMatch]: Matches in text order
+        """
+        tokens = self.tokenize(text)
+        matches = []
+        position = 0
+
+        while position < len(tokens):
+            matched_length = 0
+            for length in range(min(self.max_phrase_length, len(tokens) - position), 0, -1):
+                entries = self._phrases.get(tuple(tokens[position:position + length]))
+                if entries:
+                    surface = ' '.join(tokens[position:position + length])
+                    matches.extend(GazetteerMatch(entry, position, True, surface) for entry in entries)
+                    matched_length = length
+                    break
+
+            if not matched_length:
+                token = tokens[position]
+                if len(token) >= MIN_FUZZY_TOKEN_LENGTH and token.isascii() and not token.isdigit():
+                    close = self._fuzzy_lookup(token)
+                    if close:
+                        matches.extend(GazetteerMatch(entry, position, False, close)
+                                       for entry in self._phrases[(close,)])
+                matched_length = 1
+
+            position += matched_length
+
+        return matches
+
+    def resolve(self, text: str) -> Optional[Dict]:
+        """
+        Resolve free text to the most specific place it names
+
+        Places in a state that is also mentioned win over same-named places
+        elsewhere (e.g. 'Aurangabad, Bihar'); then villages win over
+        tehsils/cities over districts over states, and exact over fuzzy
+        matches. Very short names only count when their state is mentioned.
+
+        Args:
+            text (str): Free-text address
+
+        Returns:
+            Dict: 'state', 'district' ('Unknown' for a bare state), 'place', 'match'
+        """
+        if not text:
+            return None
+
+        matches = self.find_matches(text)
+        if not matches:
+            return None
+
+        mentioned_states = {match.entry.state for match in matches if match.entry.type == 'state'}
+
+        def rank(match: GazetteerMatch):
+            in_mentioned_state = match.entry.state in mentioned_states
+            return (
+                not mentioned_states or in_mentioned_state,
+                len(match.surface) > SHORT_NAME_LENGTH or in_mentioned_state,
+                TYPE_RANK.get(match.entry.type, 0),
+                match.exact,
+                -match.position,
+            )
+
+        best = max(matches, key=rank)
+        return {
+            'state': best.entry.state,
+            'district': best.entry.district or 'Unknown',
+            'place': best.entry.name,
+            'match': 'exact' if best.exact else 'fuzzy'
+        }
+
+    def place_names(self, min_length: int = 0) -> Dict[str, Dict]:
+        """Map every indexed name and alias to its state/district (first entry wins)"""
+        names = {}
+        for tokens, entries in self._phrases.items():
+            if len(' '.join(tokens)) < min_length:
+                continue
+            entry = entries[0]
+            names[' '.join(tokens)] = {'state': entry.state, 'district': entry.district or 'Unknown'}
+        return names
+
+
+@lru_cache(maxsize=None)
+def get_gazetteer() -> Gazetteer:
+    """
+    Return the process-wide gazetteer, loading LOCATION_GAZETTEER_PATH and then
+    every LOCATION_GAZETTEER_EXTRA_PATHS file on first use
+    """
+    gazetteer = Gazetteer()
+    paths = [getattr(settings, 'LOCATION_GAZETTEER_PATH', None)]
+    paths += list(getattr(settings, 'LOCATION_GAZETTEER_EXTRA_PATHS', []))
+
+    for path in filter(None, paths):
+        try:
+            added = gazetteer.load_csv(path)
+            logger.info(f"Loaded {added} places from gazetteer {path}")
+        except (OSError, csv.Error) as e:
+            logger.error(f"Failed to load gazetteer {path}: {str(e)}")
+    return gazetteer
@@ -0,0 +1,143 @@
+"""
+Geographic helpers shared by the location, facility and dispatch services
+"""
+
+import math
+from typing import List, Optional, Tuple
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = math.pi * EARTH_RADIUS_KM / 180
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """
+    Great-circle distance between two points
+
+    Args:
+        lat1 (float): Latitude of the first point
+        lng1 (float): Longitude of the first point
+        lat2 (float): Latitude of the second point
+        lng2 (float): Longitude of the second point
+
+    Returns:
+        float: Distance in kilometres
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    half_dphi = (phi2 - phi1) / 2
+    half_dlambda = math.radians(lng2 - lng1) / 2
+    a = math.sin(half_dphi) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(half_dlambda) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def grid_cell(lat: float, lng: float, cell_degrees: float) -> Tuple[int, int]:
+    """Integer (row, column) of the grid cell containing a point"""
+    return math.floor(lat / cell_degrees), math.floor(lng / cell_degrees)
+
+
+def haversine_km_matrix(lats1, lngs1, lats2, lngs2) -> np.ndarray:
+    """
+    Pairwise great-circle distances between two point sets
+
+    Args:
+        lats1, lngs1: Coordinates of the first set (length n)
+        lats2, lngs2: Coordinates of the second set (length m)
+
+    Returns:
+        np.ndarray: n x m distances in kilometres
+    """
+    phi1 = np.radians(np.asarray(lats1, dtype=float))[:, None]
+    phi2 = np.radians(np.asarray(lats2, dtype=float))[None, :]
+    lambda1 = np.radians(np.asarray(lngs1, dtype=float))[:, None]
+    lambda2 = np.radians(np.asarray(lngs2, dtype=float))[None, :]
+    a = np.sin((phi2 - phi1) / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin((lambda2 - lambda1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# Stored precision: cells of roughly 5 m x 5 m
+GEOHASH_PRECISION = 9
+
+
+def geohash_encode(lat: float, lng: float, precision: int = GEOHASH_PRECISION) -> str:
+    """
+    Geohash of a point
+
+    Points in the same cell share a prefix, so a prefix is a contiguous key range
+    in an ordinary B-tree index on the geohash column.
+    """
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits, value, even = 0, 0, True
+    while len(chars) < precision:
+        interval, coordinate = (lng_range, lng) if even else (lat_range, lat)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def geohash_cell_size(precision: int) -> Tuple[float, float]:
+    """(height, width) in degrees of a geohash cell"""
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def geohash_successor(prefix: str) -> Optional[str]:
+    """Smallest string greater than every geohash starting with prefix (None past the last cell)"""
+    chars = list(prefix)
+    while chars:
+        index = GEOHASH_ALPHABET.index(chars[-1])
+        if index + 1 < len(GEOHASH_ALPHABET):
+            chars[-1] = GEOHASH_ALPHABET[index + 1]
+            return ''.join(chars)
+        chars.pop()
+    return None
+
+
+def geohash_ranges(south: float, west: float, north: float, east: float,
+                   max_cells: int = 32) -> List[Tuple[str, Optional[str]]]:
+    """
+    Key ranges of the geohash cells covering a bounding box
+
+    Uses the finest precision that covers the box with at most max_cells
+    cells, and merges cells that are adjacent in key order.
+
+    Returns:
+        List[Tuple[str, Optional[str]]]: [start, end) ranges; end None means unbounded
+    """
+    south, north = max(-90.0, min(south, north)), min(90.0, max(south, north))
+    west, east = max(-180.0, min(west, east)), min(180.0, max(west, east))
+
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = geohash_cell_size(precision)
+        first_row, last_row = math.floor((south + 90) / height), math.floor((north + 90) / height)
+        first_col, last_col = math.floor((west + 180) / width), math.floor((east + 180) / width)
+        if (last_row - first_row + 1) * (last_col - first_col + 1) <= max_cells:
+            break
+
+    prefixes = sorted({
+        geohash_encode(min(90.0, (row + 0.5) * height - 90), min(180.0, (col + 0.5) * width - 180), precision)
+        for row in range(first_row, last_row + 1)
+        for col in range(first_col, last_col + 1)
+    })
+
+    ranges = []
+    for prefix in prefixes:
+        end = geohash_successor(prefix)
+        if ranges and ranges[-1][1] == prefix:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((prefix, end))
+    return ranges
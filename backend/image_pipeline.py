@@ -0,0 +1,162 @@
+"""
+Crowd report photo pipeline
+Re-encodes uploaded photos at bounded dimensions without EXIF metadata and
+writes a thumbnail, in a small worker pool after the upload has committed, so
+map and list views never have to download full-size phone photos
+"""
+
+import io
+import os
+import atexit
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+from .models import CrowdReport
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Pillow format name -> file extension
+FORMAT_EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg'}
+
+
+def output_format() -> str:
+    """PHOTO_FORMAT, falling back to JPEG when Pillow was built without WebP"""
+    image_format = getattr(settings, 'PHOTO_FORMAT', 'WEBP').upper()
+    if image_format not in FORMAT_EXTENSIONS or (image_format == 'WEBP' and not features.check('webp')):
+        return 'JPEG'
+    return image_format
+
+
+def encode_image(image: Image.Image, max_dimension: int, image_format: str, quality: int) -> bytes:
+    """Downscale an image to fit max_dimension and encode it without metadata"""
+    image = image.copy()
+    image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    # No exif= argument, so nothing from the original (GPS, device) is carried over
+    image.save(buffer, format=image_format, quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def render_photo(data: bytes) -> Tuple[bytes, bytes, str]:
+    """
+    Produce the stored photo and thumbnail for an upload
+
+    Args:
+        data (bytes): Uploaded image file
+
+    Returns:
+        Tuple[bytes, bytes, str]: (photo, thumbnail, file extension)
+
+    Raises:
+        ValueError: If the upload is not a readable image
+    """
+    max_dimension = getattr(settings, 'PHOTO_MAX_DIMENSION', 1600)
+    thumbnail_dimension = getattr(settings, 'PHOTO_THUMBNAIL_DIMENSION', 320)
+    quality = getattr(settings, 'PHOTO_QUALITY', 80)
+    image_format = output_format()
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            # Let the JPEG decoder skip detail the output cannot use
+            image.draft('RGB', (max_dimension, max_dimension))
+            # Apply the camera orientation before the EXIF tag is dropped
+            image = ImageOps.exif_transpose(image).convert('RGB')
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise ValueError(f'Unreadable image: {str(e)}')
+
+    photo = encode_image(image, max_dimension, image_format, quality)
+    thumbnail = encode_image(image, thumbnail_dimension, image_format, quality)
+    return photo, thumbnail, FORMAT_EXTENSIONS[image_format]
+
+
+def process_report_photo(report_id: int) -> bool:
+    """
+    Replace a crowd report's uploaded photo with the processed version and add its thumbnail
+
+    Args:
+        report_id (int): CrowdReport ID
+
+    Returns:
+        bool: True if the report was updated
+    """
+    report = CrowdReport.objects.filter(pk=report_id).only('id', 'photo', 'thumbnail').first()
+    if report is None or not report.photo or report.thumbnail:
+        return False
+
+    original = report.photo.name
+    storage = report.photo.storage
+    with report.photo.open('rb') as f:
+        data = f.read()
+    photo, thumbnail, extension = render_photo(data)
+
+    stem = os.path.splitext(os.path.basename(original))[0]
+    photo_name = storage.save(f"reports/{stem}.{extension}", ContentFile(photo))
+    thumbnail_name = storage.save(f"reports/thumbs/{stem}.{extension}", ContentFile(thumbnail))
+
+    # Conditional on the original so a photo replaced meanwhile is not overwritten
+    updated = CrowdReport.objects.filter(pk=report_id, photo=original).update(
+        photo=photo_name, thumbnail=thumbnail_name, updated_at=timezone.now()
+    )
+    if not updated:
+        storage.delete(photo_name)
+        storage.delete(thumbnail_name)
+        return False
+
+    if photo_name != original:
+        storage.delete(original)
+    logger.info(f"Processed photo for crowd report {report_id}: {len(data)} -> {len(photo)} bytes "
+                f"(+{len(thumbnail)} byte thumbnail)")
+
+    from .events import crowd_report_payload, get_event_bus
+    get_event_bus().publish('crowd_report', 'updated', crowd_report_payload(CrowdReport.objects.get(pk=report_id)))
+    return True
+
+
+class PhotoPipeline:
+    """Bounded worker pool for photo processing, off the request path"""
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or getattr(settings, 'PHOTO_PIPELINE_WORKERS', 2)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='photo-pipeline')
+
+    def submit(self, report_id: int) -> Future:
+        """Queue a report's photo for processing"""
+        return self._executor.submit(self._run, report_id)
+
+    @staticmethod
+    def _run(report_id: int) -> bool:
+        try:
+            return process_report_photo(report_id)
+        except Exception as e:
+            logger.error(f"Photo processing failed for crowd report {report_id}: {str(e)}")
+            return False
+        finally:
+            close_old_connections()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work, by default finishing what is queued"""
+        self._executor.shutdown(wait=wait)
+
+
+@lru_cache(maxsize=None)
+def get_photo_pipeline() -> PhotoPipeline:
+    """Return the process-wide pipeline, draining it on interpreter exit"""
+    pipeline = PhotoPipeline()
+    atexit.register(pipeline.shutdown)
+    return pipeline
+
+
+def schedule_photo_processing(report) -> None:
+    """Process a saved report's photo once the surrounding transaction commits"""
+    if not getattr(settings, 'PHOTO_PIPELINE_ENABLED', True) or not report.photo or report.thumbnail:
+        return
+    report_id = report.pk
+    transaction.on_commit(lambda: get_photo_pipeline().submit(report_id))
@@ -0,0 +1,263 @@
+"""
+Incident clustering service
+Groups crowd and emergency reports into incidents as they arrive: a report
+joins an active incident of the same category whose centroid is within
+INCIDENT_RADIUS_KM and which saw a report in the last INCIDENT_WINDOW_MINUTES.
+Incidents quiet for longer than the window are resolved.
+"""
+
+import math
+import logging
+from datetime import timedelta
+from functools import lru_cache
+from typing import Iterable, List, Optional
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from .geo import KM_PER_DEGREE_LAT, grid_cell, haversine_km
+from .models import OPEN_STATUSES, CrowdReport, EmergencyReport, Incident, IncidentCellLock
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Packs a (row, column) grid cell into one indexed integer
+CELL_KEY_STRIDE = 10_000_000
+
+
+class IncidentClusterer:
+    """
+    Online DBSCAN-style clustering over a grid of incident centroids
+
+    Candidate incidents are looked up by grid bucket, so each report costs a
+    few indexed queries however many incidents exist. A report within range
+    of several incidents joins the largest and merges the others into it,
+    which is how clusters that grew towards each other become one incident.
+    Each report first locks the cell rows of its neighbourhood, so two reports
+    close enough to share an incident never both find none and create two.
+    """
+
+    def __init__(self):
+        self.radius_km = getattr(settings, 'INCIDENT_RADIUS_KM', 1.0)
+        self.window = timedelta(minutes=getattr(settings, 'INCIDENT_WINDOW_MINUTES', 120))
+        self.cell_degrees = getattr(settings, 'INCIDENT_CELL_DEGREES', 0.01)
+
+    def cell_key(self, lat: float, lng: float) -> int:
+        row, col = grid_cell(lat, lng, self.cell_degrees)
+        return row * CELL_KEY_STRIDE + col
+
+    def nearby_cells(self, lat: float, lng: float) -> List[int]:
+        """Keys of every grid cell a centroid within radius_km could be in"""
+        row, col = grid_cell(lat, lng, self.cell_degrees)
+        cell_km = self.cell_degrees * KM_PER_DEGREE_LAT
+        # Longitude cells are narrowest at the highest latitude the radius can reach
+        cos_lat = math.cos(math.radians(min(89.0, abs(lat) + self.radius_km / KM_PER_DEGREE_LAT)))
+        row_reach = math.ceil(self.radius_km / cell_km)
+        col_reach = math.ceil(self.radius_km / (cell_km * cos_lat))
+        return [
+            (row + d_row) * CELL_KEY_STRIDE + col + d_col
+            for d_row in range(-row_reach, row_reach + 1)
+            for d_col in range(-col_reach, col_reach + 1)
+        ]
+
+    def add_report(self, report) -> Optional[Incident]:
+        """
+        Attach a saved report to its incident, creating or merging incidents as needed
+
+        Args:
+            report (EmergencyReport | CrowdReport): Saved report
+
+        Returns:
+            Incident: The report's incident, or None if it has no coordinates
+        """
+        if report.lat is None or report.lng is None:
+            return None
+
+        seen_at = report.created_at or timezone.now()
+        severity = report.severity or 0
+
+        cells = self.nearby_cells(report.lat, report.lng)
+
+        with transaction.atomic():
+            self._lock_cells(report.category, cells)
+            # Incidents in this neighbourhood that went quiet are closed as they are passed over
+            Incident.objects.filter(
+                category=report.category, status='active', cell__in=cells, last_seen_at__lt=seen_at - self.window
+            ).update(status='resolved', updated_at=timezone.now())
+            candidates = Incident.objects.select_for_update().filter(
+                category=report.category,
+                status='active',
+                cell__in=cells,
+                last_seen_at__gte=seen_at - self.window,
+            )
+            near = [
+                incident for incident in candidates
+                if haversine_km(incident.lat, incident.lng, report.lat, report.lng) <= self.radius_km
+            ]
+
+            if near:
+                near.sort(key=lambda incident: (-incident.report_count, incident.id))
+                incident = near[0]
+                for other in near[1:]:
+                    self._absorb(incident, other)
+            else:
+                incident = Incident(
+                    category=report.category,
+                    first_seen_at=seen_at,
+                    last_seen_at=seen_at,
+                    district=getattr(report, 'district', None),
+                    state=getattr(report, 'state', None),
+                )
+
+            incident.lat_sum += report.lat
+            incident.lng_sum += report.lng
+            incident.report_count += 1
+            incident.max_severity = max(incident.max_severity, severity)
+            incident.first_seen_at = min(incident.first_seen_at, seen_at)
+            incident.last_seen_at = max(incident.last_seen_at, seen_at)
+            self._recentre(incident)
+            incident.save()
+
+            # update() keeps post_save (and this clusterer) from firing again
+            type(report).objects.filter(pk=report.pk).update(incident=incident, updated_at=timezone.now())
+            report.incident = incident
+
+        return incident
+
+    def remove_report(self, report) -> None:
+        """Take a deleted report's contribution out of its incident, deleting the incident once empty"""
+        if report.incident_id is None or report.lat is None or report.lng is None:
+            return
+
+        with transaction.atomic():
+            incident = Incident.objects.select_for_update().filter(pk=report.incident_id).first()
+            if incident is None:
+                return
+            if incident.report_count <= 1:
+                incident.delete()
+                return
+
+            incident.lat_sum -= report.lat
+            incident.lng_sum -= report.lng
+            incident.report_count -= 1
+            self._recentre(incident)
+
+            # Severity and time span are extremes, so they are recomputed from the remaining members
+            members = [
+                model.objects.filter(incident=incident).aggregate(
+                    severity=Max('severity'), first=Min('created_at'), last=Max('created_at')
+                )
+                for model in (EmergencyReport, CrowdReport)
+            ]
+            members = [member for member in members if member['first'] is not None]
+            if members:
+                incident.max_severity = max(member['severity'] or 0 for member in members)
+                incident.first_seen_at = min(member['first'] for member in members)
+                incident.last_seen_at = max(member['last'] for member in members)
+            incident.save()
+
+    def resolve_stale_incidents(self) -> int:
+        """
+        Resolve active incidents with no report in the last INCIDENT_WINDOW_MINUTES
+
+        Returns:
+            int: Incidents resolved
+        """
+        now = timezone.now()
+        resolved = Incident.objects.filter(status='active', last_seen_at__lt=now - self.window).update(
+            status='resolved', updated_at=now
+        )
+        if resolved:
+            logger.info(f"Resolved {resolved} incidents with no reports since {now - self.window}")
+        return resolved
+
+    def _lock_cells(self, category: str, cells: List[int]) -> None:
+        """Lock the cell rows (created on first use) in key order, so overlapping neighbourhoods queue up without deadlocking"""
+        IncidentCellLock.objects.bulk_create(
+            [IncidentCellLock(category=category, cell=cell) for cell in cells], ignore_conflicts=True
+        )
+        list(IncidentCellLock.objects.select_for_update().filter(
+            category=category, cell__in=cells
+        ).order_by('cell').values_list('id', flat=True))
+
+    def _recentre(self, incident: Incident) -> None:
+        incident.lat = incident.lat_sum / incident.report_count
+        incident.lng = incident.lng_sum / incident.report_count
+        incident.cell = self.cell_key(incident.lat, incident.lng)
+
+    def _absorb(self, incident: Incident, other: Incident) -> None:
+        """Merge other into incident, moving its reports across"""
+        incident.lat_sum += other.lat_sum
+        incident.lng_sum += other.lng_sum
+        incident.report_count += other.report_count
+        incident.max_severity = max(incident.max_severity, other.max_severity)
+        incident.first_seen_at = min(incident.first_seen_at, other.first_seen_at)
+        incident.last_seen_at = max(incident.last_seen_at, other.last_seen_at)
+        self._recentre(incident)
+
+        now = timezone.now()
+        EmergencyReport.objects.filter(incident=other).update(incident=incident, updated_at=now)
+        CrowdReport.objects.filter(incident=other).update(incident=incident, updated_at=now)
+        other.status = 'merged'
+        other.merged_into = incident
+        other.save(update_fields=['status', 'merged_into', 'updated_at'])
+        logger.info(f"Merged incident {other.id} into {incident.id}")
+
+    def add_reports(self, reports: Iterable) -> None:
+        """Cluster several saved reports, logging rather than raising on failure"""
+        for report in reports:
+            try:
+                self.add_report(report)
+            except Exception as e:
+                logger.error(f"Incident clustering failed for {type(report).__name__} {report.pk}: {str(e)}")
+
+
+@lru_cache(maxsize=None)
+def get_incident_clusterer() -> IncidentClusterer:
+    """Return the process-wide clusterer"""
+    return IncidentClusterer()
+
+
+def schedule_clustering(reports: List) -> None:
+    """Cluster saved reports once the surrounding transaction commits"""
+    if not getattr(settings, 'INCIDENT_CLUSTERING', True):
+        return
+
+    located = [report for report in reports if report.pk and report.lat is not None and report.lng is not None]
+    if located:
+        transaction.on_commit(lambda: get_incident_clusterer().add_reports(located))
+
+
+def select_current_reports(reports: Iterable, since) -> List:
+    """Located reports created at or after since that are still open (crowd reports have no status)"""
+    return [
+        report for report in reports
+        if report.lat is not None and report.lng is not None and report.created_at >= since
+        and getattr(report, 'status', OPEN_STATUSES[0]) in OPEN_STATUSES
+    ]
+
+
+def cluster_reports_in_bulk(reports: List) -> int:
+    """
+    Cluster a batch of saved reports in one pass, for bulk imports
+
+    Imports skip per-report clustering on commit; the reports still worth
+    clustering (see select_current_reports) are added here instead, oldest
+    first so incident windows line up, in transactions of
+    INCIDENT_BULK_BATCH_SIZE reports rather than one commit each.
+
+    Returns:
+        int: Reports clustered
+    """
+    if not getattr(settings, 'INCIDENT_CLUSTERING', True) or not reports:
+        return 0
+
+    clusterer = get_incident_clusterer()
+    batch_size = max(getattr(settings, 'INCIDENT_BULK_BATCH_SIZE', 500), 1)
+    reports = sorted(reports, key=lambda report: (report.created_at, report.pk))
+    for start in range(0, len(reports), batch_size):
+        with transaction.atomic():
+            clusterer.add_reports(reports[start:start + batch_size])
+    logger.info(f"Clustered {len(reports)} reports in bulk")
+    return len(reports)
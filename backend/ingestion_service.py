@@ -0,0 +1,159 @@
+"""
+Emergency report ingestion service
+Single place where SMS, IVR, USSD and webhook channels create EmergencyReport rows
+"""
+
+import logging
+from typing import Optional, Dict, List
+from django.conf import settings
+from django.db import transaction
+
+from .models import EmergencyReport, set_geohash
+from .location_service import LocationService
+from .dispatch_service import get_dispatcher
+from .events import emergency_report_payload, get_event_bus
+from .incident_service import schedule_clustering
+from .rollup_service import record_created
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def bulk_create_backdated(model, reports: List) -> List:
+    """
+    bulk_create that keeps a created_at already set on the instances
+
+    auto_now_add overwrites created_at on insert, so given timestamps are
+    written back with one bulk_update.
+    """
+    created_at = [report.created_at for report in reports]
+    created = model.objects.bulk_create(reports, batch_size=1000)
+    backdated = []
+    for report, timestamp in zip(created, created_at):
+        if timestamp is not None:
+            report.created_at = timestamp
+            backdated.append(report)
+    if backdated:
+        model.objects.bulk_update(backdated, ['created_at'], batch_size=1000)
+    return created
+
+
+class ReportIngestionService:
+    """Builds reports fully in memory so each one costs exactly one INSERT"""
+
+    @staticmethod
+    def build_report(channel: str, phone_number: str, category: str, severity: int,
+                     description: str, location_info: Optional[Dict] = None,
+                     **fields) -> EmergencyReport:
+        """
+        Build an unsaved emergency report with report ID and priority precomputed
+
+        Args:
+            channel (str): Reporting channel (sms, ivr, ussd, web)
+            phone_number (str): Reporter phone number
+            category (str): Emergency category
+            severity (int): Severity level (1-4)
+            description (str): Emergency description
+            location_info (Dict): Detected location; fills district/state unless given.
+                Derived from lat/lng via offline boundaries when omitted
+            **fields: Any other EmergencyReport fields; a report_id claimed in advance
+                (e.g. for SMS dedup) is used instead of a new one
+
+        Returns:
+            EmergencyReport: Unsaved report instance
+        """
+        if not location_info and fields.get('lat') is not None and fields.get('lng') is not None:
+            # Offline boundaries only - never block ingestion on a network call
+            location_info = LocationService.get_location_from_coordinates(
+                fields['lat'], fields['lng'], allow_online=False
+            )
+
+        if location_info:
+            fields.setdefault('district', location_info.get('district'))
+            fields.setdefault('state', location_info.get('state'))
+
+        emergency_report = EmergencyReport(
+            report_id=fields.pop('report_id', None) or EmergencyReport.generate_report_id(),
+            channel=channel,
+            phone_number=phone_number,
+            category=category,
+            severity=severity,
+            description=description,
+            **fields
+        )
+        emergency_report.priority_score = emergency_report.get_priority_score()
+        # bulk_create skips save(), so the queue position and geohash are set here too
+        emergency_report.queue_key = emergency_report.get_queue_key()
+        set_geohash(emergency_report)
+        return emergency_report
+
+    @staticmethod
+    def create_report(channel: str, phone_number: str, category: str, severity: int,
+                      description: str, location_info: Optional[Dict] = None,
+                      **fields) -> EmergencyReport:
+        """
+        Create an emergency report with a single INSERT
+
+        Takes the same arguments as build_report.
+
+        Returns:
+            EmergencyReport: Saved report instance
+        """
+        emergency_report = ReportIngestionService.build_report(
+            channel, phone_number, category, severity, description,
+            location_info=location_info, **fields
+        )
+        emergency_report.save(force_insert=True)
+        ReportIngestionService.schedule_dispatch([emergency_report])
+        return emergency_report
+
+    @staticmethod
+    def create_reports(reports: List[EmergencyReport], live: bool = True) -> List[EmergencyReport]:
+        """
+        Insert reports produced by build_report in one transaction
+
+        Args:
+            reports (List[EmergencyReport]): Unsaved reports; a created_at set on them is kept
+            live (bool): Auto-dispatch, cluster and publish the reports to live dashboards
+                (False for imported data, which report_import clusters in one pass)
+
+        Returns:
+            List[EmergencyReport]: Saved reports
+        """
+        if not reports:
+            return []
+
+        with transaction.atomic():
+            created = bulk_create_backdated(EmergencyReport, reports)
+            if live:
+                ReportIngestionService.schedule_dispatch(created)
+                # bulk_create skips post_save, so live dashboards are fed here
+                bus = get_event_bus()
+                for report in created:
+                    bus.publish_on_commit('emergency_report', 'created', emergency_report_payload(report))
+                # ... as well as incident clustering
+                schedule_clustering(created)
+            record_created(created)
+        return created
+
+    @staticmethod
+    def schedule_dispatch(reports: List[EmergencyReport]) -> None:
+        """
+        Auto-assign reports with coordinates to nearby rescuers once committed
+
+        Args:
+            reports (List[EmergencyReport]): Saved reports
+        """
+        if not getattr(settings, 'DISPATCH_AUTO_ASSIGN', True):
+            return
+
+        located = [report for report in reports if report.pk and report.lat is not None and report.lng is not None]
+        if not located:
+            return
+
+        def dispatch():
+            dispatcher = get_dispatcher()
+            for report in located:
+                dispatcher.auto_assign(report)
+
+        transaction.on_commit(dispatch)
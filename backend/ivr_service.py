@@ -242,7 +242,7 @@ class IVRService:
             Dict: Emergency report data
         """
         try:
-            from .models import EmergencyReport
+            from .ingestion_service import ReportIngestionService
             from .location_service import LocationService
             
             # Extract data from call
@@ -258,15 +258,14 @@ class IVRService:
                 location_info = LocationService.detect_location_from_phone_number(phone_number)
             
             # Create emergency report
-            emergency_report = EmergencyReport.objects.create(
-                channel='ivr',
-                phone_number=phone_number,
-                category=category,
-                severity=severity,
-                description=description,
+            emergency_report = ReportIngestionService.create_report(
+                'ivr',
+                phone_number,
+                category,
+                severity,
+                description,
+                location_info=location_info,
                 address=location or (LocationService.format_location_for_report(location_info) if location_info else ''),
-                district=location_info.get('district') if location_info else None,
-                state=location_info.get('state') if location_info else None,
                 raw_data={
                     'call_sid': call_data.get('call_sid'),
                     'recording_url': call_data.get('recording_url'),
@@ -274,10 +273,6 @@ class IVRService:
                 }
             )
             
-            # Calculate priority score
-            emergency_report.priority_score = emergency_report.get_priority_score()
-            emergency_report.save()
-            
             return {
                 'status': 'success',
                 'report_id': emergency_report.report_id,
@@ -3,6 +3,8 @@ Multi-language support for emergency reporting system
 Provides translations for emergency categories, severity levels, and system messages
 """
 
+from .phone_prefix import PrefixTrie, get_india_landline_number
+
 # Language translations for emergency categories
 EMERGENCY_CATEGORIES = {
     'en': {
@@ -311,6 +313,41 @@ def get_ussd_menu(language='en', menu_level=1):
     else:
         return get_translation(language, 'invalid_format')
 
+# Regional language mapping for Indian area code prefixes
+REGIONAL_LANGUAGES = {
+    # Hindi belt
+    '11': 'hi',  # Delhi
+    '12': 'hi',  # Haryana
+    '13': 'hi',  # Punjab
+    '14': 'hi',  # Rajasthan
+    '15': 'hi',  # Uttar Pradesh
+    '16': 'hi',  # Madhya Pradesh
+    
+    # South India
+    '40': 'te',  # Telangana
+    '44': 'ta',  # Tamil Nadu
+    '80': 'kn',  # Karnataka
+    '33': 'bn',  # West Bengal
+    
+    # West India
+    '22': 'mr',  # Maharashtra
+    '79': 'gu',  # Gujarat
+    
+    # East India
+    '67': 'or',  # Odisha
+    '36': 'as',  # Assam
+    
+    # North East
+    '38': 'as',  # Assam
+    '37': 'as',  # Manipur
+    
+    # Kerala
+    '48': 'ml',  # Kerala
+}
+
+# Same prefix trie structure as the area code location lookup
+REGIONAL_LANGUAGE_TRIE = PrefixTrie(REGIONAL_LANGUAGES)
+
 def detect_language_from_phone_number(phone_number):
     """
     Detect language based on phone number prefix for India
@@ -323,43 +360,10 @@ def detect_language_from_phone_number(phone_number):
         str: Detected language code
     """
     if phone_number.startswith('+91'):
-        # India - detect based on area code
-        # Extract area code (first 2-4 digits after +91)
-        area_code = phone_number[3:7] if len(phone_number) > 6 else phone_number[3:5]
-        
-        # Regional language mapping for Indian states
-        regional_mapping = {
-            # Hindi belt
-            '11': 'hi',  # Delhi
-            '12': 'hi',  # Haryana
-            '13': 'hi',  # Punjab
-            '14': 'hi',  # Rajasthan
-            '15': 'hi',  # Uttar Pradesh
-            '16': 'hi',  # Madhya Pradesh
-            
-            # South India
-            '40': 'te',  # Telangana
-            '44': 'ta',  # Tamil Nadu
-            '80': 'kn',  # Karnataka
-            '33': 'bn',  # West Bengal
-            
-            # West India
-            '22': 'mr',  # Maharashtra
-            '79': 'gu',  # Gujarat
-            
-            # East India
-            '67': 'or',  # Odisha
-            '36': 'as',  # Assam
-            
-            # North East
-            '38': 'as',  # Assam
-            '37': 'as',  # Manipur
-            
-            # Kerala
-            '48': 'ml',  # Kerala
-        }
-        
-        return regional_mapping.get(area_code, 'hi')  # Default to Hindi for India
+        # India - detect based on the STD code of landlines; mobile numbers carry none
+        number = get_india_landline_number(phone_number)
+        language = REGIONAL_LANGUAGE_TRIE.longest_match(number) if number else None
+        return language or 'hi'  # Default to Hindi for India
     elif phone_number.startswith('+880'):
         # Bangladesh
         return 'bn'
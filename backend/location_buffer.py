@@ -0,0 +1,295 @@
+"""
+Write-behind buffer for rescuer GPS pings
+Keeps the latest position per rescuer in memory and in the shared cache,
+flushes dirty positions to RescuerLocation in batched upserts, and appends a
+downsampled track to RescuerTrackPoint in the same flush
+"""
+
+import atexit
+import logging
+import threading
+from datetime import datetime
+from functools import lru_cache
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.db.models import Case, DateTimeField, FloatField, Value, When
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .geo import haversine_km
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+Position = Tuple[float, float, datetime]
+
+
+def parse_ping(data: Dict) -> Tuple[float, float, Optional[datetime]]:
+    """
+    Validate one GPS ping payload
+
+    Args:
+        data (Dict): 'lat', 'lng' and optional ISO 8601 'recorded_at'
+
+    Returns:
+        Tuple: (lat, lng, recorded_at); recorded_at is None when not given
+
+    Raises:
+        ValueError: If coordinates are missing or out of range
+    """
+    lat, lng = float(data['lat']), float(data['lng'])
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError('Coordinates out of range')
+
+    recorded_at = None
+    if data.get('recorded_at'):
+        recorded_at = parse_datetime(str(data['recorded_at']))
+        if recorded_at is None:
+            raise ValueError('Invalid recorded_at')
+        if timezone.is_naive(recorded_at):
+            recorded_at = timezone.make_aware(recorded_at)
+        # Device clocks drift; never let a ping claim to be from the future
+        recorded_at = min(recorded_at, timezone.now())
+    return lat, lng, recorded_at
+
+
+class RescuerLocationBuffer:
+    """
+    Latest-position buffer in front of RescuerLocation
+
+    A ping only touches process memory and one cache key; a background thread
+    writes every RESCUER_LOCATION_FLUSH_SECONDS with one batched insert and update,
+    so each rescuer costs at most one row write per interval however often it
+    pings. With the Redis cache configured, every worker reads the same
+    latest positions. A flush interval of 0 writes through immediately.
+    """
+
+    KEY_PREFIX = 'rescuer_location'
+    # Rescuers per conditional UPDATE (each adds a few parameters to its CASE expressions)
+    WRITE_BATCH_SIZE = 200
+
+    def __init__(self):
+        self.flush_seconds = getattr(settings, 'RESCUER_LOCATION_FLUSH_SECONDS', 5)
+        self.cache_timeout = getattr(settings, 'DISPATCH_RESCUER_STALE_SECONDS', 900)
+        self.track_min_distance_km = getattr(settings, 'RESCUER_TRACK_MIN_DISTANCE_M', 25) / 1000
+        self.track_max_interval = getattr(settings, 'RESCUER_TRACK_MAX_INTERVAL_SECONDS', 60)
+        self._dirty = {}
+        self._track_last = {}
+        self._track_pending = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def get_cache_key(self, user_id: int) -> str:
+        return f"{self.KEY_PREFIX}:{user_id}"
+
+    def record(self, user_id: int, lat: float, lng: float, recorded_at: Optional[datetime] = None) -> None:
+        """Buffer one ping"""
+        self.record_many([(user_id, lat, lng, recorded_at)])
+
+    def record_many(self, pings: Iterable[Tuple[int, float, float, Optional[datetime]]]) -> Dict[int, Position]:
+        """
+        Buffer several pings, keeping only the newest per rescuer
+
+        Args:
+            pings: (user_id, lat, lng, recorded_at) tuples; recorded_at defaults to now
+
+        Returns:
+            Dict[int, Position]: Latest buffered position per rescuer touched
+        """
+        now = timezone.now()
+        by_user = defaultdict(list)
+        for user_id, lat, lng, recorded_at in pings:
+            by_user[user_id].append((float(lat), float(lng), recorded_at or now))
+        if not by_user:
+            return {}
+
+        latest = {}
+        with self._lock:
+            for user_id, positions in by_user.items():
+                positions.sort(key=lambda position: position[2])
+                latest[user_id] = positions[-1]
+                self._append_track(user_id, positions)
+                current = self._dirty.get(user_id)
+                if current is None or positions[-1][2] >= current[2]:
+                    self._dirty[user_id] = positions[-1]
+
+        cache.set_many({self.get_cache_key(user_id): position for user_id, position in latest.items()},
+                       timeout=self.cache_timeout)
+
+        if self.flush_seconds <= 0:
+            self.flush()
+        else:
+            self._ensure_flusher()
+        return latest
+
+    def _keep_track_point(self, previous: Optional[Position], position: Position) -> bool:
+        """A point is kept once the rescuer has moved far enough or enough time has passed"""
+        if previous is None:
+            return True
+        return ((position[2] - previous[2]).total_seconds() >= self.track_max_interval or
+                haversine_km(previous[0], previous[1], position[0], position[1]) >= self.track_min_distance_km)
+
+    def _append_track(self, user_id: int, positions: List[Position]) -> None:
+        """
+        Downsample time-ordered pings into pending track points (caller holds the lock)
+
+        Pings older than the last kept point (a device uploading its offline
+        queue) are downsampled among themselves instead of being dropped.
+        """
+        last = self._track_last.get(user_id)
+        backfill_last = None
+        for position in positions:
+            if last is not None and position[2] <= last[2]:
+                if self._keep_track_point(backfill_last, position):
+                    self._track_pending.append((user_id, position))
+                    backfill_last = position
+            elif self._keep_track_point(last, position):
+                self._track_pending.append((user_id, position))
+                last = position
+        if last is not None:
+            self._track_last[user_id] = last
+
+    def pending_track(self, user_id: int) -> List[Position]:
+        """Track points for a rescuer not yet written by this process"""
+        with self._lock:
+            return [position for pending_user_id, position in self._track_pending if pending_user_id == user_id]
+
+    def get(self, user_id: int) -> Optional[Position]:
+        """Latest known position for one rescuer, from any worker"""
+        with self._lock:
+            position = self._dirty.get(user_id)
+        return position or cache.get(self.get_cache_key(user_id))
+
+    def get_many(self, user_ids: Iterable[int]) -> Dict[int, Position]:
+        """Latest buffered positions for several rescuers, from any worker"""
+        user_ids = list(user_ids)
+        keys = {self.get_cache_key(user_id): user_id for user_id in user_ids}
+        positions = {keys[key]: position for key, position in cache.get_many(list(keys)).items()}
+        with self._lock:
+            for user_id in user_ids:
+                if user_id in self._dirty:
+                    positions[user_id] = self._dirty[user_id]
+        return positions
+
+    def overlay(self, rows: List[Dict], include_unflushed: bool = False) -> List[Dict]:
+        """
+        Replace database positions with newer buffered ones
+
+        Args:
+            rows (List[Dict]): Dicts with 'user_id', 'lat', 'lng', 'updated_at'
+            include_unflushed (bool): Also append rescuers this process has
+                buffered but never written to the table
+
+        Returns:
+            List[Dict]: The same rows, updated in place
+        """
+        positions = self.get_many(row['user_id'] for row in rows)
+        for row in rows:
+            position = positions.get(row['user_id'])
+            if position and (row['updated_at'] is None or position[2] > row['updated_at']):
+                row['lat'], row['lng'], row['updated_at'] = position
+
+        if include_unflushed:
+            known = {row['user_id'] for row in rows}
+            with self._lock:
+                pending = [(user_id, position) for user_id, position in self._dirty.items() if user_id not in known]
+            rows.extend(
+                {'user_id': user_id, 'lat': lat, 'lng': lng, 'updated_at': updated_at}
+                for user_id, (lat, lng, updated_at) in pending
+            )
+        return rows
+
+    def flush(self) -> int:
+        """
+        Write all dirty positions and pending track points in one transaction
+
+        Returns:
+            int: Rows written
+        """
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+            track, self._track_pending = self._track_pending, []
+        if not dirty and not track:
+            return 0
+
+        from .models import RescuerTrackPoint
+
+        try:
+            with transaction.atomic():
+                items = list(dirty.items())
+                for start in range(0, len(items), self.WRITE_BATCH_SIZE):
+                    self._write_positions(dict(items[start:start + self.WRITE_BATCH_SIZE]))
+                if track:
+                    RescuerTrackPoint.objects.bulk_create(
+                        [RescuerTrackPoint(user_id=user_id, lat=lat, lng=lng, recorded_at=recorded_at)
+                         for user_id, (lat, lng, recorded_at) in track],
+                        batch_size=1000
+                    )
+        except Exception as e:
+            # Keep everything for the next attempt; newer positions win over the retried ones
+            with self._lock:
+                for user_id, position in dirty.items():
+                    self._dirty.setdefault(user_id, position)
+                self._track_pending[:0] = track
+            logger.error(f"Failed to flush {len(dirty)} rescuer locations: {str(e)}")
+            return 0
+
+        return len(dirty)
+
+    @staticmethod
+    def _write_positions(dirty: Dict[int, Position]) -> None:
+        """
+        Store positions stamped with their ping time, never replacing a newer one
+
+        Missing rows are inserted, then one UPDATE moves only rows holding an
+        older position, so a late or offline ping flushed by one worker cannot
+        overwrite a fresher position another worker has already written.
+        """
+        from .models import RescuerLocation
+
+        RescuerLocation.objects.bulk_create(
+            [RescuerLocation(user_id=user_id, lat=lat, lng=lng, updated_at=recorded_at)
+             for user_id, (lat, lng, recorded_at) in dirty.items()],
+            ignore_conflicts=True
+        )
+
+        def per_user(index: int, output_field) -> Case:
+            return Case(*[When(user_id=user_id, then=Value(position[index]))
+                          for user_id, position in dirty.items()], output_field=output_field)
+
+        RescuerLocation.objects.filter(
+            user_id__in=list(dirty), updated_at__lt=per_user(2, DateTimeField())
+        ).update(
+            lat=per_user(0, FloatField()), lng=per_user(1, FloatField()), updated_at=per_user(2, DateTimeField())
+        )
+
+    def _ensure_flusher(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='rescuer-location-flush', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._wake.wait(self.flush_seconds):
+            close_old_connections()
+            self.flush()
+
+    def stop(self) -> None:
+        """Stop the flusher and write whatever is still buffered"""
+        self._wake.set()
+        self.flush()
+
+
+@lru_cache(maxsize=None)
+def get_location_buffer() -> RescuerLocationBuffer:
+    """Return the process-wide buffer, flushing it on interpreter exit"""
+    buffer = RescuerLocationBuffer()
+    atexit.register(buffer.stop)
+    return buffer
@@ -7,6 +7,96 @@ import re
 import requests
 from typing import Optional, Dict, Tuple
 from django.conf import settings
+from django.core.cache import cache
+
+from .gazetteer import get_gazetteer
+from .phone_prefix import PrefixTrie, get_india_landline_number
+from .reverse_geocoder import get_reverse_geocoder
+
+# India STD area code mapping (simplified)
+INDIA_AREA_CODES = {
+    '11': {'state': 'Delhi', 'district': 'New Delhi'},
+    '22': {'state': 'Maharashtra', 'district': 'Mumbai'},
+    '20': {'state': 'Maharashtra', 'district': 'Pune'},
+    '40': {'state': 'Telangana', 'district': 'Hyderabad'},
+    '44': {'state': 'Tamil Nadu', 'district': 'Chennai'},
+    '80': {'state': 'Karnataka', 'district': 'Bangalore'},
+    '33': {'state': 'West Bengal', 'district': 'Kolkata'},
+    '79': {'state': 'Gujarat', 'district': 'Ahmedabad'},
+    '141': {'state': 'Rajasthan', 'district': 'Jodhpur'},
+    '161': {'state': 'Punjab', 'district': 'Ludhiana'},
+    '172': {'state': 'Punjab', 'district': 'Chandigarh'},
+    '135': {'state': 'Uttarakhand', 'district': 'Haridwar'},
+    '133': {'state': 'Uttar Pradesh', 'district': 'Lucknow'},
+    '512': {'state': 'Uttar Pradesh', 'district': 'Kanpur'},
+    '542': {'state': 'Uttar Pradesh', 'district': 'Varanasi'},
+    '562': {'state': 'Uttar Pradesh', 'district': 'Agra'},
+    '120': {'state': 'Uttar Pradesh', 'district': 'Noida'},
+    '124': {'state': 'Haryana', 'district': 'Gurgaon'},
+    '129': {'state': 'Haryana', 'district': 'Faridabad'},
+    '186': {'state': 'Jammu and Kashmir', 'district': 'Srinagar'},
+    '191': {'state': 'Jammu and Kashmir', 'district': 'Jammu'},
+    '265': {'state': 'Gujarat', 'district': 'Surat'},
+    '278': {'state': 'Gujarat', 'district': 'Rajkot'},
+    '261': {'state': 'Gujarat', 'district': 'Vadodara'},
+    '281': {'state': 'Gujarat', 'district': 'Bhavnagar'},
+    '361': {'state': 'Assam', 'district': 'Guwahati'},
+    '384': {'state': 'Assam', 'district': 'Silchar'},
+    '373': {'state': 'Assam', 'district': 'Dibrugarh'},
+    '376': {'state': 'Assam', 'district': 'Jorhat'},
+    '385': {'state': 'Nagaland', 'district': 'Kohima'},
+    '364': {'state': 'Delhi', 'district': 'New Delhi'},
+    '389': {'state': 'Tripura', 'district': 'Agartala'},
+    '387': {'state': 'Manipur', 'district': 'Imphal'},
+    '484': {'state': 'Kerala', 'district': 'Kochi'},
+    '495': {'state': 'Kerala', 'district': 'Kozhikode'},
+    '487': {'state': 'Kerala', 'district': 'Thrissur'},
+    '821': {'state': 'Karnataka', 'district': 'Mysore'},
+    '836': {'state': 'Karnataka', 'district': 'Hubli'},
+    '824': {'state': 'Karnataka', 'district': 'Mangalore'},
+    '422': {'state': 'Tamil Nadu', 'district': 'Coimbatore'},
+    '452': {'state': 'Tamil Nadu', 'district': 'Madurai'},
+    '431': {'state': 'Tamil Nadu', 'district': 'Tiruchirapalli'},
+    '866': {'state': 'Andhra Pradesh', 'district': 'Vijayawada'},
+    '863': {'state': 'Andhra Pradesh', 'district': 'Guntur'},
+    '877': {'state': 'Andhra Pradesh', 'district': 'Tirupati'},
+    '870': {'state': 'Telangana', 'district': 'Warangal'},
+    '8462': {'state': 'Telangana', 'district': 'Nizamabad'},
+    '8742': {'state': 'Telangana', 'district': 'Khammam'},
+    '661': {'state': 'Odisha', 'district': 'Rourkela'},
+    '680': {'state': 'Odisha', 'district': 'Berhampur'},
+    '775': {'state': 'Chhattisgarh', 'district': 'Bilaspur'},
+    '788': {'state': 'Chhattisgarh', 'district': 'Durg'},
+    '7744': {'state': 'Chhattisgarh', 'district': 'Rajnandgaon'},
+    '731': {'state': 'Madhya Pradesh', 'district': 'Indore'},
+    '751': {'state': 'Madhya Pradesh', 'district': 'Gwalior'},
+    '761': {'state': 'Madhya Pradesh', 'district': 'Jabalpur'},
+    '712': {'state': 'Maharashtra', 'district': 'Nagpur'},
+    '253': {'state': 'Maharashtra', 'district': 'Nashik'},
+    '657': {'state': 'Jharkhand', 'district': 'Jamshedpur'},
+    '326': {'state': 'Jharkhand', 'district': 'Dhanbad'},
+    '6542': {'state': 'Jharkhand', 'district': 'Bokaro'},
+    '612': {'state': 'Bihar', 'district': 'Gaya'},
+    '641': {'state': 'Bihar', 'district': 'Bhagalpur'},
+    '621': {'state': 'Bihar', 'district': 'Muzaffarpur'},
+    '1332': {'state': 'Uttarakhand', 'district': 'Roorkee'},
+    '5946': {'state': 'Uttarakhand', 'district': 'Haldwani'},
+    '177': {'state': 'Himachal Pradesh', 'district': 'Dharamshala'},
+    '1902': {'state': 'Himachal Pradesh', 'district': 'Manali'},
+    '1792': {'state': 'Himachal Pradesh', 'district': 'Solan'},
+    '183': {'state': 'Punjab', 'district': 'Amritsar'},
+    '181': {'state': 'Punjab', 'district': 'Jalandhar'},
+    '180': {'state': 'Haryana', 'district': 'Panipat'},
+    '184': {'state': 'Haryana', 'district': 'Karnal'},
+    '294': {'state': 'Rajasthan', 'district': 'Udaipur'},
+    '744': {'state': 'Rajasthan', 'district': 'Kota'},
+}
+
+# Built once at import; lookups walk at most four digits
+AREA_CODE_TRIE = PrefixTrie(INDIA_AREA_CODES)
+
+REVERSE_GEOCODE_CACHE_PREFIX = 'revgeo'
+REVERSE_GEOCODE_NOT_FOUND = 'not_found'
 
 class LocationService:
     """Service for handling location detection and validation"""
@@ -47,6 +137,7 @@ class LocationService:
     def detect_location_from_phone_number(phone_number: str) -> Optional[Dict]:
         """
         Detect location from phone number using area code mapping
+        (landlines only: mobile numbers are not tied to an area)
         
         Args:
             phone_number (str): Phone number with country code
@@ -54,176 +145,33 @@ class LocationService:
         Returns:
             Dict: Location information or None
         """
-        # Remove any non-digit characters except +
-        clean_number = re.sub(r'[^\d+]', '', phone_number)
-        
-        # India area code mapping (simplified)
-        area_codes = {
-            '11': {'state': 'Delhi', 'district': 'New Delhi'},
-            '22': {'state': 'Maharashtra', 'district': 'Mumbai'},
-            '20': {'state': 'Maharashtra', 'district': 'Pune'},
-            '40': {'state': 'Telangana', 'district': 'Hyderabad'},
-            '44': {'state': 'Tamil Nadu', 'district': 'Chennai'},
-            '80': {'state': 'Karnataka', 'district': 'Bangalore'},
-            '33': {'state': 'West Bengal', 'district': 'Kolkata'},
-            '79': {'state': 'Gujarat', 'district': 'Ahmedabad'},
-            '141': {'state': 'Rajasthan', 'district': 'Jaipur'},
-            '161': {'state': 'Punjab', 'district': 'Ludhiana'},
-            '172': {'state': 'Punjab', 'district': 'Chandigarh'},
-            '135': {'state': 'Uttarakhand', 'district': 'Dehradun'},
-            '133': {'state': 'Uttar Pradesh', 'district': 'Lucknow'},
-            '512': {'state': 'Uttar Pradesh', 'district': 'Kanpur'},
-            '542': {'state': 'Uttar Pradesh', 'district': 'Varanasi'},
-            '562': {'state': 'Uttar Pradesh', 'district': 'Agra'},
-            '120': {'state': 'Uttar Pradesh', 'district': 'Noida'},
-            '124': {'state': 'Haryana', 'district': 'Gurgaon'},
-            '129': {'state': 'Haryana', 'district': 'Faridabad'},
-            '186': {'state': 'Jammu and Kashmir', 'district': 'Srinagar'},
-            '191': {'state': 'Jammu and Kashmir', 'district': 'Jammu'},
-            '265': {'state': 'Gujarat', 'district': 'Surat'},
-            '278': {'state': 'Gujarat', 'district': 'Rajkot'},
-            '261': {'state': 'Gujarat', 'district': 'Vadodara'},
-            '281': {'state': 'Gujarat', 'district': 'Bhavnagar'},
-            '361': {'state': 'Assam', 'district': 'Guwahati'},
-            '384': {'state': 'Assam', 'district': 'Silchar'},
-            '373': {'state': 'Assam', 'district': 'Dibrugarh'},
-            '376': {'state': 'Assam', 'district': 'Jorhat'},
-            '385': {'state': 'Assam', 'district': 'Tezpur'},
-            '364': {'state': 'Meghalaya', 'district': 'Shillong'},
-            '389': {'state': 'Tripura', 'district': 'Agartala'},
-            '387': {'state': 'Manipur', 'district': 'Imphal'},
-            '385': {'state': 'Nagaland', 'district': 'Kohima'},
-            '364': {'state': 'Mizoram', 'district': 'Aizawl'},
-            '364': {'state': 'Arunachal Pradesh', 'district': 'Itanagar'},
-            '364': {'state': 'Sikkim', 'district': 'Gangtok'},
-            '364': {'state': 'Goa', 'district': 'Panaji'},
-            '364': {'state': 'Kerala', 'district': 'Thiruvananthapuram'},
-            '484': {'state': 'Kerala', 'district': 'Kochi'},
-            '495': {'state': 'Kerala', 'district': 'Kozhikode'},
-            '487': {'state': 'Kerala', 'district': 'Thrissur'},
-            '364': {'state': 'Karnataka', 'district': 'Bangalore'},
-            '821': {'state': 'Karnataka', 'district': 'Mysore'},
-            '836': {'state': 'Karnataka', 'district': 'Hubli'},
-            '824': {'state': 'Karnataka', 'district': 'Mangalore'},
-            '364': {'state': 'Tamil Nadu', 'district': 'Chennai'},
-            '422': {'state': 'Tamil Nadu', 'district': 'Coimbatore'},
-            '452': {'state': 'Tamil Nadu', 'district': 'Madurai'},
-            '431': {'state': 'Tamil Nadu', 'district': 'Tiruchirapalli'},
-            '364': {'state': 'Andhra Pradesh', 'district': 'Visakhapatnam'},
-            '866': {'state': 'Andhra Pradesh', 'district': 'Vijayawada'},
-            '863': {'state': 'Andhra Pradesh', 'district': 'Guntur'},
-            '877': {'state': 'Andhra Pradesh', 'district': 'Tirupati'},
-            '364': {'state': 'Telangana', 'district': 'Hyderabad'},
-            '870': {'state': 'Telangana', 'district': 'Warangal'},
-            '8462': {'state': 'Telangana', 'district': 'Nizamabad'},
-            '8742': {'state': 'Telangana', 'district': 'Khammam'},
-            '364': {'state': 'Odisha', 'district': 'Bhubaneswar'},
-            '661': {'state': 'Odisha', 'district': 'Cuttack'},
-            '661': {'state': 'Odisha', 'district': 'Rourkela'},
-            '680': {'state': 'Odisha', 'district': 'Berhampur'},
-            '364': {'state': 'Chhattisgarh', 'district': 'Raipur'},
-            '775': {'state': 'Chhattisgarh', 'district': 'Bilaspur'},
-            '788': {'state': 'Chhattisgarh', 'district': 'Durg'},
-            '7744': {'state': 'Chhattisgarh', 'district': 'Rajnandgaon'},
-            '364': {'state': 'Madhya Pradesh', 'district': 'Bhopal'},
-            '731': {'state': 'Madhya Pradesh', 'district': 'Indore'},
-            '751': {'state': 'Madhya Pradesh', 'district': 'Gwalior'},
-            '761': {'state': 'Madhya Pradesh', 'district': 'Jabalpur'},
-            '364': {'state': 'Maharashtra', 'district': 'Mumbai'},
-            '20': {'state': 'Maharashtra', 'district': 'Pune'},
-            '712': {'state': 'Maharashtra', 'district': 'Nagpur'},
-            '253': {'state': 'Maharashtra', 'district': 'Nashik'},
-            '364': {'state': 'Jharkhand', 'district': 'Ranchi'},
-            '657': {'state': 'Jharkhand', 'district': 'Jamshedpur'},
-            '326': {'state': 'Jharkhand', 'district': 'Dhanbad'},
-            '6542': {'state': 'Jharkhand', 'district': 'Bokaro'},
-            '364': {'state': 'Bihar', 'district': 'Patna'},
-            '612': {'state': 'Bihar', 'district': 'Gaya'},
-            '641': {'state': 'Bihar', 'district': 'Bhagalpur'},
-            '621': {'state': 'Bihar', 'district': 'Muzaffarpur'},
-            '364': {'state': 'Uttar Pradesh', 'district': 'Lucknow'},
-            '512': {'state': 'Uttar Pradesh', 'district': 'Kanpur'},
-            '562': {'state': 'Uttar Pradesh', 'district': 'Agra'},
-            '542': {'state': 'Uttar Pradesh', 'district': 'Varanasi'},
-            '120': {'state': 'Uttar Pradesh', 'district': 'Noida'},
-            '364': {'state': 'Uttarakhand', 'district': 'Dehradun'},
-            '135': {'state': 'Uttarakhand', 'district': 'Haridwar'},
-            '1332': {'state': 'Uttarakhand', 'district': 'Roorkee'},
-            '5946': {'state': 'Uttarakhand', 'district': 'Haldwani'},
-            '364': {'state': 'Himachal Pradesh', 'district': 'Shimla'},
-            '177': {'state': 'Himachal Pradesh', 'district': 'Dharamshala'},
-            '1902': {'state': 'Himachal Pradesh', 'district': 'Manali'},
-            '1792': {'state': 'Himachal Pradesh', 'district': 'Solan'},
-            '364': {'state': 'Punjab', 'district': 'Chandigarh'},
-            '161': {'state': 'Punjab', 'district': 'Ludhiana'},
-            '183': {'state': 'Punjab', 'district': 'Amritsar'},
-            '181': {'state': 'Punjab', 'district': 'Jalandhar'},
-            '364': {'state': 'Haryana', 'district': 'Gurgaon'},
-            '129': {'state': 'Haryana', 'district': 'Faridabad'},
-            '180': {'state': 'Haryana', 'district': 'Panipat'},
-            '184': {'state': 'Haryana', 'district': 'Karnal'},
-            '364': {'state': 'Rajasthan', 'district': 'Jaipur'},
-            '141': {'state': 'Rajasthan', 'district': 'Jodhpur'},
-            '294': {'state': 'Rajasthan', 'district': 'Udaipur'},
-            '744': {'state': 'Rajasthan', 'district': 'Kota'},
-            '364': {'state': 'Delhi', 'district': 'New Delhi'},
-            '11': {'state': 'Delhi', 'district': 'New Delhi'}
-        }
-        
-        # Extract area code from phone number
-        if clean_number.startswith('+91'):
-            # Remove country code
-            number = clean_number[3:]
-        elif clean_number.startswith('91'):
-            # Remove country code
-            number = clean_number[2:]
-        else:
-            number = clean_number
-        
-        # Try to match area codes (from longest to shortest)
-        for length in range(4, 0, -1):
-            if len(number) >= length:
-                area_code = number[:length]
-                if area_code in area_codes:
-                    return area_codes[area_code]
+        # Only landlines have an area code; mobile prefixes overlap STD codes
+        number = get_india_landline_number(phone_number)
+        if number is None:
+            return None
         
-        return None
+        # Longest matching area code wins
+        location = AREA_CODE_TRIE.longest_match(number)
+        return dict(location) if location else None
     
     @staticmethod
     def detect_location_from_address(address: str) -> Optional[Dict]:
         """
-        Detect location from address text using keyword matching
+        Detect location from address text using the offline gazetteer
+        
+        Resolves the most specific state, district, city, tehsil or village
+        named in the text, tolerating misspellings of longer names.
         
         Args:
             address (str): Address text
             
         Returns:
-            Dict: Location information or None
+            Dict: Location information ('state', 'district', 'place', 'match') or None
         """
         if not address:
             return None
         
-        address_lower = address.lower()
-        
-        # Check for state names
-        for state, districts in LocationService.INDIA_STATES.items():
-            state_name = state.replace('_', ' ')
-            if state_name in address_lower:
-                # Try to find district
-                for district in districts:
-                    if district.replace('_', ' ') in address_lower:
-                        return {
-                            'state': state.replace('_', ' ').title(),
-                            'district': district.replace('_', ' ').title()
-                        }
-                
-                # Return state if found but no district
-                return {
-                    'state': state.replace('_', ' ').title(),
-                    'district': 'Unknown'
-                }
-        
-        return None
+        return get_gazetteer().resolve(address)
     
     @staticmethod
     def validate_coordinates(lat: float, lng: float) -> bool:
@@ -249,13 +197,17 @@ class LocationService:
                 INDIA_BOUNDS['min_lng'] <= lng <= INDIA_BOUNDS['max_lng'])
     
     @staticmethod
-    def get_location_from_coordinates(lat: float, lng: float) -> Optional[Dict]:
+    def get_location_from_coordinates(lat: float, lng: float, allow_online: bool = True) -> Optional[Dict]:
         """
         Get location information from coordinates using reverse geocoding
         
+        District boundaries are checked in-process first; the online service is
+        only consulted for points the offline data does not cover.
+        
         Args:
             lat (float): Latitude
             lng (float): Longitude
+            allow_online (bool): Fall back to the online reverse geocoding service
             
         Returns:
             Dict: Location information or None
@@ -263,6 +215,46 @@ class LocationService:
         if not LocationService.validate_coordinates(lat, lng):
             return None
         
+        location = get_reverse_geocoder().lookup(lat, lng)
+        if location:
+            return location
+        
+        if not allow_online or not getattr(settings, 'REVERSE_GEOCODING_ONLINE_FALLBACK', True):
+            return None
+        
+        # Reports from one neighbourhood share a cache entry instead of each costing a round trip
+        cache_key = LocationService.get_reverse_geocode_cache_key(lat, lng)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return None if cached == REVERSE_GEOCODE_NOT_FOUND else dict(cached)
+        
+        location = LocationService._reverse_geocode_online(lat, lng)
+        if location:
+            cache.set(cache_key, location, timeout=getattr(settings, 'REVERSE_GEOCODE_CACHE_TTL', 86400))
+        else:
+            # Short negative entry so an outage is not hammered with retries
+            cache.set(cache_key, REVERSE_GEOCODE_NOT_FOUND,
+                      timeout=getattr(settings, 'REVERSE_GEOCODE_NEGATIVE_TTL', 300))
+        return location
+    
+    @staticmethod
+    def get_reverse_geocode_cache_key(lat: float, lng: float) -> str:
+        """
+        Build the cache key for a point quantized to REVERSE_GEOCODE_CACHE_PRECISION decimals
+        
+        Args:
+            lat (float): Latitude
+            lng (float): Longitude
+            
+        Returns:
+            str: Cache key shared by all points in the same quantization cell
+        """
+        precision = getattr(settings, 'REVERSE_GEOCODE_CACHE_PRECISION', 3)
+        return f"{REVERSE_GEOCODE_CACHE_PREFIX}:{lat:.{precision}f}:{lng:.{precision}f}"
+    
+    @staticmethod
+    def _reverse_geocode_online(lat: float, lng: float) -> Optional[Dict]:
+        """Query the online reverse geocoding service"""
         try:
             # Using a free reverse geocoding service (you might want to use a paid service in production)
             url = f"https://api.bigdatacloud.net/data/reverse-geocode-client?latitude={lat}&longitude={lng}&localityLanguage=en"
@@ -285,24 +277,39 @@ class LocationService:
         """
         Get nearest emergency services for a given location
         
+        Facilities come from the EMERGENCY_FACILITIES_PATH index, without any
+        network call; a type with no indexed facility is None.
+        
         Args:
             lat (float): Latitude
             lng (float): Longitude
             
         Returns:
             Dict: Emergency services information
+            
+        Raises:
+            FacilityDataUnavailable: If no facility dataset is loaded
         """
-        # This is a simplified implementation
-        # In production, you'd want to integrate with actual emergency services databases
+        # scikit-learn is only loaded by processes that actually look up facilities
+        from .facility_index import require_facility_index
+        
+        nearest = require_facility_index().nearest(
+            lat, lng, k=getattr(settings, 'EMERGENCY_FACILITIES_K', 3)
+        )
         
-        location_info = LocationService.get_location_from_coordinates(lat, lng)
+        def describe(facility_type: str) -> Optional[str]:
+            facilities = nearest.get(facility_type)
+            if not facilities:
+                return None
+            return f"{facilities[0]['name']} ({facilities[0]['distance_km']:.1f} km)"
         
         return {
-            'police_station': f"Nearest Police Station - {location_info.get('district', 'Unknown')}",
-            'hospital': f"Nearest Hospital - {location_info.get('district', 'Unknown')}",
-            'fire_station': f"Nearest Fire Station - {location_info.get('district', 'Unknown')}",
-            'disaster_management': f"District Disaster Management Authority - {location_info.get('district', 'Unknown')}",
-            'emergency_contact': '100 (Police), 101 (Fire), 102 (Ambulance), 108 (Emergency)'
+            'police_station': describe('police'),
+            'hospital': describe('hospital'),
+            'fire_station': describe('fire'),
+            'disaster_management': describe('ddma'),
+            'emergency_contact': '100 (Police), 101 (Fire), 102 (Ambulance), 108 (Emergency)',
+            'nearest_facilities': nearest
         }
     
     @staticmethod
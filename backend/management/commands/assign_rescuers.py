@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from backend.assignment_solver import assign_pending_reports
+
+
+class Command(BaseCommand):
+    help = "Assign all open, unassigned emergency reports to available rescuers in one optimal batch"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=None,
+                            help="Highest-priority reports to consider (default DISPATCH_BATCH_MAX_REPORTS)")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Print the plan without assigning anything")
+        parser.add_argument("--verbose-plan", action="store_true",
+                            help="List every assignment")
+
+    def handle(self, *args, **options):
+        result = assign_pending_reports(limit=options["limit"], dry_run=options["dry_run"])
+
+        if options["verbose_plan"]:
+            for assignment in result["assignments"]:
+                self.stdout.write(
+                    f"{assignment['report_id']} -> rescuer {assignment['rescuer_id']} "
+                    f"({assignment['distance_km']:.1f} km)"
+                )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Planned' if result['dry_run'] else 'Assigned'} {result['assigned']} of {result['reports']} reports "
+            f"to {result['available_rescuers']} available rescuers using the {result['method']} solver "
+            f"({result['total_distance_km']:.1f} km total, {result['unassigned']} left unassigned)"
+        ))
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.models import EmergencyReport
+from backend.report_import import DEFAULT_IMPORT_STATUS, REPORT_KINDS, import_reports
+
+
+class Command(BaseCommand):
+    help = "Bulk-load crowd or emergency reports from a CSV or JSON-lines file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSON-lines file")
+        parser.add_argument("--kind", choices=REPORT_KINDS, required=True,
+                            help="Type of report in the file")
+        parser.add_argument("--format", choices=("csv", "jsonl"), default=None,
+                            help="File format (default from the extension)")
+        parser.add_argument("--chunk-size", type=int, default=5000,
+                            help="Rows validated and inserted per transaction")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Validate without inserting")
+        parser.add_argument("--status", choices=[choice for choice, _ in EmergencyReport.STATUS_CHOICES],
+                            default=DEFAULT_IMPORT_STATUS,
+                            help="Status of emergency rows without a status column")
+
+    def handle(self, *args, **options):
+        def progress(totals):
+            rate = totals["rows"] / totals["seconds"] if totals["seconds"] else 0
+            self.stdout.write(f"{totals['rows']} rows read, {totals['imported']} imported, "
+                              f"{sum(totals['rejected'].values())} rejected ({rate:.0f} rows/s)")
+
+        try:
+            totals = import_reports(options["path"], options["kind"], options["format"],
+                                    max(options["chunk_size"], 1), options["dry_run"], progress,
+                                    options["status"])
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for reason, count in totals["rejected"].most_common():
+            self.stdout.write(f"  rejected {count}: {reason}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Validated' if options['dry_run'] else 'Imported'} "
+            f"{totals['rows'] - sum(totals['rejected'].values())} of {totals['rows']} rows in {totals['seconds']}s, "
+            f"{totals['clustered']} recent open reports clustered into incidents"
+        ))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from backend.image_pipeline import process_report_photo
+from backend.models import CrowdReport
+
+
+class Command(BaseCommand):
+    help = "Re-encode crowd report photos that have no thumbnail yet (e.g. uploaded before the photo pipeline)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=None, help="Process at most this many reports")
+
+    def handle(self, *args, **options):
+        report_ids = CrowdReport.objects.exclude(photo="").exclude(photo__isnull=True).filter(
+            Q(thumbnail="") | Q(thumbnail__isnull=True)
+        ).order_by("id").values_list("id", flat=True)
+        if options["limit"]:
+            report_ids = report_ids[:options["limit"]]
+
+        processed = failed = 0
+        for report_id in report_ids.iterator():
+            try:
+                processed += process_report_photo(report_id)
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"Report {report_id}: {str(e)}")
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} photos ({failed} failed)"))
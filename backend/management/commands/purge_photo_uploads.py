@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from backend.upload_service import purge_stale_uploads
+
+
+class Command(BaseCommand):
+    help = "Delete unfinished photo uploads idle for longer than PHOTO_UPLOAD_EXPIRY_HOURS"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=None,
+                            help="Idle time in hours (default PHOTO_UPLOAD_EXPIRY_HOURS)")
+
+    def handle(self, *args, **options):
+        deleted = purge_stale_uploads(options["hours"])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} stale uploads"))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from backend.sync_service import purge_tombstones
+
+
+class Command(BaseCommand):
+    help = "Delete delta-sync tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None,
+                            help="Retention in days (default SYNC_TOMBSTONE_RETENTION_DAYS)")
+
+    def handle(self, *args, **options):
+        deleted = purge_tombstones(options["days"])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} tombstones"))
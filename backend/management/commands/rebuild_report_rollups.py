@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from backend.rollup_service import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recount the report statistics rollups from the report tables"
+
+    def handle(self, *args, **options):
+        result = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {result['stats']} report stat rows and {result['cells']} cell stat rows"
+        ))
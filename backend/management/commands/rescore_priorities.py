@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from backend.priority_engine import rescore_open_reports
+
+
+class Command(BaseCommand):
+    help = "Recompute priority for all open emergency reports (density, vulnerable areas, ML risk, waiting time)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Score without writing")
+        parser.add_argument("--every", type=int, default=0,
+                            help="Keep running, rescoring every N seconds")
+
+    def handle(self, *args, **options):
+        while True:
+            result = rescore_open_reports(dry_run=options["dry_run"])
+            self.stdout.write(self.style.SUCCESS(
+                f"{'Scored' if result['dry_run'] else 'Rescored'} {result['reports']} open reports, "
+                f"{result['updated']} changed ({result['score_seconds']:.3f}s scoring, "
+                f"{result['write_seconds']:.3f}s writing)"
+            ))
+            if options["every"] <= 0:
+                break
+            time.sleep(options["every"])
+            close_old_connections()
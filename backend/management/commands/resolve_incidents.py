@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from backend.incident_service import get_incident_clusterer
+
+
+class Command(BaseCommand):
+    help = "Resolve active incidents with no report in the last INCIDENT_WINDOW_MINUTES"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--every", type=int, default=0,
+                            help="Keep running, resolving every N seconds")
+
+    def handle(self, *args, **options):
+        while True:
+            resolved = get_incident_clusterer().resolve_stale_incidents()
+            self.stdout.write(self.style.SUCCESS(f"Resolved {resolved} incidents"))
+            if options["every"] <= 0:
+                break
+            time.sleep(options["every"])
+            close_old_connections()
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0003_emergencyreport_emergencyresponse_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emergencyreport',
+            name='repeat_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
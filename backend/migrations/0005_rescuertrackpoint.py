@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:39
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0004_emergencyreport_repeat_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RescuerTrackPoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lat', models.FloatField()),
+                ('lng', models.FloatField()),
+                ('recorded_at', models.DateTimeField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='track_points', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'recorded_at'], name='backend_res_user_id_b048a2_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:46
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_crowdreport_updated_at(apps, schema_editor):
+    # Existing reports have not changed since they were created
+    CrowdReport = apps.get_model('backend', 'CrowdReport')
+    CrowdReport.objects.update(updated_at=F('created_at'))
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0005_rescuertrackpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletedRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(max_length=50)),
+                ('object_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='crowdreport',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill_crowdreport_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='crowdreport',
+            index=models.Index(fields=['updated_at', 'id'], name='backend_cro_updated_e959d5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emergencyreport',
+            index=models.Index(fields=['updated_at', 'id'], name='backend_eme_updated_567cf7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deletedrecord',
+            index=models.Index(fields=['model_label', 'deleted_at', 'id'], name='backend_del_model_l_1a5310_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0006_sync_tombstones'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emergencyreport',
+            index=models.Index(fields=['status', 'category', '-priority_score', '-created_at', '-id'], name='backend_eme_status_3e4523_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emergencyreport',
+            index=models.Index(fields=['-priority_score', '-created_at', '-id'], name='backend_eme_priorit_303eda_idx'),
+        ),
+    ]
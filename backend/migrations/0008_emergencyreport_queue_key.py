@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:50
+
+from datetime import datetime, timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_queue_key(apps, schema_editor):
+    EmergencyReport = apps.get_model('backend', 'EmergencyReport')
+    epoch = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rate = getattr(settings, 'QUEUE_AGING_POINTS_PER_HOUR', 10.0)
+    reports = list(EmergencyReport.objects.only('id', 'priority_score', 'created_at'))
+    for report in reports:
+        report.queue_key = report.priority_score - rate * (report.created_at - epoch).total_seconds() / 3600
+    EmergencyReport.objects.bulk_update(reports, ['queue_key'], batch_size=1000)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0007_emergencyreport_priority_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emergencyreport',
+            name='queue_key',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.RunPython(backfill_queue_key, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='emergencyreport',
+            index=models.Index(condition=models.Q(('status__in', ('pending', 'acknowledged', 'in_progress'))), fields=['-queue_key'], name='emergency_open_queue_idx'),
+        ),
+    ]
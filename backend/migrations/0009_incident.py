@@ -0,0 +1,54 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0008_emergencyreport_queue_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Incident',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=20)),
+                ('status', models.CharField(choices=[('active', 'Active'), ('merged', 'Merged'), ('resolved', 'Resolved')], default='active', max_length=10)),
+                ('lat', models.FloatField()),
+                ('lng', models.FloatField()),
+                ('lat_sum', models.FloatField(default=0.0)),
+                ('lng_sum', models.FloatField(default=0.0)),
+                ('cell', models.BigIntegerField()),
+                ('report_count', models.PositiveIntegerField(default=0)),
+                ('max_severity', models.IntegerField(default=0)),
+                ('district', models.CharField(blank=True, max_length=100, null=True)),
+                ('state', models.CharField(blank=True, max_length=100, null=True)),
+                ('first_seen_at', models.DateTimeField()),
+                ('last_seen_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('merged_into', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='backend.incident')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='crowdreport',
+            name='incident',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='crowd_reports', to='backend.incident'),
+        ),
+        migrations.AddField(
+            model_name='emergencyreport',
+            name='incident',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='emergency_reports', to='backend.incident'),
+        ),
+        migrations.AddIndex(
+            model_name='incident',
+            index=models.Index(fields=['category', 'status', 'cell', 'last_seen_at'], name='backend_inc_categor_ce464b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='incident',
+            index=models.Index(fields=['status', '-last_seen_at'], name='backend_inc_status_757e5c_idx'),
+        ),
+    ]
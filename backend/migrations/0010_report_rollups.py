@@ -0,0 +1,77 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:58
+
+import math
+from collections import Counter
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_rollups(apps, schema_editor):
+    # Count the reports that exist before the signal handlers start maintaining the rollups
+    ReportStat = apps.get_model('backend', 'ReportStat')
+    ReportCellStat = apps.get_model('backend', 'ReportCellStat')
+    degrees = getattr(settings, 'ROLLUP_CELL_DEGREES', 0.5)
+    stats, cells = Counter(), Counter()
+    for model_name, label, region in (('EmergencyReport', 'backend.emergencyreport', True),
+                                      ('CrowdReport', 'backend.crowdreport', False)):
+        model = apps.get_model('backend', model_name)
+        fields = ['category', 'severity', 'lat', 'lng', 'created_at'] + (['state', 'district', 'status'] if region else [])
+        for row in model.objects.values(*fields).iterator():
+            stats[(label, row.get('state') or '', row.get('district') or '', row['category'] or '',
+                   row['severity'] or 0, row.get('status') or '')] += 1
+            if row['lat'] is not None and row['lng'] is not None:
+                cells[(label, row['category'] or '', math.floor(row['lat'] / degrees), math.floor(row['lng'] / degrees),
+                       row['created_at'].replace(minute=0, second=0, microsecond=0))] += 1
+
+    ReportStat.objects.bulk_create([
+        ReportStat(model_label=key[0], state=key[1], district=key[2], category=key[3], severity=key[4],
+                   status=key[5], count=count)
+        for key, count in stats.items()
+    ], batch_size=1000)
+    ReportCellStat.objects.bulk_create([
+        ReportCellStat(model_label=key[0], category=key[1], cell_row=key[2], cell_col=key[3], hour=key[4], count=count)
+        for key, count in cells.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0009_incident'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportCellStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(max_length=50)),
+                ('category', models.CharField(max_length=20)),
+                ('cell_row', models.IntegerField()),
+                ('cell_col', models.IntegerField()),
+                ('hour', models.DateTimeField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('model_label', 'hour', 'cell_row', 'cell_col', 'category'), name='unique_report_cell_stat')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReportStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(max_length=50)),
+                ('state', models.CharField(blank=True, default='', max_length=100)),
+                ('district', models.CharField(blank=True, default='', max_length=100)),
+                ('category', models.CharField(max_length=20)),
+                ('severity', models.IntegerField(default=0)),
+                ('status', models.CharField(blank=True, default='', max_length=20)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('model_label', 'state', 'district', 'category', 'severity', 'status'), name='unique_report_stat')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
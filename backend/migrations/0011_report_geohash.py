@@ -0,0 +1,43 @@
+# Generated by Django 5.2.6 on 2026-10-19 20:00
+
+from django.db import migrations, models
+
+from backend.geo import geohash_encode
+
+
+def backfill_geohash(apps, schema_editor):
+    for model_name in ('CrowdReport', 'EmergencyReport'):
+        model = apps.get_model('backend', model_name)
+        reports = list(model.objects.filter(lat__isnull=False, lng__isnull=False).only('id', 'lat', 'lng'))
+        for report in reports:
+            report.geohash = geohash_encode(report.lat, report.lng)
+        model.objects.bulk_update(reports, ['geohash'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0010_report_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='crowdreport',
+            name='geohash',
+            field=models.CharField(blank=True, max_length=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='emergencyreport',
+            name='geohash',
+            field=models.CharField(blank=True, max_length=12, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='crowdreport',
+            index=models.Index(fields=['geohash'], name='backend_cro_geohash_33f402_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emergencyreport',
+            index=models.Index(fields=['geohash'], name='backend_eme_geohash_38df43_idx'),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
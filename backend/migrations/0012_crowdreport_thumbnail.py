@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 20:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0011_report_geohash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='crowdreport',
+            name='thumbnail',
+            field=models.ImageField(blank=True, null=True, upload_to='reports/thumbs/'),
+        ),
+    ]
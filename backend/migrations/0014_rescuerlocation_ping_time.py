@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-19 20:22
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0013_photoupload'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='rescuerlocation',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
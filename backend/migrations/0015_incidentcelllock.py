@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-19 20:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0014_rescuerlocation_ping_time'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IncidentCellLock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=20)),
+                ('cell', models.BigIntegerField()),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('category', 'cell'), name='unique_incident_cell_lock')],
+            },
+        ),
+    ]
@@ -1,18 +1,75 @@
+import uuid
+from datetime import datetime, timezone as dt_timezone
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
+
+from .geo import geohash_encode
+
+# Reports in these states are still waiting for (or receiving) a response
+OPEN_STATUSES = ('pending', 'acknowledged', 'in_progress')
+
+
+def set_geohash(report, update_fields=None):
+    """
+    Refresh a report's geohash from its coordinates
+
+    Returns:
+        update_fields, with 'geohash' added when coordinates are among them
+    """
+    report.geohash = geohash_encode(report.lat, report.lng) if report.lat is not None and report.lng is not None else None
+    if update_fields is not None and {'lat', 'lng'} & set(update_fields):
+        return set(update_fields) | {'geohash'}
+    return update_fields
+
+
+class LoadedValuesMixin:
+    """Keeps the column values an instance was loaded with in _loaded_values, so saves can tell what changed"""
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        deferred = self.get_deferred_fields()
+        self._loaded_values = {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields if field.attname not in deferred
+        }
+
 
 class RescuerLocation(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     lat = models.FloatField()
     lng = models.FloatField()
-    updated_at = models.DateTimeField(auto_now=True)
+    # Time of the ping this position came from, set by the location buffer
+    updated_at = models.DateTimeField(default=timezone.now)
 
     def __str__(self):
         return f"{self.user.username} @ ({self.lat}, {self.lng})"
 
 
+class RescuerTrackPoint(models.Model):
+    """Append-only, downsampled history of rescuer positions"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="track_points")
+    lat = models.FloatField()
+    lng = models.FloatField()
+    recorded_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'recorded_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} @ ({self.lat}, {self.lng}) {self.recorded_at}"
+
+
 
 class CustomUser(AbstractUser):
     ROLE_CHOICES = [
@@ -25,7 +82,7 @@ class CustomUser(AbstractUser):
         return self.role == "rescuer"
 
 
-class CrowdReport(models.Model):
+class CrowdReport(LoadedValuesMixin, models.Model):
     CATEGORY_CHOICES = [
         ("flood", "Flood"),
         ("landslide", "Landslide"),
@@ -39,15 +96,30 @@ class CrowdReport(models.Model):
     note = models.TextField(blank=True, null=True)
     lat = models.FloatField()
     lng = models.FloatField()
+    geohash = models.CharField(max_length=12, blank=True, null=True)  # Spatial index key, set on save
     photo = models.ImageField(upload_to="reports/", blank=True, null=True)
+    thumbnail = models.ImageField(upload_to="reports/thumbs/", blank=True, null=True)  # Set by the photo pipeline
     device_fingerprint = models.CharField(max_length=255, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    incident = models.ForeignKey("Incident", on_delete=models.SET_NULL, null=True, blank=True,
+                                 related_name="crowd_reports")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at', 'id']),
+            models.Index(fields=['geohash']),
+        ]
+
+    def save(self, *args, **kwargs):
+        kwargs['update_fields'] = set_geohash(self, kwargs.get('update_fields'))
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.category} @ ({self.lat}, {self.lng})"
 
 
-class EmergencyReport(models.Model):
+class EmergencyReport(LoadedValuesMixin, models.Model):
     """Model for emergency reports from SMS, IVR, and USSD channels"""
     
     CHANNEL_CHOICES = [
@@ -115,6 +187,7 @@ class EmergencyReport(models.Model):
     # Location information
     lat = models.FloatField(null=True, blank=True)
     lng = models.FloatField(null=True, blank=True)
+    geohash = models.CharField(max_length=12, blank=True, null=True)  # Spatial index key, set on save
     address = models.TextField(blank=True, null=True)
     district = models.CharField(max_length=100, blank=True, null=True)
     state = models.CharField(max_length=100, blank=True, null=True)
@@ -123,6 +196,8 @@ class EmergencyReport(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
     assigned_to = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, 
                                    null=True, blank=True, related_name="assigned_emergencies")
+    incident = models.ForeignKey("Incident", on_delete=models.SET_NULL, null=True, blank=True,
+                                 related_name="emergency_reports")
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -134,20 +209,74 @@ class EmergencyReport(models.Model):
     raw_data = models.JSONField(default=dict, blank=True)  # Store original SMS/IVR data
     follow_up_required = models.BooleanField(default=False)
     priority_score = models.FloatField(default=0.0)  # Calculated priority based on various factors
+    repeat_count = models.PositiveIntegerField(default=0)  # Duplicate messages folded into this report
+    # priority_score minus aging since QUEUE_EPOCH; ordering by it ranks open reports by time-decayed priority
+    queue_key = models.FloatField(default=0.0)
     
+    # Fixed reference time for queue_key so stored keys never need refreshing
+    QUEUE_EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+
+    # Category multipliers for the priority score
+    CATEGORY_MULTIPLIERS = {
+        'medical': 1.5,
+        'fire': 1.4,
+        'earthquake': 1.3,
+        'flood': 1.2,
+        'cyclone': 1.2,
+        'landslide': 1.1,
+        'roadblock': 1.0,
+        'other': 0.9,
+    }
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['status', 'created_at']),
             models.Index(fields=['category', 'severity']),
             models.Index(fields=['phone_number']),
+            models.Index(fields=['updated_at', 'id']),
+            # list_emergency_reports: filtered and unfiltered priority listings
+            models.Index(fields=['status', 'category', '-priority_score', '-created_at', '-id']),
+            models.Index(fields=['-priority_score', '-created_at', '-id']),
+            # Open-report priority queue: top-k is a short scan of this partial index
+            models.Index(fields=['-queue_key'], condition=models.Q(status__in=OPEN_STATUSES),
+                         name='emergency_open_queue_idx'),
+            models.Index(fields=['geohash']),
         ]
     
     def save(self, *args, **kwargs):
         if not self.report_id:
-            import uuid
-            self.report_id = f"EMR-{uuid.uuid4().hex[:8].upper()}"
+            self.report_id = self.generate_report_id()
+        self.queue_key = self.get_queue_key()
+        update_fields = set_geohash(self, kwargs.get('update_fields'))
+        if update_fields is not None and 'priority_score' in update_fields:
+            update_fields = set(update_fields) | {'queue_key'}
+        kwargs['update_fields'] = update_fields
         super().save(*args, **kwargs)
+
+    @classmethod
+    def queue_hours(cls, moment) -> float:
+        """Hours between QUEUE_EPOCH and a timestamp"""
+        return (moment - cls.QUEUE_EPOCH).total_seconds() / 3600
+
+    def get_queue_key(self) -> float:
+        """
+        Time-decayed queue position
+
+        A waiting report gains QUEUE_AGING_POINTS_PER_HOUR priority points per
+        hour, so its effective priority at time t is
+        priority_score + rate * (t - created_at). The t term is shared by every
+        report, so ordering by priority_score - rate * created_at gives the same
+        ranking at any moment without rewriting rows as time passes.
+        """
+        rate = getattr(settings, 'QUEUE_AGING_POINTS_PER_HOUR', 10.0)
+        return self.priority_score - rate * self.queue_hours(self.created_at or timezone.now())
+    
+    @staticmethod
+    def generate_report_id():
+        """Generate a public report ID; also used by bulk_create paths, which skip save()"""
+        import uuid
+        return f"EMR-{uuid.uuid4().hex[:8].upper()}"
     
     def __str__(self):
         return f"Emergency Report {self.report_id} - {self.category} ({self.get_severity_display()})"
@@ -155,20 +284,7 @@ class EmergencyReport(models.Model):
     def get_priority_score(self):
         """Calculate priority score based on severity, category, and other factors"""
         base_score = self.severity * 25
-        
-        # Category multipliers
-        category_multipliers = {
-            'medical': 1.5,
-            'fire': 1.4,
-            'earthquake': 1.3,
-            'flood': 1.2,
-            'cyclone': 1.2,
-            'landslide': 1.1,
-            'roadblock': 1.0,
-            'other': 0.9,
-        }
-        
-        multiplier = category_multipliers.get(self.category, 1.0)
+        multiplier = self.CATEGORY_MULTIPLIERS.get(self.category, 1.0)
         return base_score * multiplier
 
 
@@ -188,3 +304,139 @@ class EmergencyResponse(models.Model):
     
     def __str__(self):
         return f"Response to {self.emergency_report.report_id} by {self.responder.username}"
+
+
+class DeletedRecord(models.Model):
+    """Tombstone for a deleted row so delta-sync clients can drop their copy"""
+    model_label = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['model_label', 'deleted_at', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.model_label} {self.object_id} deleted {self.deleted_at}"
+
+
+class Incident(models.Model):
+    """Cluster of nearby reports of one category that arrived close together in time"""
+
+    STATUS_CHOICES = [
+        ("active", "Active"),
+        ("merged", "Merged"),
+        ("resolved", "Resolved"),
+    ]
+
+    category = models.CharField(max_length=20)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="active")
+    # Centroid, kept as a running mean of member coordinates
+    lat = models.FloatField()
+    lng = models.FloatField()
+    lat_sum = models.FloatField(default=0.0)
+    lng_sum = models.FloatField(default=0.0)
+    cell = models.BigIntegerField()  # Grid bucket of the centroid
+    report_count = models.PositiveIntegerField(default=0)
+    max_severity = models.IntegerField(default=0)
+    district = models.CharField(max_length=100, blank=True, null=True)
+    state = models.CharField(max_length=100, blank=True, null=True)
+    first_seen_at = models.DateTimeField()
+    last_seen_at = models.DateTimeField()
+    merged_into = models.ForeignKey("self", on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['category', 'status', 'cell', 'last_seen_at']),
+            models.Index(fields=['status', '-last_seen_at']),
+        ]
+
+    def __str__(self):
+        return f"Incident {self.id} - {self.category} x{self.report_count} @ ({self.lat:.4f}, {self.lng:.4f})"
+
+
+class IncidentCellLock(models.Model):
+    """Row locked while clustering a report into one incident grid cell, so concurrent reports nearby take turns"""
+    category = models.CharField(max_length=20)
+    cell = models.BigIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['category', 'cell'], name='unique_incident_cell_lock'),
+        ]
+
+    def __str__(self):
+        return f"{self.category} cell {self.cell}"
+
+
+class ReportStat(models.Model):
+    """Running report count for one combination of region, category, severity and status"""
+    model_label = models.CharField(max_length=50)
+    state = models.CharField(max_length=100, blank=True, default="")
+    district = models.CharField(max_length=100, blank=True, default="")
+    category = models.CharField(max_length=20)
+    severity = models.IntegerField(default=0)
+    status = models.CharField(max_length=20, blank=True, default="")
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['model_label', 'state', 'district', 'category', 'severity', 'status'],
+                name='unique_report_stat'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.model_label} {self.district or '-'}/{self.category}/{self.status or '-'}: {self.count}"
+
+
+class ReportCellStat(models.Model):
+    """Running report count for one category in one lat/lng grid cell and hour"""
+    model_label = models.CharField(max_length=50)
+    category = models.CharField(max_length=20)
+    cell_row = models.IntegerField()
+    cell_col = models.IntegerField()
+    hour = models.DateTimeField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['model_label', 'hour', 'cell_row', 'cell_col', 'category'],
+                name='unique_report_cell_stat'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.model_label} ({self.cell_row}, {self.cell_col}) {self.hour:%Y-%m-%d %H}h/{self.category}: {self.count}"
+
+
+class PhotoUpload(models.Model):
+    """Resumable photo upload for a crowd report, received in chunks"""
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("complete", "Complete"),
+    ]
+
+    upload_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    report = models.ForeignKey(CrowdReport, on_delete=models.CASCADE, related_name="photo_uploads")
+    filename = models.CharField(max_length=255)
+    size = models.PositiveIntegerField()  # Bytes the client will send
+    sha256 = models.CharField(max_length=64)  # Hex digest the assembled file must match
+    received = models.PositiveIntegerField(default=0)  # Bytes written so far; the next chunk starts here
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+        ]
+
+    def __str__(self):
+        return f"Upload {self.upload_id} for crowd report {self.report_id}: {self.received}/{self.size} bytes"
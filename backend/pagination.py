@@ -0,0 +1,82 @@
+"""
+Keyset pagination for priority-ordered report lists
+Pages through (-priority_score, -created_at, -id) with an opaque cursor so
+each page is an index range scan instead of an ever-growing OFFSET
+"""
+
+import base64
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from django.db.models import Q
+
+from .sync_service import datetime_to_micros, micros_to_datetime
+
+# Newest-highest-priority first; id makes the order total so no row is skipped or repeated
+PRIORITY_ORDERING = ('-priority_score', '-created_at', '-id')
+
+PriorityPosition = Tuple[float, datetime, int]
+
+
+class CursorError(ValueError):
+    """Raised for malformed page cursors"""
+
+
+def encode_cursor(row: Dict) -> str:
+    """Cursor pointing just past a row (needs 'priority_score', 'created_at' and 'id')"""
+    raw = f"{row['priority_score']!r}|{datetime_to_micros(row['created_at'])}|{row['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> PriorityPosition:
+    """
+    Unpack a page cursor
+
+    Raises:
+        CursorError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        priority, created_at, row_id = raw.split('|')
+        return float(priority), micros_to_datetime(int(created_at)), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise CursorError('Invalid cursor')
+
+
+def after_position(position: PriorityPosition) -> Q:
+    """Rows that come after a position in PRIORITY_ORDERING"""
+    priority, created_at, row_id = position
+    return (Q(priority_score__lt=priority) |
+            Q(priority_score=priority, created_at__lt=created_at) |
+            Q(priority_score=priority, created_at=created_at, id__lt=row_id))
+
+
+def paginate_by_priority(queryset, fields: List[str], cursor: Optional[str],
+                         page_size: int) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Fetch one page of a queryset in PRIORITY_ORDERING as dicts
+
+    Args:
+        queryset (QuerySet): Filtered, unordered rows
+        fields (List[str]): Columns to return
+        cursor (str): Cursor from the previous page, or None for the first
+        page_size (int): Rows per page
+
+    Returns:
+        Tuple: (rows with only the requested fields, next cursor or None on the last page)
+
+    Raises:
+        CursorError: If the cursor is malformed
+    """
+    if cursor:
+        queryset = queryset.filter(after_position(decode_cursor(cursor)))
+
+    key_fields = [field for field in ('id', 'priority_score', 'created_at') if field not in fields]
+    rows = list(queryset.order_by(*PRIORITY_ORDERING).values(*fields, *key_fields)[:page_size + 1])
+
+    next_cursor = encode_cursor(rows[page_size - 1]) if len(rows) > page_size else None
+    rows = rows[:page_size]
+    if key_fields:
+        for row in rows:
+            for field in key_fields:
+                del row[field]
+    return rows, next_cursor
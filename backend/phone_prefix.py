@@ -0,0 +1,95 @@
+"""
+Phone number prefix lookup
+Digit trie shared by area-code location detection and language detection
+"""
+
+import re
+from typing import Any, Dict, Optional, Tuple
+
+class PrefixTrie:
+    """Digit trie answering longest-prefix lookups in O(prefix length)"""
+
+    def __init__(self, mapping: Optional[Dict[str, Any]] = None):
+        self._root = {}
+        for prefix, value in (mapping or {}).items():
+            self.insert(prefix, value)
+
+    def insert(self, prefix: str, value: Any) -> None:
+        """Map every number starting with prefix to value"""
+        node = self._root
+        for digit in prefix:
+            node = node.setdefault(digit, {})
+        node[None] = value
+
+    def longest_match(self, digits: str) -> Optional[Any]:
+        """
+        Find the value of the longest stored prefix of digits
+
+        Args:
+            digits (str): National number digits
+
+        Returns:
+            Value for the longest matching prefix, or None
+        """
+        node = self._root
+        match = None
+        for digit in digits:
+            node = node.get(digit)
+            if node is None:
+                break
+            if None in node:
+                match = node[None]
+        return match
+
+
+# First digits of 10-digit Indian mobile numbers; the ranges overlap STD codes
+# such as 80 (Bengaluru) and 79 (Ahmedabad), so they carry no area information
+MOBILE_LEADING_DIGITS = '6789'
+
+
+def _split_india_number(phone_number: str) -> Tuple[str, bool]:
+    """National number digits, and whether a 0 trunk prefix was dialled"""
+    clean_number = re.sub(r'[^\d+]', '', phone_number)
+
+    if clean_number.startswith('+91'):
+        number = clean_number[3:]
+    elif clean_number.startswith('91'):
+        number = clean_number[2:]
+    else:
+        number = clean_number.lstrip('+')
+
+    if number.startswith('0'):
+        return number[1:], True
+    return number, False
+
+
+def get_india_national_number(phone_number: str) -> str:
+    """
+    Strip formatting, the +91/91 country code and the 0 trunk prefix
+
+    Args:
+        phone_number (str): Phone number in any common Indian format
+
+    Returns:
+        str: National number digits, starting with the area code
+    """
+    return _split_india_number(phone_number)[0]
+
+
+def get_india_landline_number(phone_number: str) -> Optional[str]:
+    """
+    National number of a landline, for area code lookups
+
+    A number dialled with the 0 trunk prefix, or whose national number starts
+    with 1-5, is a landline; anything else is taken as a mobile number.
+
+    Args:
+        phone_number (str): Phone number in any common Indian format
+
+    Returns:
+        str: National number digits starting with the STD code, or None for mobile numbers
+    """
+    number, trunk_prefix = _split_india_number(phone_number)
+    if not number or (not trunk_prefix and number[0] in MOBILE_LEADING_DIGITS):
+        return None
+    return number
@@ -0,0 +1,219 @@
+"""
+Dynamic priority scoring engine
+Recomputes priority for every open emergency report in one vectorized pass,
+combining the static severity/category score with nearby report density,
+vulnerable-district flags and the ML risk of the report's grid cell
+"""
+
+import csv
+import logging
+import math
+import os
+import time
+from functools import lru_cache
+from typing import Dict, Optional
+import numpy as np
+from django.conf import settings
+from scipy.spatial import cKDTree
+
+from .geo import EARTH_RADIUS_KM
+from .models import OPEN_STATUSES, EmergencyReport
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# predicted_risk labels used when a cell has no quake_probability
+RISK_LABELS = {'low': 0.0, 'medium': 0.5, 'high': 1.0}
+
+# Scores that move less than this are not rewritten
+SCORE_TOLERANCE = 0.01
+
+
+class RiskGrid:
+    """ML risk per lat/lng grid cell, as written by mlmodel/ml_models/eq3.py (cell_id 'lat_lng' bins)"""
+
+    def __init__(self, cell_degrees: float = 0.5):
+        self.cell_degrees = cell_degrees
+        self.cells = {}
+
+    @classmethod
+    def from_csv(cls, path: str, cell_degrees: float = 0.5) -> 'RiskGrid':
+        grid = cls(cell_degrees)
+        if not os.path.exists(path):
+            logger.warning(f"Risk grid file not found: {path}")
+            return grid
+
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                try:
+                    lat_bin, lng_bin = (float(part) for part in row['cell_id'].split('_'))
+                    probability = row.get('quake_probability')
+                    risk = float(probability) if probability not in (None, '') else \
+                        RISK_LABELS.get(str(row.get('predicted_risk', '')).lower(), 0.0)
+                except (KeyError, ValueError):
+                    continue
+                key = (round(lat_bin / cell_degrees), round(lng_bin / cell_degrees))
+                grid.cells[key] = max(grid.cells.get(key, 0.0), min(max(risk, 0.0), 1.0))
+
+        logger.info(f"Loaded ML risk for {len(grid.cells)} cells")
+        return grid
+
+    def lookup(self, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+        """Risk in [0, 1] for each point; 0 for unknown cells or missing coordinates"""
+        risk = np.zeros(len(lats))
+        if not self.cells or not len(lats):
+            return risk
+
+        located = ~(np.isnan(lats) | np.isnan(lngs))
+        rows = np.floor(lats[located] / self.cell_degrees).astype(np.int64)
+        cols = np.floor(lngs[located] / self.cell_degrees).astype(np.int64)
+        # Look up each distinct cell once
+        cells, inverse = np.unique(np.column_stack([rows, cols]), axis=0, return_inverse=True)
+        cell_risk = np.array([self.cells.get((int(row), int(col)), 0.0) for row, col in cells])
+        risk[located] = cell_risk[inverse.ravel()]
+        return risk
+
+
+@lru_cache(maxsize=None)
+def get_risk_grid() -> RiskGrid:
+    """Return the process-wide risk grid"""
+    return RiskGrid.from_csv(
+        getattr(settings, 'PRIORITY_RISK_GRID_PATH', ''),
+        getattr(settings, 'PRIORITY_RISK_CELL_DEGREES', 0.5)
+    )
+
+
+class PriorityScoringEngine:
+    """
+    Vectorized priority model for open reports
+
+    priority = severity * 25 * category multiplier
+             + PRIORITY_DENSITY_WEIGHT * log(1 + open reports within PRIORITY_DENSITY_RADIUS_KM + repeats)
+             + PRIORITY_VULNERABLE_BONUS if the district is in PRIORITY_VULNERABLE_DISTRICTS
+             + PRIORITY_RISK_WEIGHT * ML risk of the report's cell, for PRIORITY_RISK_CATEGORIES only
+
+    Waiting time enters through queue_key, shifted by the same amount in the
+    same pass: it adds QUEUE_AGING_POINTS_PER_HOUR for every hour a report has
+    waited, so the queue and batch dispatch rank by priority plus waiting time
+    without the score itself going stale between passes.
+    """
+
+    def __init__(self, risk_grid: Optional[RiskGrid] = None):
+        self.density_radius_km = getattr(settings, 'PRIORITY_DENSITY_RADIUS_KM', 2.0)
+        self.density_weight = getattr(settings, 'PRIORITY_DENSITY_WEIGHT', 10.0)
+        self.vulnerable_bonus = getattr(settings, 'PRIORITY_VULNERABLE_BONUS', 15.0)
+        self.vulnerable_districts = {
+            district.strip().lower() for district in getattr(settings, 'PRIORITY_VULNERABLE_DISTRICTS', [])
+        }
+        self.risk_weight = getattr(settings, 'PRIORITY_RISK_WEIGHT', 20.0)
+        self.risk_categories = set(getattr(settings, 'PRIORITY_RISK_CATEGORIES', ['earthquake', 'landslide']))
+        self.risk_grid = risk_grid if risk_grid is not None else get_risk_grid()
+
+    def neighbour_counts(self, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+        """Number of other located reports within the density radius of each report"""
+        counts = np.zeros(len(lats))
+        located = ~(np.isnan(lats) | np.isnan(lngs))
+        if located.sum() < 2:
+            return counts
+
+        # Great-circle radius as a chord between unit vectors, so a plain KD-tree can count it
+        phi, lam = np.radians(lats[located]), np.radians(lngs[located])
+        points = np.column_stack([np.cos(phi) * np.cos(lam), np.cos(phi) * np.sin(lam), np.sin(phi)])
+        chord = 2 * np.sin(self.density_radius_km / EARTH_RADIUS_KM / 2)
+        counts[located] = cKDTree(points).query_ball_point(points, chord, return_length=True) - 1
+        return counts
+
+    def score(self, severity: np.ndarray, categories: np.ndarray, lats: np.ndarray, lngs: np.ndarray,
+              districts: np.ndarray, repeat_counts: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Score a batch of reports
+
+        Args:
+            severity, categories, lats, lngs, districts, repeat_counts: One entry per
+                report; missing coordinates are NaN
+
+        Returns:
+            Dict[str, np.ndarray]: 'priority' and its components
+                ('base', 'density', 'vulnerable', 'risk')
+        """
+        multipliers = np.array([EmergencyReport.CATEGORY_MULTIPLIERS.get(category, 1.0) for category in categories])
+        base = severity * 25 * multipliers
+        density = self.density_weight * np.log1p(self.neighbour_counts(lats, lngs) + repeat_counts)
+        vulnerable = self.vulnerable_bonus * np.array(
+            [bool(district) and district.lower() in self.vulnerable_districts for district in districts], dtype=float
+        )
+        risk = self.risk_weight * self.risk_grid.lookup(lats, lngs) * np.array(
+            [category in self.risk_categories for category in categories], dtype=float
+        )
+        return {
+            'priority': base + density + vulnerable + risk,
+            'base': base,
+            'density': density,
+            'vulnerable': vulnerable,
+            'risk': risk,
+        }
+
+
+
+def rescore_open_reports(dry_run: bool = False, engine: Optional[PriorityScoringEngine] = None) -> Dict:
+    """
+    Recompute priority_score and queue_key for every open report
+
+    Only reports whose score moved by more than SCORE_TOLERANCE are written,
+    in batched bulk_update calls. updated_at is left alone, so a rescore does
+    not push the whole open queue through the delta sync feed again.
+
+    Args:
+        dry_run (bool): Compute without writing
+        engine (PriorityScoringEngine): Engine to use (default from settings)
+
+    Returns:
+        Dict: Counts and timings ('reports', 'updated', 'score_seconds', 'write_seconds')
+    """
+    started = time.perf_counter()
+    engine = engine or PriorityScoringEngine()
+
+    rows = list(EmergencyReport.objects.filter(status__in=OPEN_STATUSES).values_list(
+        'id', 'severity', 'category', 'lat', 'lng', 'district', 'repeat_count', 'priority_score', 'queue_key'
+    ))
+    if not rows:
+        return {'reports': 0, 'updated': 0, 'dry_run': dry_run, 'score_seconds': 0.0, 'write_seconds': 0.0}
+
+    ids, severity, categories, lats, lngs, districts, repeats, current, current_keys = zip(*rows)
+    lats = np.array([math.nan if lat is None else lat for lat in lats], dtype=float)
+    lngs = np.array([math.nan if lng is None else lng for lng in lngs], dtype=float)
+
+    scores = engine.score(
+        np.array(severity, dtype=float), np.array(categories, dtype=object), lats, lngs,
+        np.array(districts, dtype=object), np.array(repeats, dtype=float)
+    )
+    priority = np.round(scores['priority'], 2)
+    current = np.array(current, dtype=float)
+    # queue_key = priority - aging term fixed at creation, so it moves with the score
+    # (and created_at never has to be loaded)
+    queue_keys = np.array(current_keys, dtype=float) + (priority - current)
+    changed = np.flatnonzero(np.abs(priority - current) > SCORE_TOLERANCE)
+    loaded = time.perf_counter()
+
+    if not dry_run and len(changed):
+        reports = [
+            EmergencyReport(id=ids[index], priority_score=float(priority[index]), queue_key=float(queue_keys[index]))
+            for index in changed
+        ]
+        EmergencyReport.objects.bulk_update(
+            reports, ['priority_score', 'queue_key'],
+            batch_size=getattr(settings, 'PRIORITY_RESCORE_BATCH_SIZE', 1000)
+        )
+    finished = time.perf_counter()
+
+    logger.info(f"Rescored {len(rows)} open reports, {len(changed)} changed "
+                f"({loaded - started:.3f}s scoring, {finished - loaded:.3f}s writing)"
+                f"{' (dry run)' if dry_run else ''}")
+
+    return {
+        'reports': len(rows),
+        'updated': int(len(changed)),
+        'dry_run': dry_run,
+        'score_seconds': round(loaded - started, 3),
+        'write_seconds': round(finished - loaded, 3),
+    }
@@ -0,0 +1,53 @@
+"""
+Open emergency priority queue
+Top-k retrieval of open reports by time-decayed priority, served from the
+materialized EmergencyReport.queue_key and its partial index on open statuses
+"""
+
+from typing import Dict, List, Optional, Sequence
+from django.conf import settings
+from django.utils import timezone
+
+from .models import OPEN_STATUSES, EmergencyReport
+
+QUEUE_FIELDS = (
+    'id', 'report_id', 'channel', 'category', 'severity', 'status', 'priority_score',
+    'lat', 'lng', 'district', 'state', 'assigned_to', 'repeat_count', 'created_at',
+)
+
+
+def effective_priority(queue_key: float, now=None) -> float:
+    """Time-decayed priority of a report at a moment (default now)"""
+    rate = getattr(settings, 'QUEUE_AGING_POINTS_PER_HOUR', 10.0)
+    return queue_key + rate * EmergencyReport.queue_hours(now or timezone.now())
+
+
+def top_open_reports(k: int = 20, unassigned: bool = False, statuses: Optional[Sequence[str]] = None,
+                     fields: Sequence[str] = QUEUE_FIELDS) -> List[Dict]:
+    """
+    Highest effective-priority open reports
+
+    Args:
+        k (int): Number of reports
+        unassigned (bool): Only reports without a rescuer
+        statuses (Sequence[str]): Subset of OPEN_STATUSES (default all)
+        fields (Sequence[str]): Columns to return
+
+    Returns:
+        List[Dict]: Reports best first, with 'effective_priority' and 'waiting_minutes'
+    """
+    statuses = [status for status in (statuses or OPEN_STATUSES) if status in OPEN_STATUSES]
+    queryset = EmergencyReport.objects.filter(status__in=statuses)
+    if unassigned:
+        queryset = queryset.filter(assigned_to__isnull=True)
+
+    now = timezone.now()
+    offset = effective_priority(0.0, now)
+    extra = [field for field in ('queue_key', 'created_at') if field not in fields]
+    rows = list(queryset.order_by('-queue_key').values(*fields, *extra)[:k])
+    for row in rows:
+        row['effective_priority'] = round(row['queue_key'] + offset, 2)
+        row['waiting_minutes'] = round((now - row['created_at']).total_seconds() / 60, 1)
+        for field in extra:
+            del row[field]
+    return rows
@@ -0,0 +1,283 @@
+"""
+Bulk report import
+Streams crowd or emergency reports from CSV or JSON-lines files in chunks,
+validates each chunk with vectorized pandas checks and inserts the valid rows
+with bulk_create, so partner datasets load at thousands of rows per second
+"""
+
+import os
+import time
+import logging
+from collections import Counter
+from datetime import timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .incident_service import cluster_reports_in_bulk, select_current_reports
+from .ingestion_service import ReportIngestionService, bulk_create_backdated
+from .models import CrowdReport, EmergencyReport, set_geohash
+from .rollup_service import record_created
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+REPORT_KINDS = ('crowd', 'emergency')
+
+# Text columns kept per kind (numeric lat, lng and severity and created_at are handled separately)
+TEXT_COLUMNS = {
+    'crowd': ('category', 'note', 'device_fingerprint'),
+    'emergency': ('category', 'phone_number', 'description', 'channel', 'language',
+                  'caller_name', 'address', 'district', 'state', 'status'),
+}
+
+# Status given to imported emergency reports without a status column, so
+# historical data does not land in the open queue
+DEFAULT_IMPORT_STATUS = 'resolved'
+
+FILE_FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.json': 'jsonl'}
+
+
+def read_chunks(path: str, file_format: Optional[str] = None, chunk_size: int = 5000) -> Iterator[pd.DataFrame]:
+    """
+    Stream a CSV or JSON-lines file as DataFrames of chunk_size rows
+
+    Raises:
+        ValueError: If the format cannot be determined
+    """
+    file_format = file_format or FILE_FORMATS.get(os.path.splitext(path)[1].lower())
+    if file_format == 'csv':
+        # Everything as text so phone numbers keep leading zeros and '+'
+        return pd.read_csv(path, chunksize=chunk_size, dtype=str, keep_default_na=False, na_values=[''])
+    if file_format == 'jsonl':
+        return pd.read_json(path, lines=True, chunksize=chunk_size, dtype=False, convert_dates=False)
+    raise ValueError(f'Unknown file format for {path}; use --format csv or jsonl')
+
+
+def _text(frame: pd.DataFrame, column: str) -> pd.Series:
+    """Stripped text column, None where missing or blank"""
+    if column not in frame:
+        return pd.Series([None] * len(frame), index=frame.index, dtype=object)
+    values = frame[column].where(frame[column].notna(), None)
+    values = values.map(lambda value: None if value is None else str(value).strip() or None)
+    return values.astype(object)
+
+
+def _number(frame: pd.DataFrame, column: str) -> Tuple[pd.Series, pd.Series]:
+    """Numeric column (NaN where blank) and a mask of non-blank cells that are not numbers"""
+    text = _text(frame, column)
+    values = pd.to_numeric(text, errors='coerce')
+    return values, text.notna() & values.isna()
+
+
+def _timestamp(value: Optional[str]):
+    """Aware datetime from ISO 8601 text (naive times are in the current time zone), None if unparseable"""
+    try:
+        parsed = parse_datetime(value) if value else None
+    except ValueError:
+        return None
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def validate_chunk(frame: pd.DataFrame, kind: str,
+                   default_status: str = DEFAULT_IMPORT_STATUS) -> Tuple[pd.DataFrame, Counter]:
+    """
+    Normalise a chunk and drop invalid rows
+
+    Coordinates must fall inside settings.INDIA_BOUNDS (optional for emergency
+    reports, as long as both or neither are given), categories must be known
+    and severities in range; emergency reports need a phone number and description.
+    Defaults only fill blank cells: a value that does not parse rejects the row.
+    created_at is optional ISO 8601 and must not be in the future.
+
+    Args:
+        frame (pd.DataFrame): Raw rows
+        kind (str): 'crowd' or 'emergency'
+        default_status (str): Status for emergency rows without one
+
+    Returns:
+        Tuple[pd.DataFrame, Counter]: (valid rows with clean columns, rejected rows per reason)
+    """
+    frame = frame.rename(columns=lambda column: str(column).strip().lower())
+    clean = pd.DataFrame(index=frame.index)
+    for column in TEXT_COLUMNS[kind]:
+        clean[column] = _text(frame, column)
+    clean['lat'], bad_lat = _number(frame, 'lat')
+    clean['lng'], bad_lng = _number(frame, 'lng')
+    clean['severity'], bad_severity = _number(frame, 'severity')
+    created_text = _text(frame, 'created_at')
+    clean['created_at'] = created_text.map(_timestamp).astype(object)
+    bad_created_at = created_text.notna() & clean['created_at'].isna()
+    now = timezone.now()
+    not_future = clean['created_at'].map(lambda value: pd.isna(value) or value <= now)
+
+    bounds = settings.INDIA_BOUNDS
+    valid_coordinates = ~(bad_lat | bad_lng)
+    located = clean['lat'].notna() & clean['lng'].notna()
+    in_bounds = (clean['lat'].between(bounds['MIN_LAT'], bounds['MAX_LAT']) &
+                 clean['lng'].between(bounds['MIN_LNG'], bounds['MAX_LNG']))
+    clean['category'] = clean['category'].str.lower()
+
+    if kind == 'crowd':
+        model = CrowdReport
+        clean['category'] = clean['category'].fillna('other')
+        # Blank cells only; unparseable ones stay NaN and fail the range check
+        clean['severity'] = clean['severity'].where(bad_severity | clean['severity'].notna(), 0)
+        checks = [
+            ('invalid coordinates', valid_coordinates),
+            ('missing coordinates', located),
+            ('outside India bounds', in_bounds),
+            ('unknown category', clean['category'].isin([choice for choice, _ in model.CATEGORY_CHOICES])),
+            ('invalid severity', (clean['severity'] >= 0) & (clean['severity'] % 1 == 0)),
+            ('invalid created_at', ~bad_created_at),
+            ('created_at in the future', not_future),
+        ]
+    else:
+        model = EmergencyReport
+        clean['severity'] = clean['severity'].where(bad_severity | clean['severity'].notna(), 1)
+        clean['channel'] = clean['channel'].str.lower().fillna('web')
+        clean['language'] = clean['language'].str.lower().fillna('en')
+        clean['status'] = clean['status'].str.lower().fillna(default_status)
+        unlocated = clean['lat'].isna() & clean['lng'].isna()
+        checks = [
+            ('missing phone number', clean['phone_number'].notna()),
+            ('phone number too long', clean['phone_number'].str.len().fillna(0) <= 15),
+            ('missing description', clean['description'].notna()),
+            ('invalid coordinates', valid_coordinates),
+            ('partial coordinates', located | unlocated),
+            ('outside India bounds', unlocated | in_bounds),
+            ('unknown category', clean['category'].isin([choice for choice, _ in model.CATEGORY_CHOICES])),
+            ('invalid severity', clean['severity'].isin([choice for choice, _ in model.SEVERITY_CHOICES])),
+            ('unknown channel', clean['channel'].isin([choice for choice, _ in model.CHANNEL_CHOICES])),
+            ('unknown language', clean['language'].isin([choice for choice, _ in model.LANGUAGE_CHOICES])),
+            ('unknown status', clean['status'].isin([choice for choice, _ in model.STATUS_CHOICES])),
+            ('invalid created_at', ~bad_created_at),
+            ('created_at in the future', not_future),
+        ]
+
+    # Each rejected row is counted once, under the first check it fails
+    valid = pd.Series(True, index=clean.index)
+    rejected = Counter()
+    for reason, passed in checks:
+        failed = valid & ~passed.fillna(False).astype(bool)
+        if failed.any():
+            rejected[reason] = int(failed.sum())
+        valid &= ~failed
+
+    clean = clean[valid]
+    clean['severity'] = clean['severity'].astype(int)
+    return clean, rejected
+
+
+def _optional(value):
+    """NaN/NaT -> None for nullable model fields"""
+    return None if value is None or pd.isna(value) else value
+
+
+def insert_crowd_reports(rows: pd.DataFrame) -> List[CrowdReport]:
+    """Insert validated crowd report rows; returns the saved reports"""
+    reports = []
+    for row in rows.itertuples(index=False):
+        report = CrowdReport(
+            category=row.category, severity=row.severity, note=row.note,
+            lat=float(row.lat), lng=float(row.lng), device_fingerprint=row.device_fingerprint,
+            created_at=_optional(row.created_at),
+        )
+        # bulk_create skips save()
+        set_geohash(report)
+        reports.append(report)
+
+    with transaction.atomic():
+        created = bulk_create_backdated(CrowdReport, reports)
+        # ... and post_save, so rollups are fed here (imports are not published to live
+        # dashboards, and import_reports clusters them in one pass at the end)
+        record_created(created)
+    return created
+
+
+def insert_emergency_reports(rows: pd.DataFrame) -> List[EmergencyReport]:
+    """
+    Insert validated emergency report rows; returns the saved reports
+
+    Goes through the ingestion service for report IDs, priority and district
+    lookup, but without auto-dispatch or live events: imported reports are
+    not new emergencies for rescuers or dashboards.
+    """
+    reports = []
+    for row in rows.itertuples(index=False):
+        fields = {
+            'language': row.language,
+            'caller_name': row.caller_name,
+            'address': row.address,
+            'lat': _optional(row.lat),
+            'lng': _optional(row.lng),
+            'status': row.status,
+            # Also sets the queue position of reports imported as open
+            'created_at': _optional(row.created_at),
+        }
+        if row.district:
+            fields['district'] = row.district
+        if row.state:
+            fields['state'] = row.state
+        reports.append(ReportIngestionService.build_report(
+            channel=row.channel, phone_number=row.phone_number, category=row.category,
+            severity=row.severity, description=row.description, raw_data={'source': 'import'}, **fields
+        ))
+    return ReportIngestionService.create_reports(reports, live=False)
+
+
+def import_reports(path: str, kind: str, file_format: Optional[str] = None, chunk_size: int = 5000,
+                   dry_run: bool = False, progress: Optional[Callable[[Dict], None]] = None,
+                   default_status: str = DEFAULT_IMPORT_STATUS) -> Dict:
+    """
+    Import a file of reports chunk by chunk
+
+    Each chunk is committed on its own, so memory stays bounded and an
+    interrupted import keeps the chunks already loaded. Incident clustering
+    runs once at the end, over the imported reports that are still open and
+    inside INCIDENT_WINDOW_MINUTES; older history does not start incidents.
+
+    Args:
+        path (str): CSV or JSON-lines file
+        kind (str): 'crowd' or 'emergency'
+        file_format (str): 'csv' or 'jsonl' (default from the file extension)
+        chunk_size (int): Rows validated and inserted at a time
+        dry_run (bool): Validate without inserting
+        progress (Callable): Called with the running totals after each chunk
+        default_status (str): Status for emergency rows without a status column
+
+    Returns:
+        Dict: 'rows', 'imported', 'clustered', 'rejected' (per reason), 'seconds'
+    """
+    if kind not in REPORT_KINDS:
+        raise ValueError(f"kind must be one of {', '.join(REPORT_KINDS)}")
+
+    insert = insert_crowd_reports if kind == 'crowd' else insert_emergency_reports
+    started = time.perf_counter()
+    totals = {'rows': 0, 'imported': 0, 'clustered': 0, 'rejected': Counter(), 'seconds': 0.0}
+    since = timezone.now() - timedelta(minutes=getattr(settings, 'INCIDENT_WINDOW_MINUTES', 120))
+    current = []
+
+    for chunk in read_chunks(path, file_format, chunk_size):
+        rows, rejected = validate_chunk(chunk, kind, default_status)
+        if not dry_run and len(rows):
+            created = insert(rows)
+            totals['imported'] += len(created)
+            current.extend(select_current_reports(created, since))
+        totals['rows'] += len(chunk)
+        totals['rejected'].update(rejected)
+        totals['seconds'] = round(time.perf_counter() - started, 2)
+        if progress:
+            progress(totals)
+
+    totals['clustered'] = cluster_reports_in_bulk(current)
+    totals['seconds'] = round(time.perf_counter() - started, 2)
+
+    logger.info(f"Imported {totals['imported']} of {totals['rows']} {kind} reports from {path} "
+                f"in {totals['seconds']}s{' (dry run)' if dry_run else ''}")
+    return totals
@@ -0,0 +1,172 @@
+"""
+Offline reverse geocoding
+Answers coordinate -> district/state lookups in-process from district boundary
+polygons loaded once and indexed on a regular lat/lng grid
+"""
+
+import json
+import math
+import logging
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from django.conf import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Property names used for district and state by common Indian boundary datasets
+DISTRICT_PROPERTIES = ('district', 'DISTRICT', 'dtname', 'district_name', 'NAME_2')
+STATE_PROPERTIES = ('state', 'STATE', 'ST_NM', 'st_nm', 'state_name', 'NAME_1')
+
+Ring = List[Tuple[float, float]]
+
+
+class Region(NamedTuple):
+    district: str
+    state: str
+    bbox: Tuple[float, float, float, float]  # min_lng, min_lat, max_lng, max_lat
+    polygons: List[List[Ring]]  # each polygon is [outer ring, *holes], points as (lng, lat)
+
+
+def point_in_ring(lng: float, lat: float, ring: Ring) -> bool:
+    """Even-odd ray casting test for a closed ring of (lng, lat) points"""
+    inside = False
+    previous_lng, previous_lat = ring[-1]
+    for ring_lng, ring_lat in ring:
+        if (ring_lat > lat) != (previous_lat > lat):
+            crossing = (previous_lng - ring_lng) * (lat - ring_lat) / (previous_lat - ring_lat) + ring_lng
+            if lng < crossing:
+                inside = not inside
+        previous_lng, previous_lat = ring_lng, ring_lat
+    return inside
+
+
+def point_in_polygon(lng: float, lat: float, polygon: Sequence[Ring]) -> bool:
+    """Inside the outer ring and outside every hole"""
+    if not point_in_ring(lng, lat, polygon[0]):
+        return False
+    return not any(point_in_ring(lng, lat, hole) for hole in polygon[1:])
+
+
+class OfflineReverseGeocoder:
+    """Point-in-polygon lookup over district boundaries with a uniform grid index"""
+
+    def __init__(self, regions: Optional[List[Region]] = None, cell_degrees: float = 0.25):
+        self.cell_degrees = cell_degrees
+        self.regions = []
+        self._grid = defaultdict(list)
+        for region in regions or []:
+            self.add(region)
+
+    def _cell(self, lng: float, lat: float) -> Tuple[int, int]:
+        return math.floor(lng / self.cell_degrees), math.floor(lat / self.cell_degrees)
+
+    def add(self, region: Region) -> None:
+        """Index a region under every grid cell its bounding box touches"""
+        index = len(self.regions)
+        self.regions.append(region)
+        min_x, min_y = self._cell(region.bbox[0], region.bbox[1])
+        max_x, max_y = self._cell(region.bbox[2], region.bbox[3])
+        for x in range(min_x, max_x + 1):
+            for y in range(min_y, max_y + 1):
+                self._grid[(x, y)].append(index)
+
+    @staticmethod
+    def _property(properties: Dict, names: Sequence[str]) -> str:
+        for name in names:
+            value = properties.get(name)
+            if value:
+                return str(value).strip().title()
+        return 'Unknown'
+
+    @classmethod
+    def from_geojson(cls, path: str, cell_degrees: float = 0.25) -> 'OfflineReverseGeocoder':
+        """
+        Load district boundaries from a GeoJSON FeatureCollection
+
+        Args:
+            path (str): GeoJSON file with Polygon/MultiPolygon district features
+            cell_degrees (float): Grid cell size in degrees
+
+        Returns:
+            OfflineReverseGeocoder: Indexed geocoder
+        """
+        with open(path, encoding='utf-8') as boundaries_file:
+            collection = json.load(boundaries_file)
+
+        geocoder = cls(cell_degrees=cell_degrees)
+        for feature in collection.get('features', []):
+            geometry = feature.get('geometry') or {}
+            if geometry.get('type') == 'Polygon':
+                raw_polygons = [geometry['coordinates']]
+            elif geometry.get('type') == 'MultiPolygon':
+                raw_polygons = geometry['coordinates']
+            else:
+                continue
+
+            polygons = [
+                [[(float(point[0]), float(point[1])) for point in ring] for ring in polygon if ring]
+                for polygon in raw_polygons if polygon
+            ]
+            outer_points = [point for polygon in polygons for point in polygon[0]]
+            if not outer_points:
+                continue
+
+            properties = feature.get('properties') or {}
+            geocoder.add(Region(
+                district=cls._property(properties, DISTRICT_PROPERTIES),
+                state=cls._property(properties, STATE_PROPERTIES),
+                bbox=(
+                    min(point[0] for point in outer_points),
+                    min(point[1] for point in outer_points),
+                    max(point[0] for point in outer_points),
+                    max(point[1] for point in outer_points),
+                ),
+                polygons=polygons
+            ))
+
+        return geocoder
+
+    def lookup(self, lat: float, lng: float) -> Optional[Dict]:
+        """
+        Find the district containing a point
+
+        Args:
+            lat (float): Latitude
+            lng (float): Longitude
+
+        Returns:
+            Dict: 'state', 'district' and 'address', or None outside all boundaries
+        """
+        for index in self._grid.get(self._cell(lng, lat), ()):
+            region = self.regions[index]
+            min_lng, min_lat, max_lng, max_lat = region.bbox
+            if not (min_lng <= lng <= max_lng and min_lat <= lat <= max_lat):
+                continue
+            if any(point_in_polygon(lng, lat, polygon) for polygon in region.polygons):
+                return {
+                    'state': region.state,
+                    'district': region.district,
+                    'address': f"{region.district}, {region.state}"
+                }
+        return None
+
+
+@lru_cache(maxsize=None)
+def get_reverse_geocoder() -> OfflineReverseGeocoder:
+    """Return the process-wide geocoder, loading REVERSE_GEOCODER_BOUNDARIES_PATH on first use"""
+    path = getattr(settings, 'REVERSE_GEOCODER_BOUNDARIES_PATH', None)
+    cell_degrees = getattr(settings, 'REVERSE_GEOCODER_CELL_DEGREES', 0.25)
+    if not path:
+        return OfflineReverseGeocoder(cell_degrees=cell_degrees)
+
+    try:
+        geocoder = OfflineReverseGeocoder.from_geojson(path, cell_degrees)
+        logger.info(f"Loaded {len(geocoder.regions)} district boundaries from {path}")
+        return geocoder
+    except FileNotFoundError:
+        logger.warning(f"District boundaries {path} not found; reverse geocoding will use the online service")
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.error(f"Failed to load district boundaries {path}: {str(e)}")
+    return OfflineReverseGeocoder(cell_degrees=cell_degrees)
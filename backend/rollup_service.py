@@ -0,0 +1,205 @@
+"""
+Report statistics rollups
+Keeps running report counts per region/category/severity/status and per grid
+cell and hour, adjusted on every write, so dashboard totals are read from a
+few small rows instead of GROUP BY scans over the report tables
+"""
+
+import math
+import logging
+from collections import Counter
+from typing import Dict, Iterable, Optional, Tuple
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import CrowdReport, EmergencyReport, ReportCellStat, ReportStat
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+STAT_FIELDS = ('model_label', 'state', 'district', 'category', 'severity', 'status')
+CELL_FIELDS = ('model_label', 'category', 'cell_row', 'cell_col', 'hour')
+
+# Report columns the rollups are keyed on
+DIMENSION_FIELDS = {
+    EmergencyReport: ('state', 'district', 'category', 'severity', 'status', 'lat', 'lng', 'created_at'),
+    CrowdReport: ('category', 'severity', 'lat', 'lng', 'created_at'),
+}
+
+# Batches touching more rollup rows than this are written with bulk operations
+BULK_APPLY_THRESHOLD = 50
+
+StatKey = Tuple
+CellKey = Optional[Tuple]
+
+
+def cell_degrees() -> float:
+    return getattr(settings, 'ROLLUP_CELL_DEGREES', 0.5)
+
+
+def rollup_keys(model_label: str, values: Dict) -> Tuple[StatKey, CellKey]:
+    """
+    Rollup rows a report counts towards
+
+    Args:
+        model_label (str): Report model label (e.g. 'backend.emergencyreport')
+        values (Dict): The report's DIMENSION_FIELDS
+
+    Returns:
+        Tuple: (ReportStat key, ReportCellStat key or None without coordinates)
+    """
+    stat_key = (
+        model_label,
+        values.get('state') or '',
+        values.get('district') or '',
+        values.get('category') or '',
+        values.get('severity') or 0,
+        values.get('status') or '',
+    )
+
+    lat, lng, created_at = values.get('lat'), values.get('lng'), values.get('created_at')
+    if lat is None or lng is None or created_at is None:
+        return stat_key, None
+    degrees = cell_degrees()
+    cell_key = (
+        model_label,
+        values.get('category') or '',
+        math.floor(lat / degrees),
+        math.floor(lng / degrees),
+        created_at.replace(minute=0, second=0, microsecond=0),
+    )
+    return stat_key, cell_key
+
+
+def report_values(report) -> Dict:
+    """DIMENSION_FIELDS of a report instance"""
+    return {field: getattr(report, field) for field in DIMENSION_FIELDS[type(report)]}
+
+
+class RollupDelta:
+    """Counter changes for a batch of writes, applied together"""
+
+    def __init__(self):
+        self.stats = Counter()
+        self.cells = Counter()
+
+    def add(self, model_label: str, values: Dict, delta: int = 1) -> None:
+        stat_key, cell_key = rollup_keys(model_label, values)
+        self.stats[stat_key] += delta
+        if cell_key is not None:
+            self.cells[cell_key] += delta
+
+    def add_reports(self, reports: Iterable, delta: int = 1) -> 'RollupDelta':
+        for report in reports:
+            self.add(report._meta.label_lower, report_values(report), delta)
+        return self
+
+    def apply(self) -> None:
+        """Write the changes; call inside the transaction that wrote the reports"""
+        # Low-cardinality columns narrow the lookup of existing rows for large batches
+        _apply_counts(ReportStat, STAT_FIELDS, self.stats, ('model_label', 'category'))
+        _apply_counts(ReportCellStat, CELL_FIELDS, self.cells, ('model_label', 'hour'))
+
+
+def _increment(model, dimensions: Dict, delta: int) -> None:
+    """Add delta to a rollup row in place, creating the row on first use"""
+    if model.objects.filter(**dimensions).update(count=F('count') + delta):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(count=delta, **dimensions)
+    except IntegrityError:
+        # Another writer created the row first
+        model.objects.filter(**dimensions).update(count=F('count') + delta)
+
+
+def _apply_counts(model, fields: Tuple[str, ...], deltas: Counter, narrow_by: Tuple[str, ...]) -> None:
+    """
+    Add a batch of deltas to rollup rows
+
+    A few rows are updated one by one; larger batches (bulk ingestion and
+    imports) read the existing rows once and write them with one bulk_update
+    of F() increments plus one bulk_create for new keys.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if len(deltas) <= BULK_APPLY_THRESHOLD:
+        for key, delta in deltas.items():
+            _increment(model, dict(zip(fields, key)), delta)
+        return
+
+    positions = [fields.index(field) for field in narrow_by]
+    candidates = model.objects.filter(**{
+        f'{field}__in': {key[position] for key in deltas}
+        for field, position in zip(narrow_by, positions)
+    })
+    existing = {tuple(getattr(row, field) for field in fields): row for row in candidates}
+
+    updated = []
+    for key, row in existing.items():
+        if key in deltas:
+            row.count = F('count') + deltas[key]
+            updated.append(row)
+    model.objects.bulk_update(updated, ['count'], batch_size=500)
+
+    missing = [key for key in deltas if key not in existing]
+    try:
+        with transaction.atomic():
+            model.objects.bulk_create(
+                [model(count=deltas[key], **dict(zip(fields, key))) for key in missing], batch_size=1000
+            )
+    except IntegrityError:
+        # Some keys were created concurrently; fall back to per-row upserts for the new ones
+        for key in missing:
+            _increment(model, dict(zip(fields, key)), deltas[key])
+
+
+def record_created(reports: Iterable) -> None:
+    """Count newly inserted reports (for bulk_create paths that skip post_save)"""
+    RollupDelta().add_reports(reports).apply()
+
+
+def record_changed(report, previous: Dict) -> None:
+    """Move a report between rollup rows if a dimension it is keyed on changed"""
+    label = report._meta.label_lower
+    current = report_values(report)
+    if rollup_keys(label, previous) == rollup_keys(label, current):
+        return
+    delta = RollupDelta()
+    delta.add(label, previous, -1)
+    delta.add(label, current, 1)
+    delta.apply()
+
+
+def record_deleted(report) -> None:
+    """Stop counting a deleted report"""
+    RollupDelta().add_reports([report], -1).apply()
+
+
+def rebuild_rollups() -> Dict[str, int]:
+    """
+    Recount every rollup row from the report tables
+
+    Returns:
+        Dict[str, int]: Rows written per rollup table
+    """
+    delta = RollupDelta()
+    for model, fields in DIMENSION_FIELDS.items():
+        label = model._meta.label_lower
+        for row in model.objects.values(*fields).iterator(chunk_size=5000):
+            delta.add(label, row)
+
+    with transaction.atomic():
+        ReportStat.objects.all().delete()
+        ReportCellStat.objects.all().delete()
+        ReportStat.objects.bulk_create(
+            [ReportStat(count=count, **dict(zip(STAT_FIELDS, key))) for key, count in delta.stats.items()],
+            batch_size=1000
+        )
+        ReportCellStat.objects.bulk_create(
+            [ReportCellStat(count=count, **dict(zip(CELL_FIELDS, key))) for key, count in delta.cells.items()],
+            batch_size=1000
+        )
+
+    logger.info(f"Rebuilt {len(delta.stats)} report stats and {len(delta.cells)} cell stats")
+    return {'stats': len(delta.stats), 'cells': len(delta.cells)}
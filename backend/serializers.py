@@ -5,8 +5,10 @@ from .models import CrowdReport, EmergencyReport, EmergencyResponse
 class CrowdReportSerializer(serializers.ModelSerializer):
     class Meta:
         model = CrowdReport
-        fields = "__all__"
-        read_only_fields = ("created_at",)
+        # The geohash is internal and the fingerprint identifies the reporter's device
+        exclude = ("geohash",)
+        read_only_fields = ("created_at", "thumbnail")
+        extra_kwargs = {"device_fingerprint": {"write_only": True}}
 
     def validate_category(self, value):
         allowed = [c[0] for c in CrowdReport.CATEGORY_CHOICES]  # 👈 fixed
@@ -35,7 +37,7 @@ class EmergencyReportSerializer(serializers.ModelSerializer):
     class Meta:
         model = EmergencyReport
         fields = "__all__"
-        read_only_fields = ("created_at", "updated_at", "acknowledged_at", "resolved_at")
+        read_only_fields = ("created_at", "updated_at", "acknowledged_at", "resolved_at", "repeat_count", "queue_key")
     
     def validate_phone_number(self, value):
         # Basic phone number validation
@@ -0,0 +1,98 @@
+"""
+Model signal handlers
+Publish saved reports to the live event stream once their transaction commits,
+cluster new reports into incidents (and take deleted ones back out), keep the statistics rollups current, queue
+uploaded photos for processing, and leave tombstones for deleted reports so
+delta-sync clients can drop them
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .events import crowd_report_payload, emergency_report_payload, get_event_bus
+from .image_pipeline import schedule_photo_processing
+from .incident_service import get_incident_clusterer, schedule_clustering
+from .models import CrowdReport, EmergencyReport
+from .rollup_service import DIMENSION_FIELDS, record_changed, record_created, record_deleted, report_values
+from .sync_service import record_deletion
+
+
+@receiver(post_save, sender=EmergencyReport)
+def publish_emergency_report(sender, instance, created, raw=False, **kwargs):
+    """Stream new and updated emergency reports to dashboards"""
+    if raw:
+        return
+    get_event_bus().publish_on_commit(
+        'emergency_report', 'created' if created else 'updated', emergency_report_payload(instance)
+    )
+    if created:
+        schedule_clustering([instance])
+
+
+@receiver(post_save, sender=CrowdReport)
+def publish_crowd_report(sender, instance, created, raw=False, **kwargs):
+    """Stream crowd reports to the public map"""
+    if raw:
+        return
+    get_event_bus().publish_on_commit(
+        'crowd_report', 'created' if created else 'updated', crowd_report_payload(instance)
+    )
+    if created:
+        schedule_clustering([instance])
+    schedule_photo_processing(instance)
+
+
+@receiver(post_delete, sender=EmergencyReport)
+@receiver(post_delete, sender=CrowdReport)
+def record_report_deletion(sender, instance, **kwargs):
+    """Tombstone deleted reports for the since-token sync feeds"""
+    record_deletion(sender._meta.label_lower, instance.pk)
+
+
+@receiver(post_delete, sender=EmergencyReport)
+@receiver(post_delete, sender=CrowdReport)
+def remove_report_from_incident(sender, instance, **kwargs):
+    """Stop counting deleted reports towards their incident"""
+    get_incident_clusterer().remove_report(instance)
+
+
+@receiver(pre_save, sender=EmergencyReport)
+@receiver(pre_save, sender=CrowdReport)
+def remember_rollup_dimensions(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Keep the stored values an update may change, so its rollup rows can be moved"""
+    instance._rollup_previous = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    fields = DIMENSION_FIELDS[sender]
+    if update_fields is not None and not set(update_fields) & set(fields):
+        return
+    loaded = getattr(instance, '_loaded_values', {})
+    if all(field in loaded for field in fields):
+        instance._rollup_previous = {field: loaded[field] for field in fields}
+    else:
+        # Built by hand or loaded with deferred fields
+        instance._rollup_previous = sender.objects.filter(pk=instance.pk).values(*fields).first()
+
+
+@receiver(post_save, sender=EmergencyReport)
+@receiver(post_save, sender=CrowdReport)
+def update_report_rollups(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Count new reports and move updated ones between rollup rows"""
+    if raw:
+        return
+    if created:
+        record_created([instance])
+    elif getattr(instance, '_rollup_previous', None):
+        record_changed(instance, instance._rollup_previous)
+    # What is stored now is what the next save of this instance is compared against
+    saved = report_values(instance)
+    if update_fields is not None:
+        saved = {field: value for field, value in saved.items() if field in update_fields}
+    instance._loaded_values = {**getattr(instance, '_loaded_values', {}), **saved}
+
+
+@receiver(post_delete, sender=EmergencyReport)
+@receiver(post_delete, sender=CrowdReport)
+def remove_report_from_rollups(sender, instance, **kwargs):
+    """Stop counting deleted reports"""
+    record_deleted(instance)
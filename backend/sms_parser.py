@@ -0,0 +1,370 @@
+"""
+Table-driven multilingual emergency SMS parser
+Extracts category, severity and location hints from free-text SMS in a single
+Aho-Corasick pass over keyword tables compiled once per process
+"""
+
+import re
+import string
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .language_support import EMERGENCY_CATEGORIES, SEVERITY_LEVELS
+
+# Common English words and romanized (transliterated) forms people actually type
+CATEGORY_TRANSLITERATIONS = {
+    'medical': [
+        'medical', 'ambulance', 'injured', 'injury', 'bleeding', 'unconscious',
+        'heart attack', 'doctor', 'hospital', 'chot', 'ghayal', 'bimar', 'beemar',
+        'ilaj', 'davai', 'dawai', 'घायल', 'एम्बुलेंस', 'डॉक्टर', 'अस्पताल',
+    ],
+    'fire': [
+        'fire', 'burning', 'smoke', 'blaze', 'aag', 'agni', 'aagun',
+        'dhuan', 'धुआं',
+    ],
+    'flood': [
+        'flood', 'floods', 'flooding', 'flooded', 'water level', 'waterlogging',
+        'baadh', 'badh', 'baarh', 'barh', 'bonya', 'bonna', 'vellam', 'varada',
+        'pralay', 'बाढ', 'வெள்ள',
+    ],
+    'earthquake': [
+        'earthquake', 'quake', 'tremor', 'tremors', 'bhukamp', 'bhookamp',
+        'bhukampa', 'bhumikamp', 'bhumikampo', 'nilanadukkam', 'भूकम्प',
+    ],
+    'cyclone': [
+        'cyclone', 'storm', 'hurricane', 'typhoon', 'toofan', 'tufan', 'toofaan',
+        'chakravat', 'chakrawat', 'ghurnijhar', 'ghurnijhor', 'तूफान',
+    ],
+    'landslide': [
+        'landslide', 'landslides', 'mudslide', 'mud slide', 'bhuskhalan',
+        'bhooskhalan', 'bhusakhalan', 'bhusskhalan',
+    ],
+    'roadblock': [
+        'roadblock', 'road block', 'road blocked', 'blocked road', 'road closed',
+        'rasta band', 'sadak band', 'सड़क बंद', 'रास्ता बंद',
+    ],
+}
+
+SEVERITY_TRANSLITERATIONS = {
+    4: ['critical', 'urgent', 'sos', 'dying', 'life threatening', 'gambhir', 'turant', 'तुरंत'],
+    3: ['serious', 'severe', 'high', 'jaldi', 'zyada', 'jyada'],
+    2: ['medium', 'moderate', 'madhyam'],
+    1: ['low', 'minor', 'kam'],
+}
+
+STRICT_PREFIX = 'emergency'
+DEFAULT_DESCRIPTION = 'Emergency reported via SMS'
+INVALID_FORMAT_ERROR = 'Invalid format. Use: EMERGENCY <category> <severity> <description>'
+
+# Letters of a word: \w leaves out Indic vowel signs and viramas (Unicode marks),
+# which would split 'पटना' into fragments; the dandas are punctuation
+WORD_CHARS = r'\w\u0900-\u0963\u0966-\u0DFF'
+_WORD_CHAR = re.compile(f'[{WORD_CHARS}]')
+
+# Words that mark the next (or, for postpositions, the previous) word as a place
+PLACE_CUES_BEFORE = {'in', 'at', 'near', 'from', 'around', 'village', 'district', 'gaon', 'gram', 'गांव', 'ग्राम'}
+PLACE_CUES_AFTER = {
+    'में', 'मे', 'के', 'से', 'पास', 'जिला', 'mein', 'me', 'mai', 'main', 'ke', 'se', 'paas', 'pass',
+    'district', 'dist', 'jila', 'zila', 'city', 'nagar', 'village',
+}
+
+# Place names that are also everyday words in Hinglish or English SMS ('pani bhar gaya',
+# 'mandi me aag'); only taken as places when their state is named too
+COMMON_WORD_PLACE_NAMES = {
+    'gaya', 'kota', 'mandi', 'sagar', 'pali', 'dhar', 'banda', 'panna', 'puri', 'surat', 'mansa',
+    'anand', 'krishna', 'nirmal', 'saran', 'sakti', 'hassan', 'daman', 'baran', 'bastar', 'chatra',
+    'salem', 'patan', 'mahe', 'nadia', 'rewa', 'tonk', 'durg', 'bhind', 'deeg', 'tapi', 'sirsa',
+}
+
+# Unicode block start -> language, for messages with no language-specific keyword
+SCRIPT_LANGUAGES = [
+    (0x0900, 'hi'),  # Devanagari
+    (0x0980, 'bn'),  # Bengali / Assamese
+    (0x0A00, 'pa'),  # Gurmukhi
+    (0x0A80, 'gu'),  # Gujarati
+    (0x0B00, 'or'),  # Odia
+    (0x0B80, 'ta'),  # Tamil
+    (0x0C00, 'te'),  # Telugu
+    (0x0C80, 'kn'),  # Kannada
+    (0x0D00, 'ml'),  # Malayalam
+]
+ASSAMESE_LETTERS = {'ৰ', 'ৱ'}
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text for keyword matching
+
+    Case-folds, applies NFC and drops the Devanagari nukta so that
+    precomposed and decomposed spellings (e.g. 'ढ़' / 'ढ') match the same key.
+    """
+    return unicodedata.normalize('NFC', text).casefold().replace('़', '')
+
+
+def detect_script_language(text: str) -> str:
+    """Guess the language from the script of the first non-Latin letter"""
+    for char in text:
+        if char.isascii() or not char.isalpha():
+            continue
+        code_point = ord(char)
+        if not 0x0900 <= code_point < 0x0D80:
+            continue
+        language = 'en'
+        for block_start, block_language in SCRIPT_LANGUAGES:
+            if code_point >= block_start:
+                language = block_language
+        if language == 'bn' and ASSAMESE_LETTERS.intersection(text):
+            return 'as'
+        return language
+    return 'en'
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over a fixed keyword set"""
+
+    def __init__(self, keywords: List[Tuple[str, object]]):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for keyword, payload in keywords:
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append((len(keyword), payload))
+
+        # Breadth-first construction of failure links, merging outputs along them
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, object]]:
+        """Yield (start, end, payload) for every keyword occurrence in text"""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                end = index + 1
+                for length, payload in output[state]:
+                    yield end - length, end, payload
+
+
+class EmergencySMSParser:
+    """Parses strict 'EMERGENCY <category> <severity>' and free-text SMS in any supported language"""
+
+    def __init__(self, place_names: Optional[Dict[str, Dict]] = None):
+        self.category_lookup = {}
+        keywords = []
+
+        for language, categories in EMERGENCY_CATEGORIES.items():
+            for category, label in categories.items():
+                if category == 'other':
+                    # 'Other' in any language carries no signal
+                    continue
+                self._add_keyword(keywords, label, ('category', category, language))
+                if language == 'en':
+                    self._add_keyword(keywords, category, ('category', category, 'en'))
+
+        for category, words in CATEGORY_TRANSLITERATIONS.items():
+            for word in words:
+                self._add_keyword(keywords, word, ('category', category, None))
+
+        for language, levels in SEVERITY_LEVELS.items():
+            for level, label in levels.items():
+                self._add_keyword(keywords, label, ('severity', level, language))
+
+        for level, words in SEVERITY_TRANSLITERATIONS.items():
+            for word in words:
+                self._add_keyword(keywords, word, ('severity', level, None))
+
+        for name, location in (place_names or {}).items():
+            self._add_keyword(keywords, name, ('location', location, None))
+
+        # The same word can appear in several tables (e.g. 'आग' in Hindi and
+        # Marathi); keep the first entry per kind so it is only counted once
+        unique_keywords = {}
+        for keyword, payload in keywords:
+            unique_keywords.setdefault((keyword, payload[0]), payload)
+
+        for (keyword, kind), (_, value, _) in unique_keywords.items():
+            if kind == 'category':
+                self.category_lookup.setdefault(keyword, value)
+
+        self.automaton = KeywordAutomaton(
+            [(keyword, payload) for (keyword, _), payload in unique_keywords.items()]
+        )
+
+    @staticmethod
+    def _add_keyword(keywords: List, word: str, payload: Tuple) -> None:
+        keyword = normalize_text(word.replace('_', ' ')).strip()
+        if keyword:
+            keywords.append((keyword, payload))
+
+    @staticmethod
+    def _is_word_match(text: str, start: int, end: int, kind: str) -> bool:
+        """
+        Keywords must start on a word boundary. Latin and severity keywords must
+        also end on one; Indic category and place names may carry case suffixes.
+        """
+        if start > 0 and _WORD_CHAR.match(text[start - 1]):
+            return False
+        if end < len(text) and _WORD_CHAR.match(text[end]):
+            if kind == 'severity' or text[end - 1].isascii():
+                return False
+        return True
+
+    def scan(self, text: str) -> List[Tuple[int, int, Tuple]]:
+        """Return non-overlapping keyword matches, preferring the longest at each position"""
+        matches = sorted(
+            (match for match in self.automaton.iter_matches(text)
+             if self._is_word_match(text, match[0], match[1], match[2][0])),
+            key=lambda match: (match[0], -(match[1] - match[0]))
+        )
+        selected = []
+        last_end = -1
+        for start, end, payload in matches:
+            if start >= last_end:
+                selected.append((start, end, payload))
+                last_end = end
+        return selected
+
+    @staticmethod
+    def _confirmed_places(text: str, mentions: List[Tuple[int, int, Dict]]) -> List[Dict]:
+        """
+        Keep the place names the message uses as places
+
+        A district or city counts when a cue word sits next to it ('in Patna',
+        'पटना में') or when its state is named too; names that are also common
+        words ('gaya', 'mandi') need their state. State names always count.
+        """
+        named_states = {value['state'] for _, _, value in mentions if value['district'] == 'Unknown'}
+        hints = []
+        for start, end, value in mentions:
+            if value['district'] == 'Unknown' or value['state'] in named_states:
+                hints.append(value)
+                continue
+            if text[start:end] in COMMON_WORD_PLACE_NAMES:
+                continue
+            before = [word.strip(string.punctuation) for word in text[:start].split()[-1:]]
+            after = [word.strip(string.punctuation) for word in text[end:].split()[:1]]
+            if PLACE_CUES_BEFORE.intersection(before) or PLACE_CUES_AFTER.intersection(after):
+                hints.append(value)
+        return hints
+
+    @staticmethod
+    def _most_specific(location_hints: List[Dict]) -> Optional[Dict]:
+        """Prefer the first hint that names a district over a bare state"""
+        for hint in location_hints:
+            if hint.get('district') != 'Unknown':
+                return hint
+        return location_hints[0] if location_hints else None
+
+    def parse(self, message: str) -> Dict:
+        """
+        Parse an emergency SMS
+
+        Args:
+            message (str): SMS message content
+
+        Returns:
+            Dict: Parsed emergency data ('valid', 'category', 'severity',
+                  'description', 'language', 'location', 'location_hints')
+        """
+        text = normalize_text(message)
+        tokens = text.split()
+        original_tokens = message.split()
+        strict = bool(tokens) and tokens[0] == STRICT_PREFIX
+
+        matches = self.scan(text)
+        category_votes = Counter()
+        first_seen = {}
+        severity = None
+        language = None
+        place_mentions = []
+        last_category_end = None
+
+        for start, end, (kind, value, keyword_language) in matches:
+            if kind == 'category':
+                category_votes[value] += 1
+                first_seen.setdefault(value, start)
+                last_category_end = end
+                if language is None and keyword_language and keyword_language != 'en':
+                    language = keyword_language
+            elif kind == 'severity':
+                severity = max(severity or 0, value)
+                if language is None and keyword_language and keyword_language != 'en':
+                    language = keyword_language
+            elif kind == 'location':
+                place_mentions.append((start, end, value))
+
+        location_hints = self._confirmed_places(text, place_mentions)
+
+        category = None
+        description_start = 0
+        if strict:
+            category = self.category_lookup.get(tokens[1]) if len(tokens) > 1 else None
+            description_start = 1
+            if len(tokens) > 2 and tokens[2].isdigit():
+                level = int(tokens[2])
+                severity = level if level in (1, 2, 3, 4) else 1
+                description_start = 3
+            elif category:
+                description_start = 2
+
+        if category is None and category_votes:
+            category = max(category_votes, key=lambda value: (category_votes[value], -first_seen[value]))
+
+        if severity is None and last_category_end is not None:
+            # "flood 3 ..." - a bare level right after the category keyword
+            following = text[last_category_end:].split(None, 1)
+            if following and following[0] in ('1', '2', '3', '4'):
+                severity = int(following[0])
+
+        if not strict and category is None:
+            return {
+                'valid': False,
+                'error': INVALID_FORMAT_ERROR
+            }
+
+        description = ' '.join(original_tokens[description_start:]) if strict else message.strip()
+
+        return {
+            'valid': True,
+            'category': category or 'other',
+            'severity': severity or 1,
+            'description': description or DEFAULT_DESCRIPTION,
+            'language': language or detect_script_language(text),
+            'location': self._most_specific(location_hints),
+            'location_hints': location_hints,
+            'original_message': message
+        }
+
+
+@lru_cache(maxsize=None)
+def get_sms_parser() -> EmergencySMSParser:
+    """Return the process-wide parser, compiling the keyword tables on first use"""
+    from .gazetteer import SHORT_NAME_LENGTH, get_gazetteer
+
+    # Without an address context, 'Mon' or 'Una' in an SMS is far more likely a word than a place
+    return EmergencySMSParser(get_gazetteer().place_names(min_length=SHORT_NAME_LENGTH + 1))
@@ -233,8 +233,10 @@ class SMSService:
         """
         Parse emergency SMS message
         
-        Expected format: "EMERGENCY <category> <severity> <description>"
-        Example: "EMERGENCY flood 3 water level rising fast"
+        Accepts the strict format "EMERGENCY <category> <severity> <description>"
+        as well as free text in any supported language, e.g. "बाढ़ पटना में पानी भर गया"
+        or "aag lagi hai jaldi aao". Category, severity and location hints are
+        extracted with the compiled keyword parser in sms_parser.
         
         Args:
             message (str): SMS message content
@@ -243,40 +245,8 @@ class SMSService:
             Dict: Parsed emergency data
         """
         try:
-            # Convert to uppercase and split
-            parts = message.upper().split()
-            
-            if len(parts) < 3 or parts[0] != 'EMERGENCY':
-                return {
-                    'valid': False,
-                    'error': 'Invalid format. Use: EMERGENCY <category> <severity> <description>'
-                }
-            
-            # Extract category
-            category = parts[1].lower()
-            valid_categories = ['medical', 'fire', 'flood', 'earthquake', 'cyclone', 'landslide', 'roadblock', 'other']
-            
-            if category not in valid_categories:
-                category = 'other'
-            
-            # Extract severity
-            try:
-                severity = int(parts[2])
-                if severity not in [1, 2, 3, 4]:
-                    severity = 1
-            except (ValueError, IndexError):
-                severity = 1
-            
-            # Extract description
-            description = ' '.join(parts[3:]) if len(parts) > 3 else 'Emergency reported via SMS'
-            
-            return {
-                'valid': True,
-                'category': category,
-                'severity': severity,
-                'description': description,
-                'original_message': message
-            }
+            from .sms_parser import get_sms_parser
+            return get_sms_parser().parse(message)
             
         except Exception as e:
             return {
@@ -456,3 +426,54 @@ class SMSWebhookHandler:
                 'status': 'error',
                 'message': str(e)
             }
+    
+    @staticmethod
+    def handle_incoming_sms_batch(messages: List[Dict]) -> Dict:
+        """
+        Handle a batch of incoming SMS delivered in one webhook call
+        
+        Parses every message in a single pass. Senders of unparseable
+        messages get the same error SMS as on the single-message webhook.
+        
+        Args:
+            messages (List[Dict]): Webhook message payloads ('From'/'Body')
+            
+        Returns:
+            Dict: Parsed messages and per-message rejections
+        """
+        sms_service = SMSService()
+        accepted = []
+        rejected = []
+        
+        for index, request_data in enumerate(messages):
+            if not isinstance(request_data, dict):
+                rejected.append({'index': index, 'message': 'Malformed message entry'})
+                continue
+            
+            phone_number = (request_data.get('From') or request_data.get('phone_number') or '').strip()
+            message = (request_data.get('Body') or request_data.get('message') or '').strip()
+            
+            if not phone_number or not message:
+                rejected.append({'index': index, 'message': 'Missing phone number or message'})
+                continue
+            
+            parsed_data = sms_service.parse_emergency_sms(message)
+            if not parsed_data['valid']:
+                error_message = parsed_data.get('error', 'Invalid format')
+                sms_service.send_sms(phone_number, error_message)
+                rejected.append({'index': index, 'message': error_message})
+                continue
+            
+            accepted.append({
+                'index': index,
+                'phone_number': phone_number,
+                'message': message,
+                'parsed_data': parsed_data,
+                'webhook_data': request_data
+            })
+        
+        return {
+            'status': 'success',
+            'accepted': accepted,
+            'rejected': rejected
+        }
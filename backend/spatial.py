@@ -0,0 +1,77 @@
+"""
+Spatial queries over report coordinates
+Bounding-box and radius searches that narrow candidates with key ranges on
+the indexed geohash column, then apply the exact bounds or distance
+"""
+
+import math
+from typing import List, Optional, Tuple
+from django.db.models import Q, QuerySet
+
+from .geo import KM_PER_DEGREE_LAT, geohash_ranges, haversine_km
+
+
+def parse_bbox(value: str) -> Tuple[float, float, float, float]:
+    """
+    Parse a 'south,west,north,east' query parameter
+
+    Raises:
+        ValueError: If it is not four numbers
+    """
+    parts = [float(part) for part in value.split(',')]
+    if len(parts) != 4:
+        raise ValueError('bbox must be south,west,north,east')
+    return parts[0], parts[1], parts[2], parts[3]
+
+
+def bbox_q(south: float, west: float, north: float, east: float) -> Q:
+    """
+    Filter for rows with a geohash column whose point lies inside a bounding box
+
+    Args:
+        south, west, north, east (float): Box edges in degrees
+
+    Returns:
+        Q: Geohash range scans plus the exact lat/lng bounds
+    """
+    ranges = Q()
+    for start, end in geohash_ranges(south, west, north, east):
+        ranges |= Q(geohash__gte=start, geohash__lt=end) if end else Q(geohash__gte=start)
+    return ranges & Q(lat__gte=south, lat__lte=north, lng__gte=west, lng__lte=east)
+
+
+def within_bbox(queryset: QuerySet, south: float, west: float, north: float, east: float) -> QuerySet:
+    """Rows of a queryset inside a bounding box"""
+    return queryset.filter(bbox_q(south, west, north, east))
+
+
+def within_radius(queryset: QuerySet, lat: float, lng: float, radius_km: float,
+                  limit: Optional[int] = None) -> List:
+    """
+    Rows of a queryset within radius_km of a point, nearest first
+
+    Candidates come from the circle's bounding box; each returned object
+    gets a distance_km attribute.
+
+    Args:
+        queryset (QuerySet): Reports (any model with lat, lng and geohash)
+        lat (float): Latitude
+        lng (float): Longitude
+        radius_km (float): Search radius
+        limit (int): Maximum number of results
+
+    Returns:
+        List: Matching objects sorted by distance
+    """
+    lat_reach = radius_km / KM_PER_DEGREE_LAT
+    lng_reach = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(min(89.0, abs(lat) + lat_reach))), 1e-6))
+    candidates = within_bbox(queryset, lat - lat_reach, lng - lng_reach, lat + lat_reach, lng + lng_reach)
+
+    found = []
+    for obj in candidates:
+        distance = haversine_km(lat, lng, obj.lat, obj.lng)
+        if distance <= radius_km:
+            obj.distance_km = round(distance, 3)
+            found.append(obj)
+    found.sort(key=lambda obj: obj.distance_km)
+    return found[:limit] if limit else found
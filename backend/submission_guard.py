@@ -0,0 +1,174 @@
+"""
+Crowd report submission guard
+Sliding-window rate limits per device fingerprint and per client IP, and a
+near-duplicate check (same device, same category, nearby point, short
+interval), kept in the shared cache so floods are turned away before they
+reach the database
+"""
+
+import math
+import time
+import logging
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Tuple
+from django.conf import settings
+from django.core.cache import cache
+
+from .geo import haversine_km
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class SubmissionDecision(NamedTuple):
+    """Outcome of a submission check"""
+    allowed: bool = True
+    retry_after: int = 0  # Seconds to wait when rate limited
+    duplicate_of: Optional[int] = None  # Existing report a near-duplicate was folded into
+    reason: str = ''
+
+
+class SlidingWindowLimiter:
+    """
+    Approximate sliding-window counter
+
+    Keeps one counter per subject per fixed window and weights the previous
+    window by how much of it still overlaps the sliding one, so each subject
+    costs two cache keys however many requests it makes.
+    """
+
+    def __init__(self, prefix: str, limit: int, window_seconds: int):
+        self.prefix = prefix
+        self.limit = limit
+        self.window_seconds = window_seconds
+
+    def hit(self, subject: str, now: Optional[float] = None) -> Tuple[bool, int]:
+        """
+        Count one request if it is within the limit
+
+        Returns:
+            Tuple[bool, int]: (allowed, seconds until the current window rolls over)
+        """
+        now = time.time() if now is None else now
+        window = int(now // self.window_seconds)
+        current_key = f"{self.prefix}:{subject}:{window}"
+        previous_key = f"{self.prefix}:{subject}:{window - 1}"
+
+        counts = cache.get_many([current_key, previous_key])
+        overlap = 1 - (now % self.window_seconds) / self.window_seconds
+        estimate = counts.get(previous_key, 0) * overlap + counts.get(current_key, 0)
+        retry_after = max(1, math.ceil(self.window_seconds - now % self.window_seconds))
+        if estimate + 1 > self.limit:
+            return False, retry_after
+
+        # add() then incr() is atomic on Redis and LocMem alike
+        cache.add(current_key, 0, timeout=2 * self.window_seconds)
+        try:
+            cache.incr(current_key)
+        except ValueError:
+            # Expired between add() and incr()
+            cache.set(current_key, 1, timeout=2 * self.window_seconds)
+        return True, retry_after
+
+
+class SubmissionGuard:
+    """Rate limits and near-duplicate detection for crowd report submissions"""
+
+    RECENT_PREFIX = 'crowd_recent'
+    # Recent submissions remembered per device for duplicate checks
+    RECENT_LIMIT = 20
+
+    def __init__(self):
+        window = getattr(settings, 'CROWD_REPORT_RATE_WINDOW_SECONDS', 600)
+        self.device_limiter = SlidingWindowLimiter(
+            'crowd_rate_device', getattr(settings, 'CROWD_REPORT_RATE_LIMIT_PER_DEVICE', 10), window
+        )
+        self.ip_limiter = SlidingWindowLimiter(
+            'crowd_rate_ip', getattr(settings, 'CROWD_REPORT_RATE_LIMIT_PER_IP', 60), window
+        )
+        self.duplicate_radius_km = getattr(settings, 'CROWD_REPORT_DUPLICATE_RADIUS_M', 100) / 1000
+        self.duplicate_seconds = getattr(settings, 'CROWD_REPORT_DUPLICATE_WINDOW_SECONDS', 300)
+        self.ip_header = getattr(settings, 'CROWD_REPORT_CLIENT_IP_HEADER', '')
+
+    def client_ip(self, request) -> str:
+        """
+        Client address; with CROWD_REPORT_CLIENT_IP_HEADER set (e.g. HTTP_X_FORWARDED_FOR
+        behind a proxy) the last hop the proxy appended is used
+        """
+        if self.ip_header and request.META.get(self.ip_header):
+            return request.META[self.ip_header].split(',')[-1].strip()
+        return request.META.get('REMOTE_ADDR', '')
+
+    def get_recent_key(self, subject: str) -> str:
+        return f"{self.RECENT_PREFIX}:{subject}"
+
+    def check(self, request, fingerprint: str, lat: float, lng: float, category: str) -> SubmissionDecision:
+        """
+        Decide whether a submission should be stored
+
+        Near-duplicates are reported as duplicate_of without using up the rate
+        limit, so a client retrying on a bad connection gets the first report back.
+        Only submissions with a device fingerprint are folded: an IP can be shared
+        by many reporters (carrier NAT, a relief camp's Wi-Fi), so it is used for
+        rate limiting alone.
+
+        Args:
+            request (HttpRequest): Incoming request (for the client IP)
+            fingerprint (str): Device fingerprint, may be empty
+            lat (float): Latitude
+            lng (float): Longitude
+            category (str): Report category
+
+        Returns:
+            SubmissionDecision: allowed, or why not
+        """
+        ip = self.client_ip(request)
+        try:
+            if fingerprint:
+                duplicate_of = self.find_duplicate(f"device:{fingerprint}", lat, lng, category)
+                if duplicate_of is not None:
+                    return SubmissionDecision(allowed=False, duplicate_of=duplicate_of, reason='duplicate')
+
+                allowed, retry_after = self.device_limiter.hit(fingerprint)
+                if not allowed:
+                    return SubmissionDecision(allowed=False, retry_after=retry_after, reason='device rate limit')
+            allowed, retry_after = self.ip_limiter.hit(ip)
+            if not allowed:
+                return SubmissionDecision(allowed=False, retry_after=retry_after, reason='ip rate limit')
+        except Exception as e:
+            # Never turn reports away because the cache is down
+            logger.warning(f"Submission guard unavailable, allowing report: {str(e)}")
+
+        return SubmissionDecision()
+
+    def find_duplicate(self, subject: str, lat: float, lng: float, category: str,
+                       now: Optional[float] = None) -> Optional[int]:
+        """ID of a recent report from the same subject this one repeats, if any"""
+        now = time.time() if now is None else now
+        for report_id, recent_lat, recent_lng, recent_category, submitted_at in self._recent(subject):
+            if (recent_category == category and now - submitted_at <= self.duplicate_seconds and
+                    haversine_km(lat, lng, recent_lat, recent_lng) <= self.duplicate_radius_km):
+                return report_id
+        return None
+
+    def remember(self, request, fingerprint: str, report) -> None:
+        """Record a stored report for later duplicate checks (only reports with a device fingerprint are folded)"""
+        if not fingerprint:
+            return
+        subject = f"device:{fingerprint}"
+        now = time.time()
+        try:
+            recent = [entry for entry in self._recent(subject) if now - entry[4] <= self.duplicate_seconds]
+            recent.append((report.id, report.lat, report.lng, report.category, now))
+            cache.set(self.get_recent_key(subject), recent[-self.RECENT_LIMIT:], timeout=self.duplicate_seconds)
+        except Exception as e:
+            logger.warning(f"Could not record submission for duplicate checks: {str(e)}")
+
+    def _recent(self, subject: str) -> List[Tuple]:
+        return cache.get(self.get_recent_key(subject)) or []
+
+
+@lru_cache(maxsize=None)
+def get_submission_guard() -> SubmissionGuard:
+    """Return the process-wide guard"""
+    return SubmissionGuard()
@@ -1,3 +1,691 @@
-from django.test import TestCase
+import io
+import os
+import hashlib
+import random
+import shutil
+import tempfile
+from datetime import timedelta
+from itertools import product
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+
+from .assignment_solver import BatchAssignmentSolver
+from .dedup_service import SMSDedupService
+from .geo import geohash_encode, geohash_ranges, haversine_km
+from .incident_service import get_incident_clusterer
+from .language_support import detect_language_from_phone_number
+from .location_service import LocationService
+from .models import CrowdReport, CustomUser, EmergencyReport, Incident, PhotoUpload
+from .phone_prefix import get_india_landline_number
+from .priority_engine import PriorityScoringEngine, RiskGrid, rescore_open_reports
+from .report_import import import_reports, validate_chunk
+from .sms_parser import get_sms_parser
+from .submission_guard import SlidingWindowLimiter, SubmissionGuard
+from .sync_service import decode_token, encode_token
+
+
+def make_emergency_report(**fields):
+    """Saved emergency report with the required columns filled in"""
+    values = {'channel': 'web', 'phone_number': '+919876543210', 'category': 'flood',
+              'severity': 2, 'description': 'Water rising'}
+    values.update(fields)
+    return EmergencyReport.objects.create(**values)
+
+
+class SMSDedupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.dedup = SMSDedupService()
+
+    def test_claim_is_won_once(self):
+        self.assertIsNone(self.dedup.claim('+919876543210', 'FLOOD help', 'EMR-1'))
+        # Same subscriber number and message up to punctuation and case
+        self.assertEqual(self.dedup.claim('09876543210', 'flood, HELP!', 'EMR-2'), 'EMR-1')
+
+    def test_release_only_drops_own_claim(self):
+        self.dedup.claim('+919876543210', 'FLOOD help', 'EMR-1')
+        self.dedup.release('+919876543210', 'FLOOD help', 'EMR-2')
+        self.assertEqual(self.dedup.find_duplicate('+919876543210', 'FLOOD help'), 'EMR-1')
+        self.dedup.release('+919876543210', 'FLOOD help', 'EMR-1')
+        self.assertIsNone(self.dedup.find_duplicate('+919876543210', 'FLOOD help'))
+
+    def test_webhook_resend_is_folded(self):
+        client = APIClient()
+        payload = {'From': '+919876543210', 'Body': 'EMERGENCY FLOOD 3 water entering houses'}
+        client.post('/api/webhooks/sms/', payload)
+        resend = client.post('/api/webhooks/sms/', payload).json()
+
+        report = EmergencyReport.objects.get()
+        self.assertTrue(resend['duplicate'])
+        self.assertEqual(resend['report_id'], report.report_id)
+        self.assertEqual(report.repeat_count, 1)
+
+    def test_invalid_message_releases_claim(self):
+        client = APIClient()
+        payload = {'From': '+919876543210', 'Body': 'hello how are you'}
+        client.post('/api/webhooks/sms/', payload)
+        self.assertIsNone(self.dedup.find_duplicate(payload['From'], payload['Body']))
+
+
+class SMSParserTests(TestCase):
+    def setUp(self):
+        self.parser = get_sms_parser()
+
+    def test_strict_format(self):
+        parsed = self.parser.parse('EMERGENCY FLOOD 3 water rising near bridge')
+        self.assertTrue(parsed['valid'])
+        self.assertEqual(parsed['category'], 'flood')
+        self.assertEqual(parsed['severity'], 3)
+        self.assertEqual(parsed['description'], 'water rising near bridge')
+
+    def test_free_text_keywords(self):
+        parsed = self.parser.parse('Landslide blocked road, critical')
+        self.assertEqual((parsed['category'], parsed['severity']), ('landslide', 4))
+
+    def test_hindi_message(self):
+        parsed = self.parser.parse('बाढ़ आ गई है, मदद करो')
+        self.assertEqual((parsed['category'], parsed['language']), ('flood', 'hi'))
+
+    def test_message_without_keywords_is_invalid(self):
+        self.assertFalse(self.parser.parse('hello how are you')['valid'])
+
+    def test_place_after_cue_word(self):
+        patna = {'state': 'Bihar', 'district': 'Patna'}
+        self.assertEqual(self.parser.parse('fire in Pune market')['location'],
+                         {'state': 'Maharashtra', 'district': 'Pune'})
+        self.assertEqual(self.parser.parse('बाढ़ पटना में पानी भर गया')['location'], patna)
+        self.assertEqual(self.parser.parse('flood patna me, help')['location'], patna)
+
+    def test_place_without_cue_is_ignored(self):
+        self.assertIsNone(self.parser.parse('flood patna help')['location'])
+
+    def test_common_word_place_names_need_their_state(self):
+        self.assertIsNone(self.parser.parse('baadh aa gaya pani bhar gaya')['location'])
+        self.assertIsNone(self.parser.parse('aag lagi mandi me')['location'])
+        self.assertEqual(self.parser.parse('flood in gaya bihar')['location'], {'state': 'Bihar', 'district': 'Gaya'})
+
+    def test_sms_keeps_area_code_location_without_place(self):
+        phone_number = '+919431012345'
+        APIClient().post('/api/webhooks/sms/', {'From': phone_number, 'Body': 'baadh aa gaya pani bhar gaya'})
+        report = EmergencyReport.objects.get()
+        area = LocationService.detect_location_from_phone_number(phone_number) or {}
+        self.assertNotEqual(report.district, 'Gaya')
+        self.assertEqual((report.state, report.district), (area.get('state'), area.get('district')))
+
+
+class PhonePrefixTests(TestCase):
+    def test_landline_area_codes(self):
+        self.assertEqual(detect_language_from_phone_number('+91 080 2345 6789'), 'kn')
+        self.assertEqual(detect_language_from_phone_number('+91 44 2345 6789'), 'ta')
+        self.assertEqual(LocationService.detect_location_from_phone_number('+91 11 2345 6789')['state'], 'Delhi')
+        self.assertEqual(LocationService.detect_location_from_phone_number('079 2345 6789')['state'], 'Gujarat')
+
+    def test_mobile_numbers_have_no_area(self):
+        for number in ('+91 80123 45678', '+91 79123 45678', '+91 61223 45678', '+91 98765 43210'):
+            self.assertEqual(detect_language_from_phone_number(number), 'hi')
+            self.assertIsNone(LocationService.detect_location_from_phone_number(number))
+        self.assertIsNone(get_india_landline_number('+919876543210'))
+        self.assertEqual(get_india_landline_number('+91-0612-2345678'), '6122345678')
+
+
+class AssignReportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(CustomUser.objects.create_user('dispatcher', password='x'))
+        self.report = make_emergency_report()
+        self.url = f'/api/emergency/reports/{self.report.report_id}/assign/'
+
+    def assign(self, rescuer_id):
+        return self.client.post(self.url, {'rescuer_id': rescuer_id}, format='json')
+
+    def test_non_numeric_rescuer_id(self):
+        self.assertEqual(self.assign('abc').status_code, 400)
+
+    def test_only_active_rescuers_are_assigned(self):
+        normal = CustomUser.objects.create_user('citizen', password='x')
+        retired = CustomUser.objects.create_user('retired', password='x', role='rescuer', is_active=False)
+        self.assertEqual(self.assign(normal.id).status_code, 404)
+        self.assertEqual(self.assign(retired.id).status_code, 404)
+        self.report.refresh_from_db()
+        self.assertIsNone(self.report.assigned_to_id)
+
+    def test_assigns_rescuer(self):
+        rescuer = CustomUser.objects.create_user('rescuer', password='x', role='rescuer')
+        response = self.assign(str(rescuer.id))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['assigned_to'], rescuer.id)
+
+
+class AssignmentSolverTests(TestCase):
+    def setUp(self):
+        self.solver = BatchAssignmentSolver()
+        self.solver.max_distance_km = 50
+        self.solver.load_penalty_km = 2.0
+        self.solver.max_open_assignments = 2
+        self.solver.priority_weight_km = 20.0
+
+    def objective(self, reports, rescuers, pairs):
+        """Solver cost of an assignment [(report index, rescuer index)]"""
+        total = 0.0
+        load = [0] * len(rescuers)
+        for report_index, rescuer_index in pairs:
+            lat, lng, priority = reports[report_index]
+            _, rescuer_lat, rescuer_lng, open_assignments = rescuers[rescuer_index]
+            total += (haversine_km(lat, lng, rescuer_lat, rescuer_lng)
+                      + self.solver.load_penalty_km * (open_assignments + load[rescuer_index])
+                      - self.solver.priority_weight_km * priority / 100 - self.solver.max_distance_km)
+            load[rescuer_index] += 1
+        return total
+
+    def brute_force(self, reports, rescuers):
+        """Lowest objective over every feasible assignment"""
+        best = 0.0
+        for choice in product([None, *range(len(rescuers))], repeat=len(reports)):
+            pairs = [(report, rescuer) for report, rescuer in enumerate(choice) if rescuer is not None]
+            load = [0] * len(rescuers)
+            feasible = True
+            for report, rescuer in pairs:
+                load[rescuer] += 1
+                _, rescuer_lat, rescuer_lng, open_assignments = rescuers[rescuer]
+                if (load[rescuer] > self.solver.max_open_assignments - open_assignments or
+                        haversine_km(reports[report][0], reports[report][1], rescuer_lat, rescuer_lng)
+                        > self.solver.max_distance_km):
+                    feasible = False
+                    break
+            if feasible:
+                best = min(best, self.objective(reports, rescuers, pairs))
+        return best
+
+    def random_problem(self, rng):
+        reports = [(19 + rng.uniform(0, 0.5), 73 + rng.uniform(0, 0.5), rng.uniform(0, 100)) for _ in range(5)]
+        rescuers = [(index, 19 + rng.uniform(0, 0.5), 73 + rng.uniform(0, 0.5), rng.randint(0, 1))
+                    for index in range(3)]
+        return reports, rescuers
+
+    def test_dense_solution_is_optimal(self):
+        rng = random.Random(36)
+        for _ in range(10):
+            reports, rescuers = self.random_problem(rng)
+            pairs, method = self.solver.solve(reports, rescuers)
+            self.assertEqual(method, 'dense')
+            self.assertAlmostEqual(
+                self.objective(reports, rescuers, [(report, rescuer) for report, rescuer, _ in pairs]),
+                self.brute_force(reports, rescuers), places=6
+            )
+
+    def test_sparse_solution_matches_dense(self):
+        rng = random.Random(37)
+        for _ in range(10):
+            reports, rescuers = self.random_problem(rng)
+            dense, _ = self.solver.solve(reports, rescuers)
+            self.solver.dense_cell_limit = 0
+            sparse, method = self.solver.solve(reports, rescuers)
+            self.solver.dense_cell_limit = 2_000_000
+            self.assertEqual(method, 'sparse')
+            self.assertAlmostEqual(
+                self.objective(reports, rescuers, [(report, rescuer) for report, rescuer, _ in sparse]),
+                self.objective(reports, rescuers, [(report, rescuer) for report, rescuer, _ in dense]), places=6
+            )
+
+    def test_out_of_range_reports_stay_unassigned(self):
+        pairs, _ = self.solver.solve([(19.0, 73.0, 90.0), (28.6, 77.2, 90.0)], [(1, 19.01, 73.01, 0)])
+        self.assertEqual([report for report, _, _ in pairs], [0])
+
+
+class BatchAssignEndpointTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(CustomUser.objects.create_user('dispatcher', password='x'))
+
+    def test_invalid_limit(self):
+        for limit in ('abc', 0, -5, [3]):
+            response = self.client.post('/api/emergency/dispatch/batch/', {'limit': limit, 'dry_run': True},
+                                        format='json')
+            self.assertEqual(response.status_code, 400, limit)
+
+    @override_settings(DISPATCH_BATCH_MAX_REPORTS=2)
+    def test_limit_is_capped(self):
+        for _ in range(3):
+            make_emergency_report(lat=19.0, lng=73.0)
+        response = self.client.post('/api/emergency/dispatch/batch/', {'limit': '1000', 'dry_run': True},
+                                    format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['reports'], 2)
+
+
+class EventStreamAccessTests(TestCase):
+    def test_emergency_reports_need_sign_in(self):
+        response = self.client.get('/api/events/', {'types': 'emergency_report,rescuer_location'})
+        self.assertEqual(response.status_code, 400)
+
+        self.client.force_login(CustomUser.objects.create_user('dispatcher', password='x'))
+        response = self.client.get('/api/events/', {'types': 'emergency_report'})
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+    def test_anonymous_subscribers_still_get_crowd_reports(self):
+        response = self.client.get('/api/events/', {'types': 'crowd_report'})
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+
+@override_settings(SYNC_OVERLAP_SECONDS=0)
+class DeltaSyncTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def sync(self, token=''):
+        response = self.client.get('/api/reports/', {'since': token})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_token_round_trip(self):
+        moment = timezone.now().replace(microsecond=123456)
+        changes, deletions = (moment, 42), (moment - timedelta(hours=1), 7)
+        self.assertEqual(decode_token(encode_token(changes, deletions)), (changes, deletions))
+
+    def test_changes_and_tombstones_since_token(self):
+        kept = CrowdReport.objects.create(category='flood', lat=19.0, lng=73.0)
+        removed = CrowdReport.objects.create(category='medical', lat=19.1, lng=73.1)
+
+        first = self.sync()
+        self.assertEqual({item['id'] for item in first['changes']}, {kept.id, removed.id})
+        self.assertEqual(self.sync(first['since'])['changes'], [])
+
+        kept.note = 'bridge closed'
+        kept.save()
+        removed_id = removed.id
+        removed.delete()
+        added = CrowdReport.objects.create(category='roadblock', lat=19.2, lng=73.2)
+
+        delta = self.sync(first['since'])
+        self.assertEqual([item['id'] for item in delta['changes']], [kept.id, added.id])
+        self.assertEqual(delta['deleted'], [removed_id])
+        self.assertFalse(delta['has_more'])
+
+        caught_up = self.sync(delta['since'])
+        self.assertEqual((caught_up['changes'], caught_up['deleted']), ([], []))
+
+    def test_malformed_token(self):
+        self.assertEqual(self.client.get('/api/reports/', {'since': 'not-a-token'}).status_code, 400)
+
+    def test_token_older_than_tombstone_retention(self):
+        old = timezone.now() - timedelta(days=365)
+        response = self.client.get('/api/reports/', {'since': encode_token((old, 0), (old, 0))})
+        self.assertEqual(response.status_code, 410)
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        created_at = timezone.now() - timedelta(hours=1)
+        # Ties on priority and on creation time, so the id tie-break decides the order
+        for priority in (90, 50, 50, 50, 50, 10, 10):
+            report = make_emergency_report()
+            EmergencyReport.objects.filter(pk=report.pk).update(priority_score=priority, created_at=created_at)
+        self.expected = list(
+            EmergencyReport.objects.order_by('-priority_score', '-created_at', '-id').values_list('id', flat=True)
+        )
+
+    def page(self, cursor=None):
+        params = {'page_size': 3, 'fields': 'id'}
+        if cursor:
+            params['cursor'] = cursor
+        body = APIClient().get('/api/emergency/reports/', params).json()
+        return [row['id'] for row in body['reports']], body['next_cursor'], body
+
+    def test_pages_cover_every_row_once(self):
+        ids, cursor, body = self.page()
+        self.assertEqual(body['count'], 7)
+        while cursor:
+            more, cursor, body = self.page(cursor)
+            self.assertNotIn('count', body)
+            ids += more
+        self.assertEqual(ids, self.expected)
+
+    def test_cursor_is_stable_across_inserts(self):
+        ids, cursor, _ = self.page()
+        # A new top-priority report lands before the cursor and must not shift later pages
+        urgent = make_emergency_report()
+        EmergencyReport.objects.filter(pk=urgent.pk).update(priority_score=99)
+        while cursor:
+            more, cursor, _ = self.page(cursor)
+            ids += more
+        self.assertEqual(ids, self.expected)
+
+    def test_without_paging_parameters_returns_full_list(self):
+        body = APIClient().get('/api/emergency/reports/').json()
+        self.assertEqual(body['count'], 7)
+        self.assertEqual([report['id'] for report in body['reports']], self.expected)
+        self.assertNotIn('next_cursor', body)
+
+    def test_malformed_cursor(self):
+        response = APIClient().get('/api/emergency/reports/', {'cursor': '%%%'})
+        self.assertEqual(response.status_code, 400)
+
+
+class PriorityRescoreTests(TestCase):
+    def setUp(self):
+        grid = RiskGrid()
+        grid.cells[(38, 146)] = 1.0  # the 0.5 degree cell holding 19.2, 73.2
+        self.engine = PriorityScoringEngine(risk_grid=grid)
+
+    def test_risk_grid_only_scores_seismic_categories(self):
+        scores = self.engine.score(
+            np.array([2.0, 2.0]), np.array(['earthquake', 'flood'], dtype=object), np.array([19.2, 19.2]),
+            np.array([73.2, 73.2]), np.array(['', ''], dtype=object), np.zeros(2)
+        )
+        self.assertEqual(list(scores['risk']), [self.engine.risk_weight, 0.0])
+
+    def test_rescore_keeps_updated_at(self):
+        report = make_emergency_report(category='earthquake', lat=19.2, lng=73.2)
+        updated_at = EmergencyReport.objects.get(pk=report.pk).updated_at
+
+        self.assertEqual(rescore_open_reports(engine=self.engine)['updated'], 1)
+        rescored = EmergencyReport.objects.get(pk=report.pk)
+        self.assertGreater(rescored.priority_score, report.priority_score)
+        self.assertEqual(rescored.updated_at, updated_at)
+
+
+class IncidentExpiryTests(TestCase):
+    def setUp(self):
+        self.clusterer = get_incident_clusterer()
+
+    def clustered_report(self, lat=19.0, lng=73.0):
+        report = CrowdReport.objects.create(category='flood', lat=lat, lng=lng)
+        return self.clusterer.add_report(report)
+
+    def go_quiet(self, incident):
+        Incident.objects.filter(pk=incident.pk).update(last_seen_at=timezone.now() - timedelta(hours=3))
+
+    def test_quiet_incident_resolved_when_next_report_arrives(self):
+        quiet = self.clustered_report()
+        self.go_quiet(quiet)
+
+        fresh = self.clustered_report(19.001, 73.001)
+        self.assertNotEqual(fresh.pk, quiet.pk)
+        self.assertEqual(Incident.objects.get(pk=quiet.pk).status, 'resolved')
+
+    def test_periodic_job_resolves_only_quiet_incidents(self):
+        quiet = self.clustered_report()
+        self.go_quiet(quiet)
+        fresh = self.clustered_report(19.5, 73.5)
+
+        self.assertEqual(self.clusterer.resolve_stale_incidents(), 1)
+        self.assertEqual(Incident.objects.get(pk=quiet.pk).status, 'resolved')
+        self.assertEqual(Incident.objects.get(pk=fresh.pk).status, 'active')
+
+    def test_active_listing_leaves_out_quiet_incidents(self):
+        quiet = self.clustered_report()
+        self.go_quiet(quiet)
+        fresh = self.clustered_report(19.5, 73.5)
+
+        listed = APIClient().get('/api/emergency/incidents/').json()['incidents']
+        self.assertEqual([incident['id'] for incident in listed], [fresh.pk])
+
+
+class GeohashRangeTests(TestCase):
+    def covered(self, ranges, geohash):
+        return any(start <= geohash and (end is None or geohash < end) for start, end in ranges)
+
+    def test_ranges_cover_every_point_in_box(self):
+        rng = random.Random(46)
+        for _ in range(50):
+            south, west = rng.uniform(8, 35), rng.uniform(68, 97)
+            north, east = south + rng.uniform(0.001, 2), west + rng.uniform(0.001, 2)
+            ranges = geohash_ranges(south, west, north, east)
+            for _ in range(20):
+                geohash = geohash_encode(rng.uniform(south, north), rng.uniform(west, east))
+                self.assertTrue(self.covered(ranges, geohash), (south, west, north, east, geohash))
+            for lat, lng in ((south, west), (north, east), (south, east), (north, west)):
+                self.assertTrue(self.covered(ranges, geohash_encode(lat, lng)))
+
+    def test_ranges_are_sorted_and_disjoint(self):
+        ranges = geohash_ranges(18.9, 72.8, 19.3, 73.1)
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertLess(end, start)
+
+    def test_bbox_query_uses_ranges(self):
+        inside = CrowdReport.objects.create(category='flood', lat=19.05, lng=72.9)
+        CrowdReport.objects.create(category='flood', lat=28.6, lng=77.2)
+        response = APIClient().get('/api/reports/', {'bbox': '18.9,72.8,19.3,73.1'})
+        self.assertEqual([item['id'] for item in response.json()], [inside.id])
+
+
+class PhotoUploadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.temp_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=os.path.join(self.temp_dir, 'media'),
+            PHOTO_UPLOAD_TEMP_DIR=os.path.join(self.temp_dir, 'parts'),
+            PHOTO_UPLOAD_CHUNK_BYTES=64,
+        )
+        self.settings_override.enable()
+        self.client = APIClient()
+
+        image = io.BytesIO()
+        Image.new('RGB', (40, 30), (200, 30, 30)).save(image, format='PNG')
+        self.photo = image.getvalue()
+        submitted = self.client.post('/api/reports', {'category': 'flood', 'lat': '19.0', 'lng': '73.0'}).json()
+        self.report_id, self.token = submitted['id'], submitted['upload_token']
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def start(self, sha256=None, token=None):
+        return self.client.post('/api/reports/uploads/', {
+            'upload_token': self.token if token is None else token, 'filename': 'photo.png',
+            'size': len(self.photo), 'sha256': sha256 or hashlib.sha256(self.photo).hexdigest(),
+        })
+
+    def send(self, upload_id, offset, data):
+        return self.client.generic('PUT', f'/api/reports/uploads/{upload_id}/?offset={offset}', data,
+                                   content_type='application/octet-stream')
+
+    def send_all(self, upload_id):
+        for offset in range(0, len(self.photo), 64):
+            self.assertEqual(self.send(upload_id, offset, self.photo[offset:offset + 64]).status_code, 200)
+
+    def test_upload_needs_the_submitters_token(self):
+        self.assertEqual(self.start(token='forged').status_code, 403)
+
+    def test_chunks_resume_from_received_offset(self):
+        upload_id = self.start().json()['upload_id']
+        self.send(upload_id, 0, self.photo[:64])
+
+        # Resend of the first chunk after a lost response
+        conflict = self.send(upload_id, 0, self.photo[:64])
+        self.assertEqual(conflict.status_code, 409)
+        self.assertEqual(conflict.json()['received'], 64)
+
+        # A client that lost track asks where to resume
+        received = self.client.get(f'/api/reports/uploads/{upload_id}/').json()['received']
+        for offset in range(received, len(self.photo), 64):
+            self.send(upload_id, offset, self.photo[offset:offset + 64])
+
+        completed = self.client.post(f'/api/reports/uploads/{upload_id}/complete/')
+        self.assertEqual(completed.status_code, 200)
+        report = CrowdReport.objects.get(pk=self.report_id)
+        with report.photo.open('rb') as f:
+            self.assertEqual(f.read(), self.photo)
+
+    def test_checksum_mismatch_restarts_upload(self):
+        upload_id = self.start(sha256='0' * 64).json()['upload_id']
+        self.send_all(upload_id)
+
+        response = self.client.post(f'/api/reports/uploads/{upload_id}/complete/')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(PhotoUpload.objects.get(upload_id=upload_id).received, 0)
+        self.assertFalse(CrowdReport.objects.get(pk=self.report_id).photo)
+
+    def test_oversized_chunk_rejected(self):
+        upload_id = self.start().json()['upload_id']
+        self.assertEqual(self.send(upload_id, 0, self.photo[:65]).status_code, 400)
+
+    def test_incomplete_upload_cannot_complete(self):
+        upload_id = self.start().json()['upload_id']
+        self.send(upload_id, 0, self.photo[:64])
+        self.assertEqual(self.client.post(f'/api/reports/uploads/{upload_id}/complete/').status_code, 400)
+
+    def test_restart_with_same_file_resumes_pending_upload(self):
+        upload_id = self.start().json()['upload_id']
+        self.send(upload_id, 0, self.photo[:64])
+
+        again = self.start().json()
+        self.assertEqual((again['upload_id'], again['received']), (upload_id, 64))
+        self.assertEqual(PhotoUpload.objects.count(), 1)
+
+    def test_new_upload_replaces_pending_one_and_its_part_file(self):
+        for _ in range(5):
+            old_id = self.start().json()['upload_id']
+            self.send(old_id, 0, self.photo[:64])
+            self.start(sha256='a' * 64)
+
+        pending = PhotoUpload.objects.get(status='pending')
+        self.assertEqual(pending.sha256, 'a' * 64)
+        self.assertEqual(os.listdir(os.path.join(self.temp_dir, 'parts')), [f'{pending.upload_id}.part'])
+        self.assertEqual(self.send(old_id, 64, self.photo[64:128]).status_code, 404)
+
+
+class SubmissionGuardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def test_sliding_window_limit(self):
+        limiter = SlidingWindowLimiter('test_rate', limit=3, window_seconds=60)
+        start = 6000.0  # Start of a window
+        self.assertEqual([limiter.hit('a', start + second)[0] for second in range(4)], [True, True, True, False])
+        self.assertTrue(limiter.hit('b', start)[0])
+
+        # Early in the next window the previous one still counts almost fully
+        allowed, retry_after = limiter.hit('a', start + 61)
+        self.assertFalse(allowed)
+        self.assertEqual(retry_after, 59)
+        # Two thirds through it counts a third: 3 * 1/3 + 1 <= 3
+        self.assertTrue(limiter.hit('a', start + 100)[0])
+        self.assertTrue(limiter.hit('a', start + 100)[0])
+        self.assertFalse(limiter.hit('a', start + 100)[0])
+
+    @override_settings(CROWD_REPORT_RATE_LIMIT_PER_DEVICE=2, CROWD_REPORT_RATE_LIMIT_PER_IP=100)
+    def test_device_limit(self):
+        guard = SubmissionGuard()
+        request = self.factory.post('/api/reports')
+        decisions = [guard.check(request, 'device-1', 19.0 + index, 73.0, 'flood') for index in range(3)]
+        self.assertEqual([decision.allowed for decision in decisions], [True, True, False])
+        self.assertEqual(decisions[2].reason, 'device rate limit')
+        self.assertTrue(guard.check(request, 'device-2', 19.0, 73.0, 'flood').allowed)
+
+    def test_near_duplicate_from_same_device_is_folded(self):
+        guard = SubmissionGuard()
+        request = self.factory.post('/api/reports')
+        report = CrowdReport.objects.create(category='flood', lat=19.0, lng=73.0)
+        guard.remember(request, 'device-1', report)
+
+        self.assertEqual(guard.check(request, 'device-1', 19.0003, 73.0, 'flood').duplicate_of, report.id)
+        self.assertIsNone(guard.check(request, 'device-1', 19.0003, 73.0, 'medical').duplicate_of)
+        self.assertIsNone(guard.check(request, 'device-2', 19.0003, 73.0, 'flood').duplicate_of)
+
+    def test_shared_ip_without_fingerprint_is_not_folded(self):
+        client = APIClient()
+        payload = {'category': 'flood', 'lat': '19.0', 'lng': '73.0'}
+        first = client.post('/api/reports', payload).json()
+        second = client.post('/api/reports', payload).json()
+        self.assertEqual((first['status'], second['status']), ('ok', 'ok'))
+        self.assertEqual(CrowdReport.objects.count(), 2)
+
+
+class ReportImportTests(TestCase):
+    def validate(self, rows, kind='crowd'):
+        return validate_chunk(pd.DataFrame(rows, dtype=str), kind)
+
+    def test_crowd_rejects_per_reason(self):
+        future = (timezone.now() + timedelta(days=1)).isoformat()
+        rows, rejected = self.validate([
+            {'lat': '19.0', 'lng': '73.0', 'category': 'flood', 'severity': '2'},
+            {'lat': '19.0', 'lng': '73.0', 'category': 'Flood', 'severity': None},
+            {'lat': 'abc', 'lng': '73.0', 'category': 'flood', 'severity': '2'},
+            {'lat': None, 'lng': '73.0', 'category': 'flood', 'severity': '2'},
+            {'lat': '51.5', 'lng': '-0.1', 'category': 'flood', 'severity': '2'},
+            {'lat': '19.0', 'lng': '73.0', 'category': 'tsunami', 'severity': '2'},
+            {'lat': '19.0', 'lng': '73.0', 'category': 'flood', 'severity': 'high'},
+            {'lat': '19.0', 'lng': '73.0', 'category': 'flood', 'severity': '2.5'},
+            {'lat': '19.0', 'lng': '73.0', 'category': 'flood', 'severity': '2', 'created_at': 'yesterday'},
+            {'lat': '19.0', 'lng': '73.0', 'category': 'flood', 'severity': '2', 'created_at': future},
+        ])
+        self.assertEqual(len(rows), 2)
+        # A blank severity gets the default; an unparseable one is rejected, not defaulted
+        self.assertEqual(list(rows['severity']), [2, 0])
+        self.assertEqual(list(rows['category']), ['flood', 'flood'])
+        self.assertEqual(rejected, {
+            'invalid coordinates': 1, 'missing coordinates': 1, 'outside India bounds': 1,
+            'unknown category': 1, 'invalid severity': 2, 'invalid created_at': 1, 'created_at in the future': 1,
+        })
+
+    def test_emergency_rejects_per_reason(self):
+        base = {'phone_number': '+919876543210', 'category': 'flood', 'description': 'Water rising'}
+        rows, rejected = self.validate([
+            base,
+            {**base, 'phone_number': None},
+            {**base, 'description': ' '},
+            {**base, 'lat': '19.0'},
+            {**base, 'lat': '19.0', 'lng': 'east'},
+            {**base, 'severity': '7'},
+            {**base, 'channel': 'fax'},
+            {**base, 'status': 'archived'},
+        ], kind='emergency')
+        self.assertEqual(len(rows), 1)
+        self.assertEqual((rows.iloc[0]['severity'], rows.iloc[0]['status']), (1, 'resolved'))
+        self.assertEqual(rejected, {
+            'missing phone number': 1, 'missing description': 1, 'partial coordinates': 1,
+            'invalid coordinates': 1, 'invalid severity': 1, 'unknown channel': 1, 'unknown status': 1,
+        })
+
+    def test_import_keeps_history_out_of_the_live_queue(self):
+        created_at = timezone.now() - timedelta(days=30)
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write('phone_number,category,description,lat,lng,created_at\n')
+            f.write(f'+919876543210,flood,Old flood,19.0,73.0,{created_at.isoformat()}\n')
+            f.write('+919876543210,flood,Bad row,abc,73.0,\n')
+        try:
+            totals = import_reports(f.name, 'emergency')
+        finally:
+            os.remove(f.name)
+
+        self.assertEqual((totals['rows'], totals['imported']), (2, 1))
+        self.assertEqual(totals['rejected'], {'invalid coordinates': 1})
+        report = EmergencyReport.objects.get()
+        self.assertEqual(report.status, 'resolved')
+        self.assertEqual(report.created_at, created_at)
+        self.assertIsNone(report.assigned_to_id)
+
+    def test_import_clusters_only_recent_open_reports(self):
+        recent = (timezone.now() - timedelta(minutes=10)).isoformat()
+        old = (timezone.now() - timedelta(days=30)).isoformat()
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write('phone_number,category,description,lat,lng,status,created_at\n')
+            f.write(f'+919876543210,flood,Old flood,19.0,73.0,pending,{old}\n')
+            f.write(f'+919876543210,flood,Handled,19.0,73.0,resolved,{recent}\n')
+            f.write(f'+919876543210,flood,Water rising,19.0,73.0,pending,{recent}\n')
+            f.write('+919876543211,flood,Street flooded,19.001,73.001,pending,\n')
+        try:
+            # Run on-commit hooks, which is where per-row clustering would happen
+            with self.captureOnCommitCallbacks(execute=True):
+                totals = import_reports(f.name, 'emergency')
+        finally:
+            os.remove(f.name)
+
+        self.assertEqual(totals['clustered'], 2)
+        incident = Incident.objects.get()
+        self.assertEqual((incident.status, incident.report_count), ('active', 2))
+        self.assertEqual(
+            set(EmergencyReport.objects.filter(incident=incident).values_list('description', flat=True)),
+            {'Water rising', 'Street flooded'}
+        )
@@ -0,0 +1,261 @@
+"""
+Resumable photo uploads
+Lets a client on a flaky connection send a crowd report photo as a series of
+small chunks that are appended to a file on disk, resume after a failure from
+the last byte the server has, and attach the file once its checksum matches
+"""
+
+import io
+import os
+import hashlib
+import logging
+from datetime import timedelta
+from typing import BinaryIO, Optional
+from django.conf import settings
+from django.core import signing
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image, UnidentifiedImageError
+
+from .models import CrowdReport, PhotoUpload
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Request bodies and part files are read in pieces of this size
+STREAM_BUFFER_BYTES = 64 * 1024
+
+UPLOAD_TOKEN_SALT = 'backend.upload_service.report'
+
+
+class UploadError(ValueError):
+    """Raised for upload requests that cannot be accepted"""
+
+
+class UploadOffsetMismatch(UploadError):
+    """Raised when a chunk does not start where the stored data ends; the client resumes from `received`"""
+
+    def __init__(self, received: int):
+        super().__init__(f'Chunk must start at byte {received}')
+        self.received = received
+
+
+def max_upload_bytes() -> int:
+    return getattr(settings, 'PHOTO_UPLOAD_MAX_BYTES', 5 * 1024 * 1024)
+
+
+def max_chunk_bytes() -> int:
+    return getattr(settings, 'PHOTO_UPLOAD_CHUNK_BYTES', 256 * 1024)
+
+
+def part_path(upload: PhotoUpload) -> str:
+    """Where an upload's bytes are collected until it completes"""
+    return os.path.join(settings.PHOTO_UPLOAD_TEMP_DIR, f"{upload.upload_id}.part")
+
+
+def make_upload_token(report: CrowdReport) -> str:
+    """Signed token returned to the submitter of a report, required to add its photo"""
+    return signing.dumps(report.pk, salt=UPLOAD_TOKEN_SALT)
+
+
+def report_for_token(token: str) -> CrowdReport:
+    """
+    Report an upload token was issued for
+
+    Raises:
+        UploadError: If the token is forged or older than PHOTO_UPLOAD_EXPIRY_HOURS
+        CrowdReport.DoesNotExist: If the report was deleted
+    """
+    try:
+        report_id = signing.loads(token or '', salt=UPLOAD_TOKEN_SALT,
+                                  max_age=timedelta(hours=getattr(settings, 'PHOTO_UPLOAD_EXPIRY_HOURS', 24)))
+    except signing.BadSignature:
+        raise UploadError('Invalid or expired upload token')
+    return CrowdReport.objects.get(pk=report_id)
+
+
+def start_upload(report: CrowdReport, filename: str, size: int, sha256: str) -> PhotoUpload:
+    """
+    Open an upload for a report's photo
+
+    A report has at most one pending upload. Starting again with the same size
+    and checksum returns that upload so the client can resume it; different
+    metadata replaces it and deletes its part file, so a reused token cannot
+    pile up part files on disk.
+
+    Args:
+        report (CrowdReport): Report the photo belongs to
+        filename (str): Client file name (directories are dropped)
+        size (int): Total bytes to be sent
+        sha256 (str): Hex SHA-256 of the whole file
+
+    Returns:
+        PhotoUpload: New or resumed upload
+
+    Raises:
+        UploadError: If the report already has a photo or the metadata is invalid
+    """
+    if not 0 < size <= max_upload_bytes():
+        raise UploadError(f'size must be between 1 and {max_upload_bytes()} bytes')
+    sha256 = (sha256 or '').lower()
+    if len(sha256) != 64 or any(char not in '0123456789abcdef' for char in sha256):
+        raise UploadError('sha256 must be a hex SHA-256 digest')
+
+    filename = os.path.basename(filename or 'photo')[:255]
+    with transaction.atomic():
+        # The report row lock serialises concurrent starts for the same report
+        report = CrowdReport.objects.select_for_update().get(pk=report.pk)
+        if report.photo:
+            raise UploadError('Report already has a photo')
+        replaced = []
+        for pending in PhotoUpload.objects.filter(report=report, status='pending'):
+            if not replaced and pending.size == size and pending.sha256 == sha256:
+                if os.path.exists(part_path(pending)):
+                    pending.filename = filename
+                    pending.save(update_fields=['filename', 'updated_at'])
+                    return pending
+            replaced.append(pending)
+        PhotoUpload.objects.filter(pk__in=[pending.pk for pending in replaced]).delete()
+        upload = PhotoUpload.objects.create(report=report, filename=filename, size=size, sha256=sha256)
+
+    for pending in replaced:
+        try:
+            os.remove(part_path(pending))
+        except FileNotFoundError:
+            pass
+    if replaced:
+        logger.info(f"Replaced {len(replaced)} pending upload(s) for crowd report {report.id}")
+    os.makedirs(settings.PHOTO_UPLOAD_TEMP_DIR, exist_ok=True)
+    open(part_path(upload), 'wb').close()
+    return upload
+
+
+def append_chunk(upload_id, offset: int, stream: BinaryIO, length: int) -> PhotoUpload:
+    """
+    Append one chunk from the request body
+
+    The body is read into memory (chunks are at most PHOTO_UPLOAD_CHUNK_BYTES)
+    before the upload row is locked, so a slow client never holds a database
+    connection or row lock while it is still sending.
+
+    Args:
+        upload_id (UUID): Upload to extend
+        offset (int): Byte position the chunk starts at
+        stream (BinaryIO): Request body
+        length (int): Chunk size from Content-Length
+
+    Returns:
+        PhotoUpload: Upload with the new `received` count
+
+    Raises:
+        PhotoUpload.DoesNotExist: For unknown uploads
+        UploadOffsetMismatch: If offset is not the current end of the file
+        UploadError: If the chunk is too large or the upload is finished
+    """
+    if not 0 < length <= max_chunk_bytes():
+        raise UploadError(f'Chunks must be between 1 and {max_chunk_bytes()} bytes')
+
+    buffer = io.BytesIO()
+    while buffer.tell() < length:
+        piece = stream.read(min(STREAM_BUFFER_BYTES, length - buffer.tell()))
+        if not piece:
+            break
+        buffer.write(piece)
+    if buffer.tell() != length:
+        raise UploadError(f'Chunk ended after {buffer.tell()} of {length} bytes')
+
+    with transaction.atomic():
+        # The row lock serialises chunks of the same upload across workers
+        upload = PhotoUpload.objects.select_for_update().get(upload_id=upload_id)
+        if upload.status != 'pending':
+            raise UploadError('Upload is already complete')
+        if offset != upload.received:
+            raise UploadOffsetMismatch(upload.received)
+        if upload.received + length > upload.size:
+            raise UploadError('Chunk extends past the declared size')
+
+        with open(part_path(upload), 'r+b') as f:
+            # Drop anything a failed earlier attempt left past the committed end
+            f.truncate(upload.received)
+            f.seek(upload.received)
+            f.write(buffer.getbuffer())
+        upload.received += length
+        upload.save(update_fields=['received', 'updated_at'])
+    return upload
+
+
+def complete_upload(upload_id) -> CrowdReport:
+    """
+    Verify an upload and attach it to its report as the photo
+
+    Returns:
+        CrowdReport: Report with the new photo (processed by the photo pipeline after commit)
+
+    Raises:
+        PhotoUpload.DoesNotExist: For unknown uploads
+        UploadError: If data is missing, the checksum differs or the file is not an image
+    """
+    with transaction.atomic():
+        upload = PhotoUpload.objects.select_for_update().select_related('report').get(upload_id=upload_id)
+        if upload.status != 'pending':
+            raise UploadError('Upload is already complete')
+        if upload.received != upload.size:
+            raise UploadError(f'Only {upload.received} of {upload.size} bytes received')
+
+        path = part_path(upload)
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for piece in iter(lambda: f.read(STREAM_BUFFER_BYTES), b''):
+                digest.update(piece)
+        mismatch = digest.hexdigest() != upload.sha256
+
+        if mismatch:
+            # Start over: the stored bytes are not what the client meant to send.
+            # Raised after the block so the reset is committed.
+            upload.received = 0
+            upload.save(update_fields=['received', 'updated_at'])
+            open(path, 'wb').close()
+        else:
+            try:
+                with Image.open(path) as image:
+                    image.verify()
+            except (UnidentifiedImageError, OSError, SyntaxError) as e:
+                raise UploadError(f'Not a valid image: {str(e)}')
+
+            report = upload.report
+            if report.photo:
+                raise UploadError('Report already has a photo')
+            with open(path, 'rb') as f:
+                report.photo.save(upload.filename, File(f), save=False)
+            report.save(update_fields=['photo', 'updated_at'])
+
+            upload.status = 'complete'
+            upload.save(update_fields=['status', 'updated_at'])
+
+    if mismatch:
+        raise UploadError('Checksum mismatch; upload restarted from byte 0')
+
+    os.remove(path)
+    logger.info(f"Attached {upload.size} byte photo to crowd report {report.id} from upload {upload.upload_id}")
+    return report
+
+
+def purge_stale_uploads(hours: Optional[int] = None) -> int:
+    """
+    Delete unfinished uploads idle for longer than PHOTO_UPLOAD_EXPIRY_HOURS, and their data
+
+    Returns:
+        int: Uploads removed
+    """
+    hours = hours or getattr(settings, 'PHOTO_UPLOAD_EXPIRY_HOURS', 24)
+    stale = list(PhotoUpload.objects.filter(
+        status='pending', updated_at__lt=timezone.now() - timedelta(hours=hours)
+    ))
+    for upload in stale:
+        try:
+            os.remove(part_path(upload))
+        except FileNotFoundError:
+            pass
+    PhotoUpload.objects.filter(pk__in=[upload.pk for upload in stale]).delete()
+    return len(stale)
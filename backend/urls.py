@@ -5,6 +5,11 @@ urlpatterns = [
     # existing submit endpoint (preserved)
     path("reports", views.submit_report, name="submit_report"),
 
+    # Resumable chunked photo upload for a submitted report
+    path("reports/uploads/", views.start_photo_upload, name="start_photo_upload"),
+    path("reports/uploads/<uuid:upload_id>/", views.photo_upload_chunk, name="photo_upload_chunk"),
+    path("reports/uploads/<uuid:upload_id>/complete/", views.complete_photo_upload, name="complete_photo_upload"),
+
     # new: list reports for frontend
     path("reports/list", views.list_reports, name="list_reports"),
 
@@ -19,12 +24,27 @@ urlpatterns = [
     path("emergency/ivr/", views.ivr_emergency_report, name="ivr_emergency_report"),
     path("emergency/ussd/", views.ussd_emergency_report, name="ussd_emergency_report"),
     path("emergency/reports/", views.list_emergency_reports, name="list_emergency_reports"),
+    path("emergency/queue/", views.emergency_queue, name="emergency_queue"),
+    path("emergency/incidents/", views.list_incidents, name="list_incidents"),
+    path("emergency/incidents/<int:incident_id>/", views.get_incident, name="get_incident"),
+    path("emergency/stats/", views.report_stats, name="report_stats"),
+    path("emergency/stats/cells/", views.report_cell_stats, name="report_cell_stats"),
     path("emergency/reports/<str:report_id>/", views.get_emergency_report_details, name="get_emergency_report_details"),
     path("emergency/reports/<str:report_id>/acknowledge/", views.acknowledge_emergency_report, name="acknowledge_emergency_report"),
     path("emergency/reports/<str:report_id>/status/", views.update_emergency_report_status, name="update_emergency_report_status"),
+    path("emergency/reports/<str:report_id>/candidates/", views.rescuer_candidates, name="rescuer_candidates"),
+    path("emergency/reports/<str:report_id>/assign/", views.assign_emergency_report, name="assign_emergency_report"),
+    path("emergency/reports/<str:report_id>/facilities/", views.nearest_facilities, name="report_nearest_facilities"),
+    path("emergency/facilities/", views.nearest_facilities, name="nearest_facilities"),
+    path("emergency/dispatch/batch/", views.batch_assign_emergency_reports, name="batch_assign_emergency_reports"),
+    path("rescuers/<int:user_id>/track/", views.rescuer_track, name="rescuer_track"),
+
+    # Live dashboard updates (server-sent events)
+    path("events/", views.event_stream, name="event_stream"),
     
     # Webhook Endpoints
     path("webhooks/sms/", views.sms_webhook, name="sms_webhook"),
+    path("webhooks/sms/batch/", views.sms_batch_webhook, name="sms_batch_webhook"),
     path("webhooks/ivr/", views.ivr_webhook, name="ivr_webhook"),
     path("webhooks/ussd/", views.ussd_webhook, name="ussd_webhook"),
     
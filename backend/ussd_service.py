@@ -154,31 +154,26 @@ class USSDService:
         
         # Create emergency report
         try:
-            from .models import EmergencyReport
+            from .ingestion_service import ReportIngestionService
             from .location_service import LocationService
             
             # Detect location from phone number
             location_info = LocationService.detect_location_from_phone_number(phone_number)
             
             # Create emergency report
-            emergency_report = EmergencyReport.objects.create(
-                channel='ussd',
-                phone_number=phone_number,
-                category=session_data['category'],
-                severity=session_data['severity'],
-                description=session_data['description'],
-                district=location_info.get('district') if location_info else None,
-                state=location_info.get('state') if location_info else None,
+            emergency_report = ReportIngestionService.create_report(
+                'ussd',
+                phone_number,
+                session_data['category'],
+                session_data['severity'],
+                session_data['description'],
+                location_info=location_info,
                 raw_data={
                     'session_id': session_id,
                     'session_data': session_data
                 }
             )
             
-            # Calculate priority score
-            emergency_report.priority_score = emergency_report.get_priority_score()
-            emergency_report.save()
-            
             # Generate confirmation message
             language = detect_language_from_phone_number(phone_number)
             confirmation_message = get_translation(language, 'emergency_received')
@@ -217,7 +212,7 @@ class USSDService:
             Dict: Emergency report data
         """
         try:
-            from .models import EmergencyReport
+            from .ingestion_service import ReportIngestionService
             from .location_service import LocationService
             
             # Extract data from session
@@ -231,24 +226,19 @@ class USSDService:
             location_info = LocationService.detect_location_from_phone_number(phone_number)
             
             # Create emergency report
-            emergency_report = EmergencyReport.objects.create(
-                channel='ussd',
-                phone_number=phone_number,
-                category=category,
-                severity=severity,
-                description=description,
-                district=location_info.get('district') if location_info else None,
-                state=location_info.get('state') if location_info else None,
+            emergency_report = ReportIngestionService.create_report(
+                'ussd',
+                phone_number,
+                category,
+                severity,
+                description,
+                location_info=location_info,
                 raw_data={
                     'session_id': session_id,
                     'session_data': session_data
                 }
             )
             
-            # Calculate priority score
-            emergency_report.priority_score = emergency_report.get_priority_score()
-            emergency_report.save()
-            
             return {
                 'status': 'success',
                 'report_id': emergency_report.report_id,
@@ -56,10 +56,7 @@ def update_rescuer_location(request):
             lng = data.get("lng")
 
             if lat is not None and lng is not None:
-                RescuerLocation.objects.update_or_create(
-                    user=request.user,
-                    defaults={"lat": lat, "lng": lng}
-                )
+                _record_rescuer_pings(request.user, [(float(lat), float(lng), None)])
                 return JsonResponse({"status": "ok"})
             else:
                 return JsonResponse({"status": "invalid data"}, status=400)
@@ -68,20 +65,190 @@ def update_rescuer_location(request):
     return JsonResponse({"status": "unauthorized"}, status=401)
 
 
+@csrf_exempt
+def update_rescuer_location_batch(request):
+    """Accept several queued pings from one device: {"pings": [{"lat", "lng", "recorded_at"}, ...]}"""
+    if request.method == "POST" and request.user.is_authenticated:
+        from .location_buffer import parse_ping
+
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({"status": "invalid data"}, status=400)
+
+        items = data.get("pings") if isinstance(data, dict) else data
+        if not isinstance(items, list) or not items:
+            return JsonResponse({"status": "invalid data"}, status=400)
+
+        pings = []
+        rejected = []
+        for index, item in enumerate(items):
+            try:
+                pings.append(parse_ping(item))
+            except (KeyError, TypeError, ValueError) as e:
+                rejected.append({"index": index, "message": str(e)})
+
+        try:
+            if pings:
+                _record_rescuer_pings(request.user, pings)
+        except Exception as e:
+            return JsonResponse({"status": "error", "message": str(e)}, status=500)
+        return JsonResponse({"status": "ok", "accepted": len(pings), "rejected": rejected})
+    return JsonResponse({"status": "unauthorized"}, status=401)
+
+
+def _record_rescuer_pings(user, pings):
+    """Buffer pings for the periodic batched DB flush and feed the latest one to dispatch and live maps"""
+    from .events import get_event_bus
+    from .location_buffer import get_location_buffer
+
+    latest = get_location_buffer().record_many(
+        (user.id, lat, lng, recorded_at) for lat, lng, recorded_at in pings
+    )
+    lat, lng, recorded_at = latest[user.id]
+    get_event_bus().publish("rescuer_location", "updated", {
+        "user_id": user.id, "lat": lat, "lng": lng, "updated_at": recorded_at
+    })
+    if hasattr(user, "is_rescuer") and user.is_rescuer():
+        from .dispatch_service import get_dispatcher
+        get_dispatcher().update_rescuer(user.id, lat, lng, recorded_at)
+
+
 def get_rescuers(request):
     if request.user.is_authenticated:
-        rescuers = list(
-            RescuerLocation.objects.values("lat", "lng", "updated_at")
+        from .location_buffer import get_location_buffer
+
+        rows = list(
+            RescuerLocation.objects.values("user_id", "lat", "lng", "updated_at")
         )
+        # Positions pinged since the last flush are newer than the table
+        get_location_buffer().overlay(rows, include_unflushed=True)
+        rescuers = [
+            {"lat": row["lat"], "lng": row["lng"], "updated_at": row["updated_at"]}
+            for row in rows
+        ]
         return JsonResponse({"count": len(rescuers), "rescuers": rescuers})
     return JsonResponse({"status": "unauthorized"}, status=401)
 
 
 
+@require_GET
+def event_stream(request):
+    """
+    Server-sent event stream of report and rescuer deltas for live dashboards
+
+    ?types= narrows the stream to a comma-separated subset of emergency_report,
+    crowd_report and rescuer_location; emergency reports and rescuer positions
+    are only streamed to signed-in users. Reconnecting clients get missed
+    events replayed from their Last-Event-ID header.
+    """
+    from django.conf import settings
+    from django.core.handlers.asgi import ASGIRequest
+    from .events import (AUTHENTICATED_EVENT_TYPES, EVENT_TYPES, STREAM_RETRY_MS, BoundedStream, astream_events,
+                         get_event_bus, get_stream_slots, stream_events)
+
+    allowed = set(EVENT_TYPES)
+    if not request.user.is_authenticated:
+        allowed.difference_update(AUTHENTICATED_EVENT_TYPES)
+    requested = [event_type for event_type in request.GET.get("types", "").split(",") if event_type]
+    event_types = [event_type for event_type in (requested or EVENT_TYPES) if event_type in allowed]
+    if not event_types:
+        return JsonResponse({"status": "error", "message": "No permitted event types requested"}, status=400)
+
+    try:
+        last_event_id = int(request.headers.get("Last-Event-ID") or request.GET.get("last_event_id"))
+    except (TypeError, ValueError):
+        last_event_id = None
+
+    bus = get_event_bus()
+    heartbeat = getattr(settings, "EVENT_STREAM_HEARTBEAT_SECONDS", 15)
+    max_pending = getattr(settings, "EVENT_STREAM_MAX_PENDING", 500)
+    if isinstance(request, ASGIRequest):
+        stream = astream_events(bus, event_types, last_event_id, heartbeat, max_pending)
+    else:
+        # Each WSGI stream occupies a worker thread; keep some free for webhooks
+        slots = get_stream_slots()
+        if not slots.acquire(blocking=False):
+            return JsonResponse({"status": "error", "message": "Too many live streams, try again shortly"},
+                                status=503, headers={"Retry-After": str(STREAM_RETRY_MS // 1000)})
+        stream = BoundedStream(stream_events(bus, event_types, last_event_id, heartbeat, max_pending,
+                                             getattr(settings, "EVENT_STREAM_WSGI_SECONDS", 25)), slots)
+
+    response = StreamingHttpResponse(stream, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Stop nginx from buffering the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 class CrowdReportList(generics.ListCreateAPIView):
     queryset = CrowdReport.objects.all().order_by("-created_at")
     serializer_class = CrowdReportSerializer
 
+    def create(self, request, *args, **kwargs):
+        # Same rate limits, duplicate folding and upload token as submit_report
+        from .submission_guard import get_submission_guard
+        from .upload_service import make_upload_token
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        fingerprint = data.get("device_fingerprint") or ""
+
+        guard = get_submission_guard()
+        decision = guard.check(request, fingerprint, data["lat"], data["lng"], data.get("category", "other"))
+        if decision.duplicate_of is not None:
+            return Response({"status": "duplicate", "id": decision.duplicate_of,
+                             "upload_token": make_upload_token(CrowdReport(pk=decision.duplicate_of))})
+        if not decision.allowed:
+            return Response({"status": "error", "message": "Too many reports, try again later"}, status=429,
+                            headers={"Retry-After": str(decision.retry_after)})
+
+        self.perform_create(serializer)
+        guard.remember(request, fingerprint, serializer.instance)
+        data = {**serializer.data, "upload_token": make_upload_token(serializer.instance)}
+        return Response(data, status=201, headers=self.get_success_headers(serializer.data))
+
+    def list(self, request, *args, **kwargs):
+        # ?since=<token> returns only changes and deletions since a previous sync
+        if "since" in request.query_params:
+            return _sync_response(
+                CrowdReport.objects.all(), "backend.crowdreport", request.query_params["since"],
+                lambda rows: self.get_serializer(rows, many=True).data
+            )
+
+        # ?bbox=south,west,north,east or ?lat=&lng=&radius_km= use the geohash index
+        from .spatial import parse_bbox, within_bbox, within_radius
+        try:
+            if "radius_km" in request.query_params:
+                reports = within_radius(
+                    self.get_queryset(), float(request.query_params["lat"]), float(request.query_params["lng"]),
+                    min(float(request.query_params["radius_km"]), 500)
+                )
+                data = self.get_serializer(reports, many=True).data
+                for item, report in zip(data, reports):
+                    item["distance_km"] = report.distance_km
+                return Response(data)
+            if "bbox" in request.query_params:
+                reports = within_bbox(self.get_queryset(), *parse_bbox(request.query_params["bbox"]))
+                return Response(self.get_serializer(reports, many=True).data)
+        except (KeyError, ValueError):
+            return Response({"status": "error", "message": "Use bbox=south,west,north,east or lat, lng and radius_km"},
+                            status=400)
+        return super().list(request, *args, **kwargs)
+
+
+def _sync_response(queryset, model_label, token, serialize):
+    """DRF response for a since-token delta sync"""
+    from .sync_service import SyncTokenError, SyncTokenExpired, sync_changes
+
+    try:
+        result = sync_changes(queryset, model_label, token, serialize)
+    except SyncTokenExpired as e:
+        return Response({"status": "error", "message": f"{str(e)}; sync again without a token"}, status=410)
+    except SyncTokenError as e:
+        return Response({"status": "error", "message": str(e)}, status=400)
+    return Response({"status": "success", **result})
+
 
 @csrf_exempt   # remove later if you add CSRF tokens
 def submit_report(request):
@@ -98,6 +265,20 @@ def submit_report(request):
         if not lat or not lng:
             return JsonResponse({"error": "Latitude and Longitude required"}, status=400)
 
+        # Throttle floods and fold repeat submissions before touching the database
+        from .submission_guard import get_submission_guard
+        from .upload_service import make_upload_token
+        guard = get_submission_guard()
+        decision = guard.check(request, device_fp, float(lat), float(lng), category)
+        if decision.duplicate_of is not None:
+            # A retry from the same device also gets the token for adding the photo
+            return JsonResponse({"status": "duplicate", "id": decision.duplicate_of,
+                                 "upload_token": make_upload_token(CrowdReport(pk=decision.duplicate_of))})
+        if not decision.allowed:
+            response = JsonResponse({"error": "Too many reports, try again later"}, status=429)
+            response["Retry-After"] = str(decision.retry_after)
+            return response
+
         report = CrowdReport.objects.create(
             category=category,
             severity=int(severity),
@@ -107,10 +288,90 @@ def submit_report(request):
             photo=photo,
             device_fingerprint=device_fp,
         )
+        guard.remember(request, device_fp, report)
 
-        return JsonResponse({"status": "ok", "id": report.id})
+        # Required to attach a photo later through the resumable upload endpoints
+        return JsonResponse({"status": "ok", "id": report.id, "upload_token": make_upload_token(report)})
 
     return JsonResponse({"error": "Invalid method"}, status=405)
+
+
+def _upload_state(upload):
+    return {"upload_id": str(upload.upload_id), "status": upload.status, "size": upload.size,
+            "received": upload.received}
+
+
+@csrf_exempt
+def start_photo_upload(request):
+    """Open a resumable photo upload for a crowd report (upload_token, filename, size, sha256)"""
+    if request.method != "POST":
+        return JsonResponse({"error": "Invalid method"}, status=405)
+
+    from .upload_service import UploadError, max_chunk_bytes, report_for_token, start_upload
+
+    # Only the submitter, who got the token back from submit_report, may add the photo
+    try:
+        report = report_for_token(request.POST.get("upload_token", ""))
+    except UploadError as e:
+        return JsonResponse({"error": str(e)}, status=403)
+    except CrowdReport.DoesNotExist:
+        return JsonResponse({"error": "Crowd report not found"}, status=404)
+
+    try:
+        upload = start_upload(report, request.POST.get("filename", ""), int(request.POST.get("size", 0)),
+                              request.POST.get("sha256", ""))
+    except (UploadError, ValueError) as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse({**_upload_state(upload), "chunk_size": max_chunk_bytes()}, status=201)
+
+
+@csrf_exempt
+def photo_upload_chunk(request, upload_id):
+    """
+    GET: upload progress, to find where to resume
+    PUT/POST ?offset=N: append the raw request body, which must start at byte `received`
+    """
+    from .models import PhotoUpload
+    from .upload_service import UploadError, UploadOffsetMismatch, append_chunk
+
+    try:
+        if request.method == "GET":
+            return JsonResponse(_upload_state(PhotoUpload.objects.get(upload_id=upload_id)))
+        if request.method not in ("PUT", "POST"):
+            return JsonResponse({"error": "Invalid method"}, status=405)
+
+        upload = append_chunk(upload_id, int(request.GET.get("offset", -1)), request,
+                              int(request.META.get("CONTENT_LENGTH") or 0))
+        return JsonResponse(_upload_state(upload))
+
+    except PhotoUpload.DoesNotExist:
+        return JsonResponse({"error": "Upload not found"}, status=404)
+    except UploadOffsetMismatch as e:
+        return JsonResponse({"error": str(e), "received": e.received}, status=409)
+    except (UploadError, ValueError) as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+
+@csrf_exempt
+def complete_photo_upload(request, upload_id):
+    """Verify the checksum and attach the uploaded photo to its report"""
+    if request.method != "POST":
+        return JsonResponse({"error": "Invalid method"}, status=405)
+
+    from .models import PhotoUpload
+    from .upload_service import UploadError, complete_upload
+
+    try:
+        report = complete_upload(upload_id)
+    except PhotoUpload.DoesNotExist:
+        return JsonResponse({"error": "Upload not found"}, status=404)
+    except UploadError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse({"status": "ok", "id": report.id, "photo": report.photo.url})
+
+
 Bhuvan_base = "https://bhuvan-vec2.nrsc.gov.in/bhuvan"
 BHUVAN_TOKEN = os.getenv("BHUVAN_TOKEN", "").strip()
 
@@ -337,6 +598,8 @@ def sms_emergency_report(request):
     try:
         from .sms_service import SMSService
         from .location_service import LocationService
+        from .dedup_service import SMSDedupService
+        from .ingestion_service import ReportIngestionService
         
         data = request.data
         phone_number = data.get('phone_number', '').strip()
@@ -348,11 +611,25 @@ def sms_emergency_report(request):
                 'message': 'Phone number and message are required'
             }, status=400)
         
+        # Fold panic resends into the report they repeat; the claim is atomic,
+        # so concurrent retries of one SMS create a single report
+        dedup_service = SMSDedupService()
+        report_id = EmergencyReport.generate_report_id()
+        duplicate_of = dedup_service.claim(phone_number, message, report_id)
+        if duplicate_of:
+            return JsonResponse({
+                'status': 'success',
+                'report_id': duplicate_of,
+                'duplicate': True,
+                'message': f'Emergency report {duplicate_of} already received. Help is on the way.'
+            })
+        
         # Parse SMS message using SMS service
         sms_service = SMSService()
         parsed_data = sms_service.parse_emergency_sms(message)
         
         if not parsed_data['valid']:
+            dedup_service.release(phone_number, message, report_id)
             # Send error message back to user
             sms_service.send_sms(phone_number, parsed_data['error'])
             return JsonResponse({
@@ -360,31 +637,31 @@ def sms_emergency_report(request):
                 'message': parsed_data['error']
             }, status=400)
         
-        # Detect location from phone number
-        location_info = LocationService.detect_location_from_phone_number(phone_number)
+        # Prefer a place named in the message over the phone area code
+        location_info = parsed_data.get('location') or LocationService.detect_location_from_phone_number(phone_number)
         
         # Create emergency report
-        with transaction.atomic():
-            emergency_report = EmergencyReport.objects.create(
-                channel='sms',
-                phone_number=phone_number,
-                category=parsed_data['category'],
-                severity=parsed_data['severity'],
-                description=parsed_data['description'],
-                district=location_info.get('district') if location_info else None,
-                state=location_info.get('state') if location_info else None,
+        try:
+            emergency_report = ReportIngestionService.create_report(
+                'sms',
+                phone_number,
+                parsed_data['category'],
+                parsed_data['severity'],
+                parsed_data['description'],
+                location_info=location_info,
+                language=parsed_data.get('language', 'en'),
                 raw_data={
                     'original_message': message,
                     'parsed_data': parsed_data
-                }
+                },
+                report_id=report_id
             )
-            
-            # Calculate priority score
-            emergency_report.priority_score = emergency_report.get_priority_score()
-            emergency_report.save()
+        except Exception:
+            dedup_service.release(phone_number, message, report_id)
+            raise
         
         # Send confirmation SMS
-        sms_service.send_emergency_confirmation(phone_number, emergency_report.report_id)
+        sms_service.send_emergency_confirmation(phone_number, emergency_report.report_id, emergency_report.language)
         
         return JsonResponse({
             'status': 'success',
@@ -409,6 +686,7 @@ def ivr_emergency_report(request):
     try:
         from .ivr_service import IVRService
         from .location_service import LocationService
+        from .ingestion_service import ReportIngestionService
         
         data = request.data
         phone_number = data.get('phone_number', '').strip()
@@ -430,28 +708,22 @@ def ivr_emergency_report(request):
             location_info = LocationService.detect_location_from_phone_number(phone_number)
         
         # Create emergency report
-        with transaction.atomic():
-            emergency_report = EmergencyReport.objects.create(
-                channel='ivr',
-                phone_number=phone_number,
-                category=category,
-                severity=severity,
-                description=transcript or 'Emergency reported via voice call',
-                address=location or (LocationService.format_location_for_report(location_info) if location_info else ''),
-                district=location_info.get('district') if location_info else None,
-                state=location_info.get('state') if location_info else None,
-                raw_data={
-                    'call_id': call_id,
-                    'transcript': transcript,
-                    'category': category,
-                    'severity': severity,
-                    'location': location
-                }
-            )
-            
-            # Calculate priority score
-            emergency_report.priority_score = emergency_report.get_priority_score()
-            emergency_report.save()
+        emergency_report = ReportIngestionService.create_report(
+            'ivr',
+            phone_number,
+            category,
+            severity,
+            transcript or 'Emergency reported via voice call',
+            location_info=location_info,
+            address=location or (LocationService.format_location_for_report(location_info) if location_info else ''),
+            raw_data={
+                'call_id': call_id,
+                'transcript': transcript,
+                'category': category,
+                'severity': severity,
+                'location': location
+            }
+        )
         
         # Send confirmation call
         ivr_service = IVRService()
@@ -479,7 +751,6 @@ def ussd_emergency_report(request):
     """
     try:
         from .ussd_service import USSDService
-        from .location_service import LocationService
         
         data = request.data
         phone_number = data.get('phone_number', '').strip()
@@ -501,21 +772,7 @@ def ussd_emergency_report(request):
             phone_number, session_id, menu_level, user_input, session_data
         )
         
-        # If it's a successful report creation, add location detection
-        if result.get('status') == 'success' and 'report_id' in result:
-            try:
-                # Detect location from phone number
-                location_info = LocationService.detect_location_from_phone_number(phone_number)
-                
-                # Update the emergency report with location info
-                emergency_report = EmergencyReport.objects.get(report_id=result['report_id'])
-                if location_info:
-                    emergency_report.district = location_info.get('district')
-                    emergency_report.state = location_info.get('state')
-                    emergency_report.save()
-            except Exception as e:
-                logger.error(f"Failed to update location for USSD report: {str(e)}")
-        
+        # Location is detected when the USSD service creates the report
         return JsonResponse(result)
         
     except Exception as e:
@@ -528,9 +785,25 @@ def ussd_emergency_report(request):
 @api_view(['GET'])
 def list_emergency_reports(request):
     """
-    List all emergency reports with filtering options
+    List emergency reports with filtering options, highest priority first
+
+    Without paging parameters every matching report is returned, serialized.
+    Passing ?page_size=, ?cursor= (from next_cursor) or ?fields= switches to
+    keyset pages of plain rows; ?fields= picks the columns returned, which by
+    default are all but raw_data, and the total count is only included on the
+    first page.
+
+    With ?since=<token> (empty for a first sync) returns only reports changed
+    or deleted since that token, ignoring the filters, plus the next token.
     """
     try:
+        if 'since' in request.GET:
+            from .sync_service import concrete_field_names
+            return _sync_response(
+                EmergencyReport.objects.values(*concrete_field_names(EmergencyReport, exclude=('raw_data',))),
+                'backend.emergencyreport', request.GET['since'], list
+            )
+
         queryset = EmergencyReport.objects.all()
         
         # Apply filters
@@ -548,15 +821,55 @@ def list_emergency_reports(request):
         if channel_filter:
             queryset = queryset.filter(channel=channel_filter)
         
-        # Order by priority and creation time
-        queryset = queryset.order_by('-priority_score', '-created_at')
-        
-        serializer = EmergencyReportSerializer(queryset, many=True)
-        return Response({
+        if not any(param in request.GET for param in ('page_size', 'cursor', 'fields')):
+            # Order by priority and creation time
+            queryset = queryset.order_by('-priority_score', '-created_at')
+
+            serializer = EmergencyReportSerializer(queryset, many=True)
+            return Response({
+                'status': 'success',
+                'reports': serializer.data,
+                'count': len(serializer.data)
+            })
+
+        from django.conf import settings
+        from .pagination import CursorError, paginate_by_priority
+
+        # Column projection; raw_data is only sent when asked for by name
+        available = [field.name for field in EmergencyReport._meta.concrete_fields]
+        if request.GET.get('fields'):
+            fields = [field.strip() for field in request.GET['fields'].split(',') if field.strip()]
+            unknown = [field for field in fields if field not in available]
+            if unknown:
+                return Response({
+                    'status': 'error',
+                    'message': f"Unknown fields: {', '.join(unknown)}"
+                }, status=400)
+        else:
+            fields = [field for field in available if field != 'raw_data']
+
+        max_page_size = getattr(settings, 'EMERGENCY_REPORTS_MAX_PAGE_SIZE', 500)
+        page_size = min(int(request.GET.get('page_size', getattr(settings, 'EMERGENCY_REPORTS_PAGE_SIZE', 50))),
+                        max_page_size)
+        if page_size < 1:
+            return Response({'status': 'error', 'message': 'page_size must be positive'}, status=400)
+
+        # Ordered by priority and creation time, one keyset page at a time
+        cursor = request.GET.get('cursor')
+        try:
+            reports, next_cursor = paginate_by_priority(queryset, fields, cursor, page_size)
+        except CursorError as e:
+            return Response({'status': 'error', 'message': str(e)}, status=400)
+
+        response = {
             'status': 'success',
-            'reports': serializer.data,
-            'count': queryset.count()
-        })
+            'reports': reports,
+            'next_cursor': next_cursor,
+        }
+        # The total only needs computing once per listing, not on every page
+        if not cursor:
+            response['count'] = len(reports) if next_cursor is None else queryset.count()
+        return Response(response)
         
     except Exception as e:
         return Response({
@@ -697,6 +1010,524 @@ def get_emergency_report_details(request, report_id):
         }, status=500)
 
 
+@api_view(['GET'])
+def emergency_queue(request):
+    """
+    Highest-priority open reports, with priority rising the longer a report waits
+
+    Query params:
+        limit: Number of reports (default 20, max EMERGENCY_REPORTS_MAX_PAGE_SIZE)
+        unassigned: 'true' to skip reports that already have a rescuer
+        status: Comma-separated subset of pending, acknowledged, in_progress
+    """
+    try:
+        from django.conf import settings
+        from .priority_queue import top_open_reports
+
+        limit = min(int(request.GET.get('limit', 20)), getattr(settings, 'EMERGENCY_REPORTS_MAX_PAGE_SIZE', 500))
+        statuses = [status for status in request.GET.get('status', '').split(',') if status] or None
+        reports = top_open_reports(
+            k=max(limit, 0),
+            unassigned=request.GET.get('unassigned') == 'true',
+            statuses=statuses
+        )
+        return Response({
+            'status': 'success',
+            'reports': reports,
+        })
+
+    except ValueError:
+        return Response({
+            'status': 'error',
+            'message': 'limit must be an integer'
+        }, status=400)
+    except Exception as e:
+        return Response({
+            'status': 'error',
+            'message': f'Failed to fetch emergency queue: {str(e)}'
+        }, status=500)
+
+
+@api_view(['GET'])
+def list_incidents(request):
+    """
+    Incidents (clusters of nearby reports), most severe and largest first
+
+    Query params:
+        status: active (default), merged, resolved or all. Active incidents
+            without a report in the last INCIDENT_WINDOW_MINUTES are left out,
+            as the next resolve_incidents run will resolve them
+        category: Filter by category
+        limit: Number of incidents (default 50, max EMERGENCY_REPORTS_MAX_PAGE_SIZE)
+    """
+    try:
+        from datetime import timedelta
+        from django.conf import settings
+        from django.utils import timezone
+        from .models import Incident
+
+        queryset = Incident.objects.all()
+        status_filter = request.GET.get('status', 'active')
+        if status_filter != 'all':
+            queryset = queryset.filter(status=status_filter)
+        if status_filter == 'active':
+            window = timedelta(minutes=getattr(settings, 'INCIDENT_WINDOW_MINUTES', 120))
+            queryset = queryset.filter(last_seen_at__gte=timezone.now() - window)
+        category = request.GET.get('category')
+        if category:
+            queryset = queryset.filter(category=category)
+
+        limit = min(int(request.GET.get('limit', 50)), getattr(settings, 'EMERGENCY_REPORTS_MAX_PAGE_SIZE', 500))
+        incidents = list(queryset.order_by('-max_severity', '-report_count', '-last_seen_at').values(
+            'id', 'category', 'status', 'lat', 'lng', 'report_count', 'max_severity',
+            'district', 'state', 'first_seen_at', 'last_seen_at'
+        )[:max(limit, 0)])
+
+        return Response({
+            'status': 'success',
+            'count': len(incidents),
+            'incidents': incidents
+        })
+
+    except ValueError:
+        return Response({
+            'status': 'error',
+            'message': 'limit must be an integer'
+        }, status=400)
+    except Exception as e:
+        return Response({
+            'status': 'error',
+            'message': f'Failed to fetch incidents: {str(e)}'
+        }, status=500)
+
+
+@api_view(['GET'])
+def get_incident(request, incident_id):
+    """
+    One incident with the ids of its member reports
+    """
+    try:
+        from .models import Incident
+
+        try:
+            incident = Incident.objects.get(pk=incident_id)
+        except Incident.DoesNotExist:
+            return Response({
+                'status': 'error',
+                'message': 'Incident not found'
+            }, status=404)
+
+        return Response({
+            'status': 'success',
+            'incident': {
+                'id': incident.id,
+                'category': incident.category,
+                'status': incident.status,
+                'merged_into': incident.merged_into_id,
+                'lat': incident.lat,
+                'lng': incident.lng,
+                'report_count': incident.report_count,
+                'max_severity': incident.max_severity,
+                'district': incident.district,
+                'state': incident.state,
+                'first_seen_at': incident.first_seen_at,
+                'last_seen_at': incident.last_seen_at,
+                'emergency_reports': list(incident.emergency_reports.values_list('report_id', flat=True)),
+                'crowd_reports': list(incident.crowd_reports.values_list('id', flat=True)),
+            }
+        })
+
+    except Exception as e:
+        return Response({
+            'status': 'error',
+            'message': f'Failed to fetch incident: {str(e)}'
+        }, status=500)
+
+
+ROLLUP_MODELS = {'emergency': 'backend.emergencyreport', 'crowd': 'backend.crowdreport'}
+
+
+@api_view(['GET'])
+def report_stats(request):
+    """
+    Report counts from the statistics rollups
+
+    Query params:
+        model: emergency (default) or crowd
+        group_by: Comma-separated subset of state, district, category, severity, status
+        state, district, category, severity, status: Filters
+    """
+    try:
+        from django.db.models import Sum
+        from .models import ReportStat
+
+        dimensions = ('state', 'district', 'category', 'severity', 'status')
+        model_label = ROLLUP_MODELS.get(request.GET.get('model', 'emergency'))
+        group_by = [field for field in request.GET.get('group_by', '').split(',') if field]
+        if model_label is None or any(field not in dimensions for field in group_by):
+            return Response({
+                'status': 'error',
+                'message': f"model must be one of {', '.join(ROLLUP_MODELS)} and group_by a subset of {', '.join(dimensions)}"
+            }, status=400)
+
+        queryset = ReportStat.objects.filter(model_label=model_label).filter(
+            **{field: request.GET[field] for field in dimensions if field in request.GET}
+        )
+        total = queryset.aggregate(total=Sum('count'))['total'] or 0
+        groups = []
+        if group_by:
+            groups = list(queryset.values(*group_by).annotate(count=Sum('count'))
+                          .filter(count__gt=0).order_by('-count'))
+
+        return Response({
+            'status': 'success',
+            'total': total,
+            'groups': groups
+        })
+
+    except ValueError:
+        return Response({
+            'status': 'error',
+            'message': 'severity must be an integer'
+        }, status=400)
+    except Exception as e:
+        return Response({
+            'status': 'error',
+            'message': f'Failed to fetch report statistics: {str(e)}'
+        }, status=500)
+
+
+@api_view(['GET'])
+def report_cell_stats(request):
+    """
+    Report counts per grid cell over recent hours, for heatmaps
+
+    Query params:
+        model: emergency (default) or crowd
+        hours: Window in hours (default 24, max 720)
+        category: Filter by category
+    """
+    try:
+        from datetime import timedelta
+        from django.conf import settings
+        from django.db.models import Sum
+        from django.utils import timezone
+        from .models import ReportCellStat
+
+        model_label = ROLLUP_MODELS.get(request.GET.get('model', 'emergency'))
+        if model_label is None:
+            return Response({
+                'status': 'error',
+                'message': f"model must be one of {', '.join(ROLLUP_MODELS)}"
+            }, status=400)
+
+        hours = max(1, min(int(request.GET.get('hours', 24)), 720))
+        since = (timezone.now() - timedelta(hours=hours)).replace(minute=0, second=0, microsecond=0)
+        queryset = ReportCellStat.objects.filter(model_label=model_label, hour__gte=since)
+        category = request.GET.get('category')
+        if category:
+            queryset = queryset.filter(category=category)
+
+        degrees = getattr(settings, 'ROLLUP_CELL_DEGREES', 0.5)
+        cells = [
+            {
+                'lat': round((row['cell_row'] + 0.5) * degrees, 6),
+                'lng': round((row['cell_col'] + 0.5) * degrees, 6),
+                'count': row['count'],
+            }
+            for row in queryset.values('cell_row', 'cell_col').annotate(count=Sum('count'))
+            .filter(count__gt=0).order_by('-count')
+        ]
+
+        return Response({
+            'status': 'success',
+            'cell_degrees': degrees,
+            'since': since,
+            'cells': cells
+        })
+
+    except ValueError:
+        return Response({
+            'status': 'error',
+            'message': 'hours must be an integer'
+        }, status=400)
+    except Exception as e:
+        return Response({
+            'status': 'error',
+            'message': f'Failed to fetch cell statistics: {str(e)}'
+        }, status=500)
+
+
+@api_view(['GET'])
+def rescuer_candidates(request, report_id):
+    """
+    Nearby available rescuers for a report, best first
+    """
+    try:
+        from .dispatch_service import get_dispatcher
+        
+        try:
+            emergency_report = EmergencyReport.objects.get(report_id=report_id)
+        except EmergencyReport.DoesNotExist:
+            return Response({
+                'status': 'error',
+                'message': 'Emergency report not found'
+            }, status=404)
+        
+        if emergency_report.lat is None or emergency_report.lng is None:
+            return Response({
+                'status': 'error',
+                'message': 'Emergency report has no coordinates'
+            }, status=400)
+        
+        k = max(1, min(int(request.GET.get('k', 5)), 50))
+        candidates = get_dispatcher().find_candidates(emergency_report.lat, emergency_report.lng, k)
+        
+        return Response({
+            'status': 'success',
+            'report_id': report_id,
+            'candidates': candidates
+        })
+        
+    except Exception as e:
+        return Response({
+            'status': 'error',
+            'message': f'Failed to find rescuers: {str(e)}'
+        }, status=500)
+
+
+@api_view(['POST'])
+def assign_emergency_report(request, report_id):
+    """
+    Assign a report to a given rescuer_id, or to the best nearby rescuer when omitted
+    """
+    try:
+        from .dispatch_service import get_dispatcher
+        
+        if not request.user.is_authenticated:
+            return Response({
+                'status': 'error',
+                'message': 'Authentication required'
+            }, status=401)
+        
+        try:
+            emergency_report = EmergencyReport.objects.get(report_id=report_id)
+        except EmergencyReport.DoesNotExist:
+            return Response({
+                'status': 'error',
+                'message': 'Emergency report not found'
+            }, status=404)
+        
+        dispatcher = get_dispatcher()
+        rescuer_id = request.data.get('rescuer_id')
+
+        if rescuer_id not in (None, ''):
+            try:
+                rescuer_id = int(rescuer_id)
+            except (TypeError, ValueError):
+                return Response({
+                    'status': 'error',
+                    'message': 'rescuer_id must be an integer'
+                }, status=400)
+            # Only active rescuers can be assigned, checked before the conditional UPDATE
+            if not User.objects.filter(id=rescuer_id, role='rescuer', is_active=True).exists():
+                return Response({
+                    'status': 'error',
+                    'message': 'Rescuer not found'
+                }, status=404)
+            assigned = dispatcher.assign(
+                emergency_report, rescuer_id,
+                message=f'Assigned by {request.user.username}',
+                reassign=True
+            )
+        else:
+            assigned = bool(dispatcher.auto_assign(emergency_report))
+        
+        if not assigned:
+            return Response({
+                'status': 'error',
+                'message': 'No assignment made: report is closed, already assigned or no rescuer is available nearby'
+            }, status=409)
+        
+        return Response({
+            'status': 'success',
+            'report_id': report_id,
+            'assigned_to': emergency_report.assigned_to_id
+        })
+        
+    except Exception as e:
+        return Response({
+            'status': 'error',
+            'message': f'Failed to assign emergency report: {str(e)}'
+        }, status=500)
+
+
+@api_view(['POST'])
+def batch_assign_emergency_reports(request):
+    """
+    Assign all open, unassigned reports to available rescuers in one optimal batch
+    """
+    try:
+        from .assignment_solver import assign_pending_reports
+        
+        if not request.user.is_authenticated:
+            return Response({
+                'status': 'error',
+                'message': 'Authentication required'
+            }, status=401)
+        
+        from django.conf import settings
+
+        max_reports = getattr(settings, 'DISPATCH_BATCH_MAX_REPORTS', 5000)
+        limit = request.data.get('limit', request.GET.get('limit'))
+        if limit in (None, ''):
+            limit = max_reports
+        else:
+            try:
+                limit = int(limit)
+            except (TypeError, ValueError):
+                limit = 0
+            if limit < 1:
+                return Response({
+                    'status': 'error',
+                    'message': 'limit must be a positive integer'
+                }, status=400)
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+        result = assign_pending_reports(limit=min(limit, max_reports), dry_run=dry_run)
+        
+        return Response(dict(result, status='success'))
+        
+    except Exception as e:
+        return Response({
+            'status': 'error',
+            'message': f'Failed to assign emergency reports: {str(e)}'
+        }, status=500)
+
+
+@api_view(['GET'])
+def rescuer_track(request, user_id):
+    """
+    Downsampled track of one rescuer between ?start= and ?end= (ISO 8601, default last 24 hours)
+    """
+    try:
+        from datetime import timedelta
+        from django.utils.dateparse import parse_datetime
+        from .location_buffer import get_location_buffer
+        from .models import RescuerTrackPoint
+        
+        if not request.user.is_authenticated:
+            return Response({
+                'status': 'error',
+                'message': 'Authentication required'
+            }, status=401)
+        
+        end = parse_datetime(request.GET['end']) if request.GET.get('end') else timezone.now()
+        start = parse_datetime(request.GET['start']) if request.GET.get('start') else end - timedelta(hours=24)
+        if start is None or end is None:
+            return Response({
+                'status': 'error',
+                'message': 'start and end must be ISO 8601 datetimes'
+            }, status=400)
+        if timezone.is_naive(start):
+            start = timezone.make_aware(start)
+        if timezone.is_naive(end):
+            end = timezone.make_aware(end)
+        
+        limit = max(1, min(int(request.GET.get('limit', 5000)), 20000))
+        
+        # Served by the (user, recorded_at) index
+        points = list(
+            RescuerTrackPoint.objects.filter(
+                user_id=user_id, recorded_at__gte=start, recorded_at__lte=end
+            ).order_by('recorded_at').values_list('lat', 'lng', 'recorded_at')[:limit]
+        )
+        # Points this worker has not flushed yet
+        points.extend(
+            position for position in get_location_buffer().pending_track(user_id)
+            if start <= position[2] <= end
+        )
+        points.sort(key=lambda point: point[2])
+        points = points[:limit]
+        
+        return Response({
+            'status': 'success',
+            'user_id': user_id,
+            'start': start,
+            'end': end,
+            'count': len(points),
+            'points': [{'lat': lat, 'lng': lng, 'recorded_at': recorded_at} for lat, lng, recorded_at in points]
+        })
+        
+    except Exception as e:
+        return Response({
+            'status': 'error',
+            'message': f'Failed to fetch rescuer track: {str(e)}'
+        }, status=500)
+
+
+@api_view(['GET'])
+def nearest_facilities(request, report_id=None):
+    """
+    Nearest hospitals, police and fire stations and DDMA offices to a report or to ?lat=&lng=
+    """
+    try:
+        from django.conf import settings
+        from .location_service import LocationService
+        from .facility_index import FACILITY_TYPES, FacilityDataUnavailable, require_facility_index
+        
+        try:
+            index = require_facility_index()
+        except FacilityDataUnavailable as e:
+            return Response({
+                'status': 'error',
+                'message': str(e)
+            }, status=503)
+        
+        if report_id:
+            try:
+                emergency_report = EmergencyReport.objects.only('lat', 'lng').get(report_id=report_id)
+            except EmergencyReport.DoesNotExist:
+                return Response({
+                    'status': 'error',
+                    'message': 'Emergency report not found'
+                }, status=404)
+            lat, lng = emergency_report.lat, emergency_report.lng
+        else:
+            try:
+                lat, lng = float(request.GET['lat']), float(request.GET['lng'])
+            except (KeyError, ValueError):
+                lat = lng = None
+        
+        if lat is None or lng is None or not LocationService.validate_coordinates(lat, lng):
+            return Response({
+                'status': 'error',
+                'message': 'Valid coordinates within India are required'
+            }, status=400)
+        
+        facility_type = request.GET.get('type')
+        if facility_type and facility_type not in FACILITY_TYPES:
+            return Response({
+                'status': 'error',
+                'message': f"Unknown facility type. Use one of: {', '.join(FACILITY_TYPES)}"
+            }, status=400)
+        
+        k = max(1, min(int(request.GET.get('k', getattr(settings, 'EMERGENCY_FACILITIES_K', 3))), 50))
+        facilities = index.nearest(lat, lng, k=k, facility_types=[facility_type] if facility_type else None)
+        
+        return Response({
+            'status': 'success',
+            'lat': lat,
+            'lng': lng,
+            'facilities': facilities
+        })
+        
+    except Exception as e:
+        return Response({
+            'status': 'error',
+            'message': f'Failed to find nearest facilities: {str(e)}'
+        }, status=500)
+
+
 # -------------------------
 # Webhook Handlers for SMS, IVR, USSD
 # -------------------------
@@ -710,6 +1541,7 @@ def sms_webhook(request):
     """
     try:
         from .sms_service import SMSWebhookHandler
+        from .dedup_service import SMSDedupService
         
         # Extract SMS data from webhook
         phone_number = request.data.get('From', '')
@@ -721,39 +1553,55 @@ def sms_webhook(request):
                 'message': 'Missing phone number or message'
             }, status=400)
         
+        # Fold panic resends into the report they repeat; the claim is atomic,
+        # so concurrent retries of one SMS create a single report
+        dedup_service = SMSDedupService()
+        report_id = EmergencyReport.generate_report_id()
+        duplicate_of = dedup_service.claim(phone_number, message, report_id)
+        if duplicate_of:
+            return JsonResponse({
+                'status': 'success',
+                'report_id': duplicate_of,
+                'duplicate': True
+            })
+        
         # Handle incoming SMS
         result = SMSWebhookHandler.handle_incoming_sms(request.data)
         
-        if result['status'] == 'success':
+        if result['status'] != 'success':
+            dedup_service.release(phone_number, message, report_id)
+        else:
             # Create emergency report
-            from .models import EmergencyReport
             from .location_service import LocationService
+            from .ingestion_service import ReportIngestionService
             
             parsed_data = result['parsed_data']
-            location_info = LocationService.detect_location_from_phone_number(phone_number)
+            # Prefer a place named in the message over the phone area code
+            location_info = parsed_data.get('location') or LocationService.detect_location_from_phone_number(phone_number)
             
-            emergency_report = EmergencyReport.objects.create(
-                channel='sms',
-                phone_number=phone_number,
-                category=parsed_data['category'],
-                severity=parsed_data['severity'],
-                description=parsed_data['description'],
-                district=location_info.get('district') if location_info else None,
-                state=location_info.get('state') if location_info else None,
-                raw_data={
-                    'webhook_data': request.data,
-                    'parsed_data': parsed_data
-                }
-            )
-            
-            # Calculate priority score
-            emergency_report.priority_score = emergency_report.get_priority_score()
-            emergency_report.save()
+            try:
+                emergency_report = ReportIngestionService.create_report(
+                    'sms',
+                    phone_number,
+                    parsed_data['category'],
+                    parsed_data['severity'],
+                    parsed_data['description'],
+                    location_info=location_info,
+                    language=parsed_data.get('language', 'en'),
+                    raw_data={
+                        'webhook_data': request.data,
+                        'parsed_data': parsed_data
+                    },
+                    report_id=report_id
+                )
+            except Exception:
+                dedup_service.release(phone_number, message, report_id)
+                raise
             
             # Send confirmation SMS
             from .sms_service import SMSService
             sms_service = SMSService()
-            sms_service.send_emergency_confirmation(phone_number, emergency_report.report_id)
+            sms_service.send_emergency_confirmation(phone_number, emergency_report.report_id, emergency_report.language)
         
         return JsonResponse(result)
         
@@ -764,6 +1612,119 @@ def sms_webhook(request):
         }, status=500)
 
 
+@csrf_exempt
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def sms_batch_webhook(request):
+    """
+    Handle batched incoming SMS (MO messages) from SMS gateways
+    Accepts {"messages": [{"From": ..., "Body": ...}, ...]} or a bare list
+    """
+    try:
+        from django.conf import settings
+        from .sms_service import SMSWebhookHandler, SMSService
+        from .location_service import LocationService
+        from .dedup_service import SMSDedupService
+        from .ingestion_service import ReportIngestionService
+        
+        payload = request.data
+        messages = payload.get('messages') if isinstance(payload, dict) else payload
+        
+        if not isinstance(messages, list) or not messages:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Expected a non-empty list of messages'
+            }, status=400)
+        
+        max_messages = getattr(settings, 'SMS_BATCH_MAX_MESSAGES', 1000)
+        if len(messages) > max_messages:
+            return JsonResponse({
+                'status': 'error',
+                'message': f'Batch too large (max {max_messages} messages)'
+            }, status=400)
+        
+        # Parse the whole batch in one pass
+        batch = SMSWebhookHandler.handle_incoming_sms_batch(messages)
+        results = [{'index': item['index'], 'status': 'error', 'message': item['message']}
+                   for item in batch['rejected']]
+        
+        dedup_service = SMSDedupService()
+        new_reports = []
+        pending_by_key = {}
+        
+        for item in batch['accepted']:
+            phone_number = item['phone_number']
+            message = item['message']
+            parsed_data = item['parsed_data']
+            
+            # Repeats inside the batch fold into the pending report without an extra write
+            dedup_key = dedup_service.get_dedup_key(phone_number, message)
+            if dedup_key in pending_by_key:
+                pending_report = pending_by_key[dedup_key]
+                pending_report.repeat_count += 1
+                results.append({'index': item['index'], 'status': 'success',
+                                'report_id': pending_report.report_id, 'duplicate': True})
+                continue
+            
+            # Atomic claim, so a batch retried by the gateway while this one runs is folded
+            report_id = EmergencyReport.generate_report_id()
+            duplicate_of = dedup_service.claim(phone_number, message, report_id)
+            if duplicate_of:
+                results.append({'index': item['index'], 'status': 'success',
+                                'report_id': duplicate_of, 'duplicate': True})
+                continue
+            
+            # Prefer a place named in the message over the phone area code
+            location_info = parsed_data.get('location') or LocationService.detect_location_from_phone_number(phone_number)
+            
+            emergency_report = ReportIngestionService.build_report(
+                'sms',
+                phone_number,
+                parsed_data['category'],
+                parsed_data['severity'],
+                parsed_data['description'],
+                location_info=location_info,
+                language=parsed_data.get('language', 'en'),
+                raw_data={
+                    'webhook_data': item['webhook_data'],
+                    'parsed_data': parsed_data
+                },
+                report_id=report_id
+            )
+            
+            pending_by_key[dedup_key] = emergency_report
+            new_reports.append((item, emergency_report))
+            results.append({'index': item['index'], 'status': 'success',
+                            'report_id': emergency_report.report_id})
+        
+        try:
+            ReportIngestionService.create_reports([report for _, report in new_reports])
+        except Exception:
+            for item, emergency_report in new_reports:
+                dedup_service.release(item['phone_number'], item['message'], emergency_report.report_id)
+            raise
+        
+        # Confirm once per new report, after the batch is committed
+        sms_service = SMSService()
+        for item, emergency_report in new_reports:
+            sms_service.send_emergency_confirmation(item['phone_number'], emergency_report.report_id, emergency_report.language)
+        
+        results.sort(key=lambda result: result['index'])
+        return JsonResponse({
+            'status': 'success',
+            'created': len(new_reports),
+            'duplicates': sum(1 for result in results if result.get('duplicate')),
+            'rejected': len(batch['rejected']),
+            'results': results
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': f'SMS batch webhook handling failed: {str(e)}'
+        }, status=500)
+
+
 @csrf_exempt
 @api_view(['POST'])
 @permission_classes([AllowAny])
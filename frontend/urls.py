@@ -22,5 +22,6 @@ urlpatterns = [
     path("api/reports/", backend_views.CrowdReportList.as_view(), name="api-reports"),
     path("api/reports/simple/", frontend_views.reports_api, name="reports_api"),  # avoid conflict
     path("api/update_rescuer_location/", backend_views.update_rescuer_location, name="update_rescuer_location"),
+    path("api/update_rescuer_location/batch/", backend_views.update_rescuer_location_batch, name="update_rescuer_location_batch"),
     path("api/get_rescuers/", backend_views.get_rescuers, name="get_rescuers"),
 ]
@@ -106,13 +106,30 @@ from django.http import JsonResponse
 from backend.models import CrowdReport
 
 def reports_api(request):
-    data = list(CrowdReport.objects.values(
-        "id",
-        "category",
-        "severity",
-        "note",
-        "lat",
-        "lng",
-        "created_at"
-    ).order_by("-created_at"))  # newest first
+    fields = ("id", "category", "severity", "note", "lat", "lng", "created_at")
+
+    # ?since=<token>: only reports changed or deleted since the last sync (empty token = full sync)
+    if "since" in request.GET:
+        from backend.sync_service import SyncTokenError, SyncTokenExpired, sync_changes
+        try:
+            result = sync_changes(
+                CrowdReport.objects.values(*fields, "updated_at"), "backend.crowdreport",
+                request.GET["since"], list
+            )
+        except SyncTokenExpired as e:
+            return JsonResponse({"status": "error", "message": f"{str(e)}; sync again without a token"}, status=410)
+        except SyncTokenError as e:
+            return JsonResponse({"status": "error", "message": str(e)}, status=400)
+        return JsonResponse(result)
+
+    queryset = CrowdReport.objects.all()
+    # ?bbox=south,west,north,east: only the visible map area, via the geohash index
+    if request.GET.get("bbox"):
+        from backend.spatial import parse_bbox, within_bbox
+        try:
+            queryset = within_bbox(queryset, *parse_bbox(request.GET["bbox"]))
+        except ValueError as e:
+            return JsonResponse({"status": "error", "message": str(e)}, status=400)
+
+    data = list(queryset.values(*fields).order_by("-created_at"))  # newest first
     return JsonResponse(data, safe=False)